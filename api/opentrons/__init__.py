@@ -15,13 +15,54 @@ if version < (3, 5):
 
 if not ff.split_labware_definitions():
     database_migration.check_version_and_perform_necessary_migrations()
-robot = Robot()
+
+
+class LazyRobot(object):
+    """
+    Stand-in for the global :class:`Robot`, which is only built the first
+    time one of its attributes is used. Constructing a robot reads the robot
+    config, feature flags and pipette configs and loads the fixed trash,
+    which scripts that only import opentrons do not need.
+    """
+    def __init__(self):
+        object.__setattr__(self, '_robot', None)
+
+    def _get_robot(self):
+        if self._robot is None:
+            object.__setattr__(self, '_robot', Robot())
+        return self._robot
+
+    def _reset(self):
+        object.__setattr__(self, '_robot', Robot())
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._get_robot(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get_robot(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._get_robot(), name)
+
+    def __dir__(self):
+        return dir(self._get_robot())
+
+    def __repr__(self):
+        if self._robot is None:
+            return '<LazyRobot (not built yet)>'
+        return repr(self._robot)
+
+
+robot = LazyRobot()
 
 
 def reset():
-    global robot
-    robot = Robot()
-    return robot
+    """
+    Replace the global robot with a new one. Objects holding `robot`, such
+    as `instruments` and `labware`, use the new robot too.
+    """
+    return robot._reset()
 
 
 class ContainersWrapper(object):
@@ -10,8 +10,11 @@ from opentrons.containers import get_container, location_to_list
 from opentrons.commands import tree, types
 from opentrons.protocols import execute_protocol
 from opentrons import robot
+from opentrons.trackers import tip_tracker, volume_tracker
+from opentrons.util.calls import read_only
 
 from .models import Container, Instrument
+from . import simulation_cache
 
 log = logging.getLogger(__name__)
 
@@ -21,11 +24,19 @@ VALID_STATES = {'loaded', 'running', 'finished', 'stopped', 'paused', 'error'}
 class SessionManager(object):
     def __init__(self, loop=None):
         self.session = None
-
-    def create(self, name, text):
-        self.session = Session(name=name, text=text)
+        self.simulation_cache = simulation_cache.SimulationCache()
+
+    def create(self, name, text, use_cache=True):
+        """
+        Create a session for a protocol. Pass use_cache=False to simulate the
+        protocol even if an identical one was simulated before, e.g. for
+        protocols whose result depends on randomness, time or other files.
+        """
+        cache = self.simulation_cache if use_cache else None
+        self.session = Session(name=name, text=text, cache=cache)
         return self.session
 
+    @read_only
     def get_session(self):
         return self.session
 
@@ -33,10 +44,11 @@ class SessionManager(object):
 class Session(object):
     TOPIC = 'session'
 
-    def __init__(self, name, text):
+    def __init__(self, name, text, cache=None):
         self.name = name
         self.protocol_text = text
         self._protocol = None
+        self._cache = cache
         self.state = None
         self.commands = []
         self.command_log = {}
@@ -53,6 +65,7 @@ class Session(object):
 
         self.refresh()
 
+    @read_only
     def get_instruments(self):
         return [
             Instrument(
@@ -66,6 +79,7 @@ class Session(object):
             for instrument in self._instruments
         ]
 
+    @read_only
     def get_containers(self):
         return [
             Container(
@@ -142,14 +156,21 @@ class Session(object):
         self._reset()
         self._is_json_protocol = self.name.endswith('.json')
 
-        if self._is_json_protocol:
-            # TODO Ian 2018-05-16 use protocol JSON schema to raise
-            # warning/error here if the protocol_text doesn't follow the schema
-            self._protocol = json.loads(self.protocol_text)
+        cached = None
+        if self._cache is not None:
+            cached = self._cache.get(self._fingerprint())
+
+        if cached:
+            commands = self._restore(cached)
         else:
-            parsed = ast.parse(self.protocol_text)
-            self._protocol = compile(parsed, filename=self.name, mode='exec')
-        commands = self._simulate()
+            self._protocol = self._compile()
+            commands = self._simulate()
+            if self._cache is not None:
+                # Simulation can update the robot config (e.g. tip lengths of
+                # newly created pipettes), so key the result on the state it
+                # leaves behind, which is what the next upload will see
+                self._cache.put(
+                    self._fingerprint(), self._simulation_result(commands))
         self.commands = tree.from_list(commands)
 
         self.containers = self.get_containers()
@@ -159,6 +180,42 @@ class Session(object):
 
         return self
 
+    def _fingerprint(self):
+        return simulation_cache.fingerprint(self.name, self.protocol_text)
+
+    def _compile(self):
+        if self._is_json_protocol:
+            # TODO Ian 2018-05-16 use protocol JSON schema to raise
+            # warning/error here if the protocol_text doesn't follow the schema
+            return json.loads(self.protocol_text)
+        parsed = ast.parse(self.protocol_text)
+        return compile(parsed, filename=self.name, mode='exec')
+
+    def _simulation_result(self, commands):
+        robot_state, instrument_state = \
+            simulation_cache.capture_robot_state()
+        return simulation_cache.SimulationResult(
+            protocol=self._protocol,
+            commands=commands,
+            containers=list(self._containers),
+            instruments=list(self._instruments),
+            interactions=list(self._interactions),
+            robot_state=robot_state,
+            instrument_state=instrument_state,
+            tip_state=tip_tracker.get_states(),
+            volume_state=volume_tracker.get_states())
+
+    def _restore(self, result):
+        simulation_cache.restore_robot_state(
+            result.robot_state, result.instrument_state)
+        tip_tracker.set_states(result.tip_state)
+        volume_tracker.set_states(result.volume_state)
+        self._protocol = result.protocol
+        self._containers[:] = result.containers
+        self._instruments[:] = result.instruments
+        self._interactions[:] = result.interactions
+        return result.commands
+
     def stop(self):
         robot.stop()
         self.set_state('stopped')
@@ -0,0 +1,127 @@
+"""
+Simulate protocols in a pool of worker processes.
+
+Each worker process imports its own copy of :mod:`opentrons`, and with it its
+own :class:`opentrons.robot.robot.Robot` on a simulating driver, so protocols
+can be simulated side by side without touching the robot of the calling
+process. Results are returned as plain, picklable data.
+"""
+import logging
+import multiprocessing
+import os
+
+log = logging.getLogger(__name__)
+
+
+def _init_worker():
+    # Make sure the worker's driver can never reach real hardware: the
+    # simulation flow in Session reconnects the driver after exec
+    os.environ['ENABLE_VIRTUAL_SMOOTHIE'] = 'true'
+    import opentrons  # noqa: F401
+
+
+def _summarize_container(container):
+    return {
+        'name': container.name,
+        'type': container.type,
+        'slot': container.slot
+    }
+
+
+def _summarize_instrument(instrument):
+    return {
+        'name': instrument.name,
+        'mount': instrument.mount,
+        'channels': instrument.channels,
+        'containers': [c.name for c in instrument.containers]
+    }
+
+
+def simulate(name, text):
+    """
+    Simulate a single protocol in the current process.
+
+    :param name: protocol file name, ``.json`` protocols are executed as
+                 JSON protocols
+    :param text: protocol source
+    :return: dict with the protocol ``name``, the ``commands`` tree, loaded
+             ``containers`` and ``instruments``, runtime ``warnings`` and
+             ``error`` (``None`` if the protocol simulated successfully)
+    """
+    from opentrons import robot
+    from .session import Session
+
+    result = {
+        'name': name,
+        'commands': [],
+        'containers': [],
+        'instruments': [],
+        'warnings': [],
+        'error': None
+    }
+    try:
+        session = Session(name=name, text=text)
+    except Exception as e:
+        log.debug('Simulation of {} failed'.format(name), exc_info=True)
+        result['error'] = '{}: {}'.format(type(e).__name__, e)
+        result['warnings'] = list(robot.get_warnings())
+        return result
+
+    result.update({
+        'commands': session.commands,
+        'containers': [
+            _summarize_container(c) for c in session.containers],
+        'instruments': [
+            _summarize_instrument(i) for i in session.instruments],
+        'warnings': list(robot.get_warnings())
+    })
+    return result
+
+
+def _simulate_item(item):
+    return simulate(*item)
+
+
+class SimulationPool(object):
+    """
+    Pool of worker processes simulating protocols.
+
+    >>> with SimulationPool() as pool:  # doctest: +SKIP
+    ...     results = pool.simulate([('a.py', text_a), ('b.py', text_b)])
+
+    Workers are started with the ``spawn`` method so they do not inherit the
+    state of the caller's robot or its serial connection.
+    """
+    def __init__(self, processes=None):
+        context = multiprocessing.get_context('spawn')
+        self.processes = processes or os.cpu_count() or 1
+        self._pool = context.Pool(
+            processes=self.processes, initializer=_init_worker)
+
+    def simulate(self, protocols):
+        """
+        Simulate protocols in parallel.
+
+        :param protocols: iterable of ``(name, text)`` pairs
+        :return: list of results (see :func:`simulate`), in the order the
+                 protocols were given
+        """
+        return self._pool.map(_simulate_item, list(protocols))
+
+    def simulate_async(self, protocols, callback=None):
+        """
+        Same as :meth:`simulate` but returns immediately with a
+        :class:`multiprocessing.pool.AsyncResult`.
+        """
+        return self._pool.map_async(
+            _simulate_item, list(protocols), callback=callback)
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
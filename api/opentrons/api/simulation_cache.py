@@ -0,0 +1,194 @@
+"""
+In-memory cache of protocol simulation results.
+
+Simulating a protocol re-executes it against the robot, which is slow for
+long protocols and is repeated every time the same protocol is uploaded. The
+cache keys a simulation on the protocol text and on everything outside the
+protocol that can change its outcome: the robot config, the feature flags and
+the state of the labware, pipette and calibration files on disk.
+
+A protocol is assumed to simulate the same way every time for the same key.
+A Python protocol that uses random numbers, the current time or reads other
+files breaks that assumption, and a cache hit would show the commands,
+containers and interactions of an earlier run. Such protocols should be
+loaded with SessionManager.create(..., use_cache=False).
+"""
+import hashlib
+import logging
+import os
+from collections import OrderedDict, namedtuple
+
+from opentrons import robot
+from opentrons.config import get_config_index, feature_flags as ff
+from opentrons.data_storage import database
+from opentrons.robot import robot_configs
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 8
+
+# Robot attributes that are (re)built by Robot.reset() and populated while a
+# protocol is simulated. Restoring these reproduces the post-simulation state
+_ROBOT_STATE = (
+    '_actuators',
+    'gantry',
+    'poses',
+    '_deck',
+    '_fixed_trash',
+    '_instruments',
+    'modules',
+    '_runtime_warnings',
+    '_use_safest_height',
+    '_previous_instrument',
+    '_prev_container',
+    'axis_homed',
+    '_commands',
+)
+
+SimulationResult = namedtuple(
+    'SimulationResult',
+    ['protocol', 'commands', 'containers', 'instruments', 'interactions',
+     'robot_state', 'instrument_state', 'tip_state', 'volume_state'])
+
+
+def _file_state(path):
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return (path, None)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def _dir_state(path):
+    try:
+        names = sorted(os.listdir(path))
+    except (OSError, TypeError):
+        return (path, None)
+    return (path, tuple(_file_state(os.path.join(path, n)) for n in names))
+
+
+def fingerprint(name, text):
+    """
+    Build the cache key for a protocol with the given name and text in the
+    current environment.
+    """
+    index = get_config_index()
+    labware = index.get('labware', {})
+    sources = (
+        _dir_state(labware.get('baseDefinitionDir')),
+        _dir_state(labware.get('userDefinitionDir')),
+        _dir_state(labware.get('offsetDir')),
+        _file_state(index.get('pipetteConfigFile')),
+        _file_state(index.get('featureFlagFile')),
+        _file_state(index.get('deckCalibrationFile')),
+        _file_state(index.get('robotSettingsFile')),
+        _file_state(
+            robot_configs.journal_file(index.get('deckCalibrationFile'))),
+        _file_state(
+            robot_configs.journal_file(index.get('robotSettingsFile'))),
+        _file_state(database.database_path),
+    )
+    flags = sorted(ff.get_all_feature_flags().items())
+
+    digest = hashlib.sha256()
+    for part in (name, text, repr(robot.config), repr(flags), repr(sources)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def capture_robot_state():
+    """
+    Snapshot the robot state left behind by a simulation, together with the
+    state of each loaded instrument.
+    """
+    state = {}
+    for attr in _ROBOT_STATE:
+        value = getattr(robot, attr)
+        if isinstance(value, (dict, list)):
+            value = value.copy()
+        state[attr] = value
+    instrument_state = [
+        (instrument, _copy_containers(vars(instrument)))
+        for instrument in state['_instruments'].values()
+    ]
+    return state, instrument_state
+
+
+def _copy_containers(value):
+    """
+    Copy of the dicts, lists and sets nested in `value`. Other objects (the
+    robot, labware and the like) are shared with the copy.
+    """
+    if type(value) is dict:
+        return {k: _copy_containers(v) for k, v in value.items()}
+    if type(value) is list:
+        return [_copy_containers(v) for v in value]
+    if type(value) is set:
+        return {_copy_containers(v) for v in value}
+    return value
+
+
+def restore_robot_state(state, instrument_state):
+    """
+    Put the robot back into a state captured by :func:`capture_robot_state`.
+    Mover poses are re-read from the driver so that they match the actual
+    position of the (simulated) axes.
+    """
+    for attr, value in state.items():
+        if isinstance(value, (dict, list)):
+            value = value.copy()
+        setattr(robot, attr, value)
+    for instrument, attrs in instrument_state:
+        instrument.__dict__.clear()
+        instrument.__dict__.update(_copy_containers(attrs))
+
+    robot._driver.update_position()
+    for mount in robot._actuators.values():
+        for mover in mount.values():
+            robot.poses = mover.update_pose_from_driver(robot.poses)
+
+
+class SimulationCache(object):
+    """
+    Least-recently-used cache of :class:`SimulationResult` keyed by
+    :func:`fingerprint`.
+
+    Results reference the live deck, labware and instrument objects built
+    during simulation, so they are only valid within the current process and
+    are not persisted.
+    """
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        log.debug('Simulation cache hit for {}'.format(key))
+        return result
+
+    def put(self, key, result):
+        if self.max_size <= 0:
+            return
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -17,9 +17,12 @@ index and config files should reside there. If it doesn't exist yet, data is
 copied there from the prior index, and a new index is written in the USB drive.
 """
 import os
+import copy
 import json
 import logging
 import shutil
+import threading
+import time
 from typing import List, Tuple
 
 log = logging.getLogger(__file__)
@@ -34,6 +37,15 @@ backup_robot_conf = '/etc/robot-data'
 backup_labware_def = '/etc/labware'
 index_filename = 'index.json'
 
+# Seconds during which the config index (and the files read through it, see
+# `file_changed`) are used from memory without checking the disk for changes
+REFRESH_INTERVAL = 1.0
+
+# The index last read: (settings dir, index file state, index), and when the
+# files were last checked for changes
+_index = None
+_index_checked = None
+
 
 def settings_dir():
     """
@@ -67,14 +79,60 @@ def settings_dir():
     return res
 
 
+def file_state(path: str):
+    """
+    Modification time, inode and size of the file at `path`, or ``None`` if
+    there is no such file
+    """
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+
+
+def is_stale(checked) -> bool:
+    """
+    Whether data last checked against the disk at `checked` (a
+    `time.monotonic` value, or ``None`` if never) has to be checked again
+    """
+    return checked is None or time.monotonic() - checked >= REFRESH_INTERVAL
+
+
+def reload():
+    """
+    Forget the config index read from disk, so the next `get_config_index`
+    reads it again
+    """
+    global _index, _index_checked
+    _index = None
+    _index_checked = None
+
+
 def get_config_index() -> dict:
     """
     Load the config index file from the settings directory. The `settings_dir`
     function should guarantee that this file exists.
+
+    The index is kept in memory and only read again when the settings
+    directory or the index file changed, which is checked at most once every
+    `REFRESH_INTERVAL` seconds (see `reload`).
     :return: the contents of the the base config file
     """
+    global _index, _index_checked
+    if _index is None or is_stale(_index_checked):
+        base_path = settings_dir()
+        state = file_state(os.path.join(base_path, index_filename))
+        if _index is None or _index[:2] != (base_path, state):
+            index = _read_config_index(base_path)
+            state = file_state(os.path.join(base_path, index_filename))
+            _index = (base_path, state, index)
+        _index_checked = time.monotonic()
+    return copy.deepcopy(_index[2])
+
+
+def _read_config_index(base_path: str) -> dict:
     rewrite_needed = False
-    base_path = settings_dir()
     file_path = os.path.join(base_path, index_filename)
     with open(file_path) as base_config_file:
         res = json.load(base_config_file)
@@ -201,8 +259,61 @@ def _generate_base_config(skip_usb=False) -> (str, dict):
 
 def write_base_config(path: str, config_data: dict):
     os.makedirs(path, exist_ok=True)
-    with open(os.path.join(path, index_filename), 'w') as base_f:
-        json.dump(config_data, base_f, indent=2)
+    write_json(os.path.join(path, index_filename), config_data, indent=2)
+    reload()
+
+
+def write_json(path: str, data, **dump_args):
+    """
+    Replace the file at `path` with `data` as JSON, atomically: the data is
+    written and synced to a temporary file in the same directory, which is
+    then renamed over `path`. A power loss leaves either the old or the new
+    file, never a truncated one.
+    """
+    write_json_files({path: data}, **dump_args)
+
+
+def write_json_files(files: dict, **dump_args):
+    """
+    Atomically replace each file of `files` (a dict of path to data, see
+    `write_json`), syncing each directory only once after all the renames
+    """
+    directories = set()
+    for path, data in files.items():
+        directory = os.path.dirname(os.path.abspath(path))
+        # unique to the writing thread, which can race with other threads
+        # (or processes) writing the same file
+        temp_path = '{}.{}.{}.tmp'.format(
+            path, os.getpid(), threading.get_ident())
+        try:
+            with open(temp_path, 'w') as temp_file:
+                json.dump(data, temp_file, **dump_args)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        directories.add(directory)
+    for directory in directories:
+        _sync_directory(directory)
+
+
+def _sync_directory(directory: str):
+    """
+    Make the renames in `directory` durable, where the platform allows it
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 
 # ---- Utility functions ----
@@ -1,15 +1,39 @@
 import os
 import json
+import time
+from opentrons import config
 from opentrons.config import get_config_index
 
+# Flags last read: (feature flag file, file state, flags), and when the file
+# was last checked for changes. Flags are checked for every well of labware,
+# so they are kept in memory (see `config.REFRESH_INTERVAL` and `reload`)
+_flags = None
+_flags_checked = None
 
-def get_feature_flag(name: str) -> bool:
-    settings = get_all_feature_flags()
-    return bool(settings.get(name))
 
+def reload():
+    """
+    Forget the flags (and config index) read from disk, so the next check
+    reads them again
+    """
+    global _flags, _flags_checked
+    config.reload()
+    _flags = None
+    _flags_checked = None
 
-def get_all_feature_flags() -> dict:
-    settings_file = get_config_index().get('featureFlagFile')
+
+def _current_flags() -> dict:
+    global _flags, _flags_checked
+    if _flags is None or config.is_stale(_flags_checked):
+        settings_file = get_config_index().get('featureFlagFile')
+        state = config.file_state(settings_file)
+        if _flags is None or _flags[:2] != (settings_file, state):
+            _flags = (settings_file, state, _read_flags(settings_file))
+        _flags_checked = time.monotonic()
+    return _flags[2]
+
+
+def _read_flags(settings_file) -> dict:
     if settings_file and os.path.exists(settings_file):
         with open(settings_file, 'r') as fd:
             settings = json.load(fd)
@@ -18,6 +42,14 @@ def get_all_feature_flags() -> dict:
     return settings
 
 
+def get_feature_flag(name: str) -> bool:
+    return bool(_current_flags().get(name))
+
+
+def get_all_feature_flags() -> dict:
+    return dict(_current_flags())
+
+
 def set_feature_flag(name: str, value):
     settings_file = get_config_index().get('featureFlagFile')
     if os.path.exists(settings_file):
@@ -28,6 +60,7 @@ def set_feature_flag(name: str, value):
         settings = {name: value}
     with open(settings_file, 'w') as fd:
         json.dump(settings, fd)
+    reload()
 
 
 # short_fixed_trash
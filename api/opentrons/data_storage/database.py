@@ -1,5 +1,8 @@
 # pylama:ignore=E252
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 # import warnings
 from typing import List
 from opentrons.containers.placeable import Container, Well
@@ -16,9 +19,75 @@ database_path = environment.get_path('DATABASE_FILE')
 if not fflags.split_labware_definitions():
     log.debug("Database path: {}".format(database_path))
 
+# Rows read from the database for each container name, with the state of the
+# database files they were read from: (state, container row, well rows)
+_container_rows = {}
+
+# Number of Containers columns in a row of the container joined with a well,
+# and the ContainerWells columns following the container name
+_CONTAINER_COLUMNS = len(db_queries.CONTAINER_COLUMNS)
+_WELL_COLUMNS = (
+    'location', 'x', 'y', 'z', 'depth', 'volume', 'diameter', 'length',
+    'width')
+_WELL_PROPERTIES = (
+    'depth', 'total-liquid-volume', 'diameter', 'length', 'width')
+
+# Number of prepared statements each connection keeps for reuse
+CACHED_STATEMENTS = 128
+
+# Per-thread connection to the database (see `_connection`)
+_local = threading.local()
+
 # ======================== Private Functions ======================== #
 
 
+class _TransactionConnection(object):
+    """
+    Connection handed out within `transaction()`. Statements run on the
+    thread's connection, but leaving a `with` block does not commit them,
+    so the query functions join the surrounding transaction.
+    """
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+def _open_connection(path: str):
+    db_conn = sqlite3.connect(path, cached_statements=CACHED_STATEMENTS)
+    try:
+        # readers no longer block on writers, and commits don't rewrite
+        # the database file
+        db_conn.execute('PRAGMA journal_mode=WAL')
+        # the log is created by the first read, do it now so the state of
+        # the database files does not change on the next query
+        db_conn.execute('SELECT count(*) FROM sqlite_master').fetchone()
+    except sqlite3.DatabaseError:
+        log.exception('Could not enable write-ahead logging')
+    return db_conn
+
+
+def _connection():
+    """
+    Connection to `database_path` for the current thread. It is opened on
+    first use and kept open, so statements prepared on it are reused.
+    """
+    db_conn = getattr(_local, 'connection', None)
+    if db_conn is None or _local.path != database_path:
+        close()
+        db_conn = _local.connection = _open_connection(database_path)
+        _local.path = database_path
+        _local.transaction = None
+    return _local.transaction or db_conn
+
+
 def _parse_container_obj(container: Container):
     # Note: in the new labware system, container coordinates are always (0,0,0)
     return dict(zip('xyz', container._coordinates))
@@ -47,32 +116,76 @@ def _create_container_obj_in_db(db, container: Container, container_name: str):
     db_queries.create_container(
         db, container_name, **_parse_container_obj(container)
     )
-    for well in iter(container):
-        _create_well_obj_in_db(db, container_name, well)
-
-
-def _load_container_object_from_db(db, container_name: str):
-    db_data = db_queries.get_container_by_name(db, container_name)
-    if not db_data:
+    db_queries.insert_wells_into_db(db, [
+        _well_row(container_name, well) for well in iter(container)])
+
+
+def _database_state():
+    """
+    Path, and modification time, inode and size of the database file and of
+    its write-ahead log, used to tell when cached rows are out of date
+    """
+    state = [database_path]
+    for path in (database_path, database_path + '-wal'):
+        try:
+            stat = os.stat(path)
+            state.append((stat.st_mtime_ns, stat.st_ino, stat.st_size))
+        except (OSError, TypeError):
+            state.append(None)
+    return tuple(state)
+
+
+def _load_container_rows_from_db(db, container_name: str):
+    rows = db_queries.get_container_with_wells(db, container_name)
+    if not rows:
         raise ValueError(
             "No container with name {} found in Containers database"
             .format(container_name)
         )
 
-    container_type, *rel_coords = db_data
-    wells = db_queries.get_wells_by_container_name(db, container_name)
+    # each row is the container's columns followed by one well's columns
+    db_data = rows[0][:_CONTAINER_COLUMNS]
+    wells = [
+        row[_CONTAINER_COLUMNS:] for row in rows
+        if row[_CONTAINER_COLUMNS] is not None]
     if not wells:
         raise ResourceWarning(
             "No wells for container {} found in ContainerWells database"
             .format(container_name)
         )
+    return db_data, wells
+
+
+def _load_cached_container(container_name: str):
+    """
+    Container built from the rows of `container_name`, which are only read
+    from the database again when its files changed
+    """
+    # opening the connection creates the write-ahead log
+    db_conn = _connection()
+    state = _database_state()
+    cached = _container_rows.get(container_name)
+    if cached is None or cached[0] != state:
+        cached = (state,) + _load_container_rows_from_db(
+            db_conn, container_name)
+        _container_rows[container_name] = cached
+    _, db_data, wells = cached
+    return _container_from_rows(db_data, wells)
+
 
+def _load_container_object_from_db(db, container_name: str):
+    return _container_from_rows(
+        *_load_container_rows_from_db(db, container_name))
+
+
+def _container_from_rows(db_data, wells):
+    container_type, *rel_coords = db_data
     container = Container()
     container.properties['type'] = container_type
     container._coordinates = Vector(rel_coords)
     log.debug("Loading {} with coords {}".format(rel_coords, container_type))
     for well in wells:
-        container.add(*_load_well_object_from_db(db, well))
+        container.add(*_load_well_object_from_db(well))
     return container
 
 
@@ -92,21 +205,16 @@ def _delete_container_object_in_db(db, container_name: str):
     db_queries.delete_container(db, container_name)
 
 
-def _create_well_obj_in_db(db, container_name: str, well: Well):
+def _well_row(container_name: str, well: Well) -> tuple:
     well_data = _parse_well_obj(well)
-    db_queries.insert_well_into_db(
-        db_conn=db, container_name=container_name, **well_data
-    )
-
+    return (container_name,) + tuple(
+        well_data[column] for column in _WELL_COLUMNS)
 
-def _load_well_object_from_db(db, well_data):
-    container_name, location, x, y, z, \
-        depth, volume, diameter, length, width = well_data
 
-    props = zip(['depth', 'total-liquid-volume',
-                 'diameter', 'length', 'width'],
-                [depth, volume, diameter, length, width])
-    property_dict = {k: v for k, v in props if v}
+def _load_well_object_from_db(well_data):
+    location, x, y, z = well_data[1:5]
+    property_dict = {
+        k: v for k, v in zip(_WELL_PROPERTIES, well_data[5:]) if v}
     well = Well(properties=property_dict)
     # subtract half the size, because
     # Placeable assigns X-Y to bottom-left corner,
@@ -141,7 +249,7 @@ def _get_db_version(db):
 
 def _calculate_offset(labware: Container) -> dict:
     new_definition = serializers.labware_to_json(labware)
-    base_definition = ldef.load_json(
+    base_definition = ldef.load_json_view(
         new_definition['metadata']['name'], with_offset=False)
     first_well = list(base_definition['wells'].keys())[0]
     base_well = base_definition['wells'][first_well]
@@ -160,13 +268,53 @@ def _calculate_offset(labware: Container) -> dict:
 
 
 # ======================== Public Functions ======================== #
+@contextmanager
+def transaction():
+    """
+    Run the database writes made within the block in a single transaction,
+    committed when the block exits or rolled back if it raises. Nested
+    transactions are part of the outermost one.
+
+    >>> with transaction(): # doctest: +SKIP
+    ...     for container in containers:
+    ...         overwrite_container(container)
+    """
+    db_conn = _connection()
+    if isinstance(db_conn, _TransactionConnection):
+        yield
+        return
+    _local.transaction = _TransactionConnection(db_conn)
+    try:
+        yield
+    except Exception:
+        db_conn.rollback()
+        raise
+    else:
+        db_conn.commit()
+    finally:
+        _local.transaction = None
+
+
+def close():
+    """
+    Close the current thread's database connection, if it has one
+    """
+    db_conn = getattr(_local, 'connection', None)
+    if db_conn is not None:
+        db_conn.close()
+    _local.connection = None
+    _local.transaction = None
+
+
 def save_new_container(container: Container, container_name: str) -> bool:
     if fflags.split_labware_definitions():
         # warnings.warn('save_new_container is deprecated, please use save_labware')  # noqa
         res = save_labware(container, container_name)
     else:
-        db_conn = sqlite3.connect(database_path)
-        _create_container_obj_in_db(db_conn, container, container_name)
+        with transaction():
+            _create_container_obj_in_db(
+                _connection(), container, container_name)
+        _container_rows.pop(container_name, None)
         res = True  # old create fn does not return anything
     return res
 
@@ -181,13 +329,12 @@ def load_container(container_name: str) -> Container:
         # warnings.warn('save_new_container is deprecated, please use save_labware')  # noqa
         res = load_labware(container_name)
     else:
-        db_conn = sqlite3.connect(database_path)
-        res = _load_container_object_from_db(db_conn, container_name)
+        res = _load_cached_container(container_name)
     return res
 
 
 def load_labware(labware_name: str) -> Container:
-    jdef = ldef.load_json(labware_name)
+    jdef = ldef.load_json_view(labware_name)
     return serializers.json_to_labware(jdef)
 
 
@@ -198,8 +345,9 @@ def overwrite_container(container: Container) -> bool:
     else:
         log.debug("Overwriting container definition: {}".format(
             container.get_type()))
-        db_conn = sqlite3.connect(database_path)
-        _update_container_object_in_db(db_conn, container)
+        with transaction():
+            _update_container_object_in_db(_connection(), container)
+        _container_rows.pop(container.get_type(), None)
         res = True  # old overwrite fn does not return anything
     return res
 
@@ -216,8 +364,9 @@ def delete_container(container_name) -> bool:
     if fflags.split_labware_definitions():
         raise NotImplementedError  # What should delete do in the new system?
     else:
-        db_conn = sqlite3.connect(database_path)
-        _delete_container_object_in_db(db_conn, container_name)
+        with transaction():
+            _delete_container_object_in_db(_connection(), container_name)
+        _container_rows.pop(container_name, None)
         res = True  # old delete fn does not return anything
     return res
 
@@ -227,7 +376,7 @@ def list_all_containers() -> List[str]:
         # warnings.warn('list_all_containers is deprecated, please use list_all_labware')  # noqa
         res = list_all_labware()
     else:
-        db_conn = sqlite3.connect(database_path)
+        db_conn = _connection()
         res = _list_all_containers_by_name(db_conn)
     return res
 
@@ -240,7 +389,7 @@ def load_module(module_name: str) -> Container:
     if fflags.split_labware_definitions():
         raise NotImplementedError
     else:
-        db_conn = sqlite3.connect(database_path)
+        db_conn = _connection()
         res = _load_module_dict_from_db(db_conn, module_name)
     return res
 
@@ -250,6 +399,7 @@ def change_database(db_path: str):
     if fflags.split_labware_definitions():
         # warnings.warn('database operations no longer have an effect')
         pass
+    close()
     database_path = db_path
 
 
@@ -258,7 +408,7 @@ def get_version():
     if fflags.split_labware_definitions():
         # warnings.warn('database operations no longer have an effect')
         pass
-    db_conn = sqlite3.connect(database_path)
+    db_conn = _connection()
     return _get_db_version(db_conn)
 
 
@@ -266,7 +416,7 @@ def set_version(version):
     if fflags.split_labware_definitions():
         # warnings.warn('database operations no longer have an effect')
         pass
-    db_conn = sqlite3.connect(database_path)
+    db_conn = _connection()
     db_queries.set_user_version(db_conn, version)
 
 # ======================== END Public Functions ======================== #
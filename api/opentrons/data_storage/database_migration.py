@@ -6,7 +6,8 @@ from opentrons.data_storage.old_container_loading import \
     get_persisted_container
 from opentrons.util import environment
 from opentrons.data_storage.schema_changes import \
-    create_table_ContainerWells, create_table_Containers
+    create_table_ContainerWells, create_table_Containers, \
+    create_index_ContainerWells
 from opentrons.util.vector import Vector
 
 
@@ -50,17 +51,18 @@ def migrate_containers_and_wells():
     load_all_containers_from_disk()
     print("Json container file load complete.")
     print("Starting migration...")
-    for container_name in list_container_names():
-        print('migrating {} from json to database'.format(container_name))
-        container = get_persisted_container(container_name)
-
-        container = rotate_container_for_alpha(container)
-        print(
-            "CONTAINER: {}, {}".format(
-                container_name,
-                container._coordinates))
-
-        database.save_new_container(container, container_name)
+    with database.transaction():
+        for container_name in list_container_names():
+            print('migrating {} from json to database'.format(container_name))
+            container = get_persisted_container(container_name)
+
+            container = rotate_container_for_alpha(container)
+            print(
+                "CONTAINER: {}, {}".format(
+                    container_name,
+                    container._coordinates))
+
+            database.save_new_container(container, container_name)
     print("Database migration complete!")
 
 
@@ -79,5 +81,9 @@ def check_version_and_perform_necessary_migrations():
     if db_version == 0:
         execute_schema_change(conn, create_table_ContainerWells)
         execute_schema_change(conn, create_table_Containers)
+        execute_schema_change(conn, create_index_ContainerWells)
         migrate_containers_and_wells()
-        database.set_version(1)
+        database.set_version(2)
+    elif db_version == 1:
+        execute_schema_change(conn, create_index_ContainerWells)
+        database.set_version(2)
@@ -18,6 +18,14 @@ def set_user_version(db_conn, version):
 
 
 # ------------- Container Functions -------------#
+# Columns of the Containers and ContainerWells tables, in the order of the
+# rows returned by `get_container_with_wells`
+CONTAINER_COLUMNS = ('name', 'relative_x', 'relative_y', 'relative_z')
+WELL_COLUMNS = (
+    'container_name', 'location', 'relative_x', 'relative_y', 'relative_z',
+    'depth', 'volume', 'diameter', 'length', 'width')
+
+
 def get_all_container_names(db_conn):
     with db_conn:
         cursor = db_conn.cursor()
@@ -43,6 +51,28 @@ def get_container_by_name(db_conn, container_name):
         return cursor.fetchone()
 
 
+def get_container_with_wells(db_conn, container_name):
+    """
+    Rows of a container joined with each of its wells: the
+    `CONTAINER_COLUMNS` followed by the `WELL_COLUMNS` (all None if the
+    container has no wells)
+    """
+    columns = ['Containers.' + column for column in CONTAINER_COLUMNS] + \
+        ['ContainerWells.' + column for column in WELL_COLUMNS]
+    with db_conn:
+        cursor = db_conn.cursor()
+        cursor.execute(
+            '''
+            SELECT {} FROM Containers
+            LEFT JOIN ContainerWells
+            ON ContainerWells.container_name = Containers.name
+            WHERE Containers.name=?
+            '''.format(', '.join(columns)),
+            (container_name,)
+        )
+        return cursor.fetchall()
+
+
 def update_container(db_conn, container_name, x, y, z):
     with db_conn:
         db_conn.execute(
@@ -69,33 +99,15 @@ def delete_container(db_conn, container_name):
 
 
 # ------------- Well Functions -------------#
-def insert_well_into_db(db_conn, container_name, location, x, y, z,
-                        depth, volume, diameter, length, width):
+def insert_wells_into_db(db_conn, wells):
+    """
+    Insert many wells at once, each a tuple of the ContainerWells columns
+    """
     with db_conn:
-        db_conn.execute(
+        db_conn.executemany(
             'INSERT INTO ContainerWells VALUES (?,?,?,?,?,?,?,?,?,?)',
-            (
-                container_name,
-                location,
-                x,
-                y,
-                z,
-                depth,
-                volume,
-                diameter,
-                length,
-                width,)
-        )
-
-
-def get_wells_by_container_name(db_conn, container_name):
-    with db_conn:
-        cursor = db_conn.cursor()
-        cursor.execute(
-            'SELECT * from ContainerWells WHERE container_name=?',
-            (container_name,)
+            wells
         )
-        return cursor.fetchall()
 
 
 def delete_wells_by_container_name(db_conn, container_name):
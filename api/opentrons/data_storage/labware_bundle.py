@@ -0,0 +1,213 @@
+# pylama:ignore=E252
+"""
+Precompiled bundle of the default labware definitions.
+
+Parsing the JSON definitions is a large part of loading labware on the
+robot. A bundle holds every definition of a directory in a single file:
+
+- a header (magic, format version and length of the index)
+- a JSON index with, for each labware, its metadata, ordering, well names,
+  the first row of its wells in the geometry array and the size and
+  modification time of the definition file it was built from
+- a little-endian float64 array with one row per well and one column per
+  field of :data:`WELL_FIELDS` (``nan`` where a well has no such field)
+
+The file is memory-mapped and the geometry array is read in place, so
+opening a bundle only parses the (small) index. Definitions are only taken
+from the bundle if their JSON file did not change since it was built;
+anything else, including user definitions, is loaded from JSON.
+
+Build a bundle with (this module only needs numpy, so it can run without
+importing and setting up the rest of the package)::
+
+    python opentrons/data_storage/labware_bundle.py <definition dir> [<path>]
+"""
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+from types import MappingProxyType
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+BUNDLE_MAGIC = b'OTLB'
+BUNDLE_VERSION = 1
+BUNDLE_EXTENSION = '.bundle'
+WELL_FIELDS = (
+    'x', 'y', 'z', 'depth', 'diameter', 'height', 'length', 'width',
+    'total-liquid-volume')
+
+_HEADER = struct.Struct('<4sII')
+_DTYPE = np.dtype('<f8')
+
+# Opened bundles, by path: (file state, bundle)
+_bundles = {}
+
+
+def default_bundle_path(definition_dir: str) -> str:
+    """
+    Bundle of the definitions in `definition_dir`, which sits next to it
+    (for example ``/etc/labware.bundle`` for ``/etc/labware``)
+    """
+    return os.path.normpath(definition_dir) + BUNDLE_EXTENSION
+
+
+def _file_state(path: str) -> tuple:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _DTYPE.itemsize) * _DTYPE.itemsize
+
+
+def build(definition_dir: str, path: str=None) -> str:
+    """
+    Compile every definition of `definition_dir` into a bundle at `path`
+    (defaults to :func:`default_bundle_path`)
+
+    :return: the path of the bundle
+    """
+    if path is None:
+        path = default_bundle_path(definition_dir)
+    index = {}
+    rows = []
+    for filename in sorted(os.listdir(definition_dir)):
+        name, extension = os.path.splitext(filename)
+        if extension != '.json':
+            continue
+        source = os.path.join(definition_dir, filename)
+        with open(source) as definition_file:
+            definition = json.load(definition_file)
+        wells = definition['wells']
+        index[name] = {
+            'metadata': definition['metadata'],
+            'ordering': definition['ordering'],
+            'wells': list(wells),
+            'start': len(rows),
+            'source': list(_file_state(source))
+        }
+        rows.extend(
+            [well.get(field, np.nan) for field in WELL_FIELDS]
+            for well in wells.values())
+
+    encoded = json.dumps(
+        {'fields': WELL_FIELDS, 'labware': index}).encode('utf-8')
+    array_offset = _align(_HEADER.size + len(encoded))
+    geometry = np.array(rows, dtype=_DTYPE).reshape(-1, len(WELL_FIELDS))
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as bundle_file:
+        bundle_file.write(
+            _HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(encoded)))
+        bundle_file.write(encoded.ljust(array_offset - _HEADER.size, b'\0'))
+        bundle_file.write(geometry.tobytes())
+    os.replace(temp_path, path)
+    _bundles.pop(path, None)
+    log.info('Bundled {} labware definitions ({} wells) into {}'.format(
+        len(index), len(rows), path))
+    return path
+
+
+class LabwareBundle(object):
+    """
+    A memory-mapped bundle, see :func:`build`
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as bundle_file:
+            self._map = mmap.mmap(
+                bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = _HEADER.unpack_from(self._map)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            raise ValueError('{} is not a version {} labware bundle'.format(
+                path, BUNDLE_VERSION))
+        index = json.loads(
+            self._map[_HEADER.size:_HEADER.size + index_length].decode(
+                'utf-8'))
+        self.fields = tuple(index['fields'])
+        self._index = index['labware']
+        self.geometry = np.frombuffer(
+            self._map,
+            dtype=_DTYPE,
+            offset=_align(_HEADER.size + index_length)
+        ).reshape(-1, len(self.fields))
+        self._definitions = {}
+
+    def __contains__(self, labware_name):
+        return labware_name in self._index
+
+    def names(self):
+        return sorted(self._index)
+
+    def is_current(self, labware_name: str, definition_dir: str) -> bool:
+        """
+        Whether the definition file of `labware_name` in `definition_dir` is
+        still the one the bundle was built from
+        """
+        source = os.path.join(definition_dir, '{}.json'.format(labware_name))
+        try:
+            state = _file_state(source)
+        except (FileNotFoundError, TypeError):
+            return False
+        return list(state) == self._index[labware_name]['source']
+
+    def definition(self, labware_name: str):
+        """
+        Read-only definition of `labware_name`, in the format of the JSON
+        definition files
+
+        :raises KeyError: if `labware_name` is not in the bundle
+        """
+        definition = self._definitions.get(labware_name)
+        if definition is None:
+            definition = self._definitions[labware_name] = \
+                self._read_definition(labware_name)
+        return definition
+
+    def _read_definition(self, labware_name: str):
+        entry = self._index[labware_name]
+        names = entry['wells']
+        start = entry['start']
+        wells = {}
+        for name, row in zip(
+                names, self.geometry[start:start + len(names)].tolist()):
+            wells[name] = MappingProxyType({
+                field: value for field, value in zip(self.fields, row)
+                if not math.isnan(value)})
+        return MappingProxyType({
+            'metadata': MappingProxyType(entry['metadata']),
+            'wells': MappingProxyType(wells),
+            'ordering': tuple(tuple(group) for group in entry['ordering'])
+        })
+
+
+def get_bundle(path: str):
+    """
+    Bundle at `path`, or ``None`` if there is no valid bundle there. A
+    bundle is opened again when its file changed.
+    """
+    try:
+        state = _file_state(path)
+    except (FileNotFoundError, TypeError):
+        return None
+    cached = _bundles.get(path)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+    try:
+        bundle = LabwareBundle(path)
+    except (ValueError, struct.error) as e:
+        log.warning('Ignoring labware bundle {}: {}'.format(path, e))
+        bundle = None
+    _bundles[path] = (state, bundle)
+    return bundle
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    print(build(*sys.argv[1:3]))
@@ -0,0 +1,212 @@
+# pylama:ignore=E252
+"""
+Catalog of the labware definitions, to list and search labware without
+loading every definition.
+
+The catalog keeps a summary of each definition file (well count, largest
+well volume, footprint and checksum) and is saved next to the user
+definition directory. It is updated incrementally: only files that were
+added or changed since the last update (by modification time and size) are
+read. As with `labware_definitions.load_json`, user definitions take
+precedence over default definitions of the same name.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import namedtuple
+
+from opentrons import config
+from opentrons.data_storage import labware_definitions as ldef
+
+log = logging.getLogger(__name__)
+
+CATALOG_VERSION = 1
+CATALOG_FILENAME = 'catalog.json'
+
+LabwareEntry = namedtuple(
+    'LabwareEntry',
+    ['name', 'source', 'wells', 'max_volume', 'footprint', 'checksum'])
+
+# Summaries of the definition files by directory and name: (file state,
+# entry), and when the directories were last checked for changes
+_catalog = None
+_catalog_checked = None
+
+
+def catalog_file() -> str:
+    user_dir = ldef.user_defn_dir()
+    if user_dir is None:
+        return None
+    return os.path.join(
+        os.path.dirname(os.path.normpath(user_dir)), CATALOG_FILENAME)
+
+
+def _footprint(wells) -> list:
+    """
+    Size along x and y of the area covered by `wells`
+    """
+    low = [float('inf')] * 2
+    high = [float('-inf')] * 2
+    for well in wells:
+        radius = well.get('diameter', 0) / 2
+        half_sizes = (
+            max(well.get('width', 0) / 2, radius),
+            max(well.get('length', 0) / 2, radius))
+        for axis, (key, half) in enumerate(zip('xy', half_sizes)):
+            low[axis] = min(low[axis], well[key] - half)
+            high[axis] = max(high[axis], well[key] + half)
+    if not wells:
+        return [0, 0]
+    return [round(h - lo, 2) for lo, h in zip(low, high)]
+
+
+def _summarize(path: str, name: str, source: str) -> LabwareEntry:
+    with open(path, 'rb') as definition_file:
+        contents = definition_file.read()
+    definition = json.loads(contents.decode('utf-8'))
+    wells = list(definition['wells'].values())
+    return LabwareEntry(
+        name=name,
+        source=source,
+        wells=len(wells),
+        max_volume=max(
+            [w.get('total-liquid-volume', 0) for w in wells], default=0),
+        footprint=_footprint(wells),
+        checksum=hashlib.sha1(contents).hexdigest())
+
+
+def _read_catalog(path: str) -> dict:
+    try:
+        with open(path) as catalog:
+            data = json.load(catalog)
+    except (OSError, TypeError, ValueError):
+        return {}
+    if data.get('version') != CATALOG_VERSION:
+        return {}
+    return {
+        directory: {
+            name: (tuple(state), LabwareEntry(**entry))
+            for name, (state, entry) in entries.items()}
+        for directory, entries in data.get('labware', {}).items()}
+
+
+def _write_catalog(path: str, catalog: dict):
+    data = {
+        'version': CATALOG_VERSION,
+        'labware': {
+            directory: {
+                name: [state, entry._asdict()]
+                for name, (state, entry) in entries.items()}
+            for directory, entries in catalog.items()}
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as catalog_file:
+            json.dump(data, catalog_file)
+        os.replace(temp_path, path)
+    except OSError:
+        log.exception('Unable to save the labware catalog to {}'.format(path))
+
+
+def _update_directory(directory: str, source: str, entries: dict) -> dict:
+    """
+    Summaries of the definitions in `directory`, reusing those of `entries`
+    for files that did not change
+    """
+    updated = {}
+    try:
+        filenames = os.listdir(directory)
+    except (FileNotFoundError, NotADirectoryError):
+        filenames = []
+    for filename in filenames:
+        name, extension = os.path.splitext(filename)
+        if extension != '.json':
+            continue
+        path = os.path.join(directory, filename)
+        state = config.file_state(path)
+        if state is None:
+            continue
+        state = (state[0], state[2])
+        cached = entries.get(name)
+        if cached is not None and cached[0] == state:
+            updated[name] = cached
+            continue
+        try:
+            updated[name] = (state, _summarize(path, name, source))
+        except (OSError, ValueError, KeyError, TypeError):
+            log.warning('Not cataloging invalid definition {}'.format(path))
+    return updated
+
+
+def update(force: bool=False) -> dict:
+    """
+    Bring the catalog up to date with the definition directories, which are
+    checked at most once every `config.REFRESH_INTERVAL` seconds unless
+    `force` is set
+
+    :return: the entries of every labware, by name
+    """
+    global _catalog, _catalog_checked
+    path = catalog_file()
+    if _catalog is None:
+        _catalog = _read_catalog(path)
+    if force or config.is_stale(_catalog_checked):
+        directories = [
+            (ldef.default_definition_dir(), 'default'),
+            (ldef.user_defn_dir(), 'user')]
+        catalog = {
+            directory: _update_directory(
+                directory, source, _catalog.get(directory, {}))
+            for directory, source in directories if directory}
+        if catalog != _catalog:
+            if path:
+                _write_catalog(path, catalog)
+            _catalog = catalog
+        _catalog_checked = time.monotonic()
+    return _entries()
+
+
+def _entries() -> dict:
+    entries = {}
+    for source in ('default', 'user'):
+        for directory_entries in _catalog.values():
+            for name, (_, entry) in directory_entries.items():
+                if entry.source == source:
+                    entries[name] = entry
+    return entries
+
+
+def reload():
+    """
+    Forget the catalog in memory, so the next `update` reads it from disk
+    and checks every definition file again
+    """
+    global _catalog, _catalog_checked
+    _catalog = None
+    _catalog_checked = None
+
+
+def search(
+        name: str=None,
+        min_wells: int=None,
+        max_wells: int=None,
+        min_volume: float=None,
+        max_volume: float=None) -> list:
+    """
+    Entries of the labware matching all of the given criteria, sorted by
+    name. `name` matches any part of the name; volumes are compared to the
+    largest well of each labware.
+    """
+    def matches(entry):
+        return (name is None or name in entry.name) and \
+            (min_wells is None or entry.wells >= min_wells) and \
+            (max_wells is None or entry.wells <= max_wells) and \
+            (min_volume is None or entry.max_volume >= min_volume) and \
+            (max_volume is None or entry.max_volume <= max_volume)
+
+    return sorted(
+        (entry for entry in update().values() if matches(entry)),
+        key=lambda entry: entry.name)
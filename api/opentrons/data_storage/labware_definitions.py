@@ -1,8 +1,11 @@
 # pylama:ignore=E252
 import os
 import json
+from types import MappingProxyType
 from typing import List
+from opentrons import config
 from opentrons.config import get_config_index
+from opentrons.data_storage import labware_bundle
 
 """
 There will be 3 directories for json blobs to define labware:
@@ -110,6 +113,10 @@ Notes:
 # repository for development purposes
 FILE_DIR = os.path.abspath(os.path.dirname(__file__))
 
+# Parsed definition and offset files, by path: (file state, contents). The
+# contents are frozen so they can be shared by every load of the same file
+_json_cache = {}
+
 
 def default_definition_dir():
     return get_config_index().get('labware', {}).get('baseDefinitionDir')
@@ -123,33 +130,111 @@ def offset_dir():
     return get_config_index().get('labware', {}).get('offsetDir')
 
 
-def _load_definition(path: str, labware_name: str) -> dict:
+def _freeze(data):
+    """
+    Read-only version of parsed JSON: dicts become mappings proxies and
+    lists become tuples
+    """
+    if isinstance(data, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in data.items()})
+    if isinstance(data, list):
+        return tuple(_freeze(v) for v in data)
+    return data
+
+
+def _thaw(data):
+    """
+    Plain dict and list copy of data frozen by `_freeze`
+    """
+    if isinstance(data, (dict, MappingProxyType)):
+        return {k: _thaw(v) for k, v in data.items()}
+    if isinstance(data, tuple):
+        return [_thaw(v) for v in data]
+    return data
+
+
+def _file_state(path: str) -> tuple:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+
+
+def _read_json(path: str):
+    """
+    Frozen contents of the JSON file at `path`. Files are only parsed again
+    when their modification time, inode or size changed.
+
+    :raises FileNotFoundError: if there is no file at `path`
+    """
+    state = _file_state(path)
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+    with open(path) as json_file:
+        contents = _freeze(json.load(json_file))
+    _json_cache[path] = (state, contents)
+    return contents
+
+
+def _cached_definition(path: str, labware_name: str):
     definition_file = os.path.join(
         path, "{}.json".format(labware_name))
     try:
-        with open(definition_file) as defn_f:
-            lw = json.load(defn_f)
-    except FileNotFoundError:
+        lw = _read_json(definition_file)
+    except (FileNotFoundError, TypeError):
         lw = {}
-    # from pprint import pprint
-    # print("Labware definition:")
-    # pprint(lw)
     return lw
 
 
-def _load_offset(path: str, labware_name: str) -> dict:
+def _cached_offset(path: str, labware_name: str):
     offset_file = os.path.join(
         path, "{}.json".format(labware_name))
-    offs = {}
     try:
-        if os.path.exists(offset_file):
-            with open(offset_file) as offs_f:
-                offs = json.load(offs_f)
-    except FileNotFoundError:
-        pass
+        offs = _read_json(offset_file)
+    except (FileNotFoundError, TypeError):
+        offs = {}
     return offs
 
 
+def _load_definition(path: str, labware_name: str) -> dict:
+    return _thaw(_cached_definition(path, labware_name))
+
+
+def _load_offset(path: str, labware_name: str) -> dict:
+    return _thaw(_cached_offset(path, labware_name))
+
+
+def _load_bundled(path: str, labware_name: str) -> dict:
+    """
+    Definition of `labware_name` from the bundle of the definition directory
+    `path`, or an empty dict if it is not bundled or its JSON file changed
+    since the bundle was built
+    """
+    if path is None:
+        return {}
+    bundle = labware_bundle.get_bundle(
+        labware_bundle.default_bundle_path(path))
+    if bundle is None or labware_name not in bundle \
+            or not bundle.is_current(labware_name, path):
+        return {}
+    return bundle.definition(labware_name)
+
+
+def _apply_offset(lw: dict, offs: dict) -> dict:
+    """
+    Copy of the definition `lw` with the offset `offs` added to each well.
+    Only the wells are copied, the rest of the definition is shared.
+    """
+    wells = {}
+    for name, well in lw['wells'].items():
+        moved = dict(well)
+        for axis in 'xyz':
+            moved[axis] = round(well[axis] + offs[axis], 2)
+        wells[name] = MappingProxyType(moved)
+    definition = dict(lw)
+    definition['wells'] = MappingProxyType(wells)
+    return MappingProxyType(definition)
+
+
 def _load(default_defn_dir: str,
           user_defn_root_path: str,
           labware_name: str,
@@ -157,8 +242,9 @@ def _load(default_defn_dir: str,
           with_offset: bool) -> dict:
     """
     Try to find definition file in <user_defn_dir> first, then fall back to
-    <default_defn_dir>. If a definition is found in either place, look for an
-    offset file in <offset_dir> and apply it if found.
+    the bundle of <default_defn_dir> (see `labware_bundle`) and to the files
+    in <default_defn_dir>. If a definition is found, look for an offset file
+    in <offset_dir> and apply it if found.
 
     If no definition file is found, raise a FileNotFoundException.
 
@@ -167,26 +253,39 @@ def _load(default_defn_dir: str,
     :param labware_name: Name of labware definition file (without extension)
     :param with_offset: A boolean flag to control whether the offset file
         should also be loaded and applied, if one exists
-    :return: a dict of the definition with offset applied to each well
+    :return: a read-only mapping of the definition with offset applied to
+        each well
     """
-    lw = _load_definition(user_defn_root_path, labware_name)
+    lw = _cached_definition(user_defn_root_path, labware_name)
     if not lw:
-        lw = _load_definition(default_defn_dir, labware_name)
+        lw = _load_bundled(default_defn_dir, labware_name)
+    if not lw:
+        lw = _cached_definition(default_defn_dir, labware_name)
     if not lw:
         raise FileNotFoundError
-    offs = _load_offset(offset_dir_path, labware_name) if with_offset else None
+    offs = _cached_offset(offset_dir_path, labware_name) \
+        if with_offset else None
 
     if offs:
-        for well in lw['wells'].keys():
-            for axis in 'xyz':
-                default_value = lw['wells'][well][axis]
-                offset = offs[axis]
-                lw['wells'][well][axis] = round(default_value + offset, 2)
+        lw = _apply_offset(lw, offs)
 
     return lw
 
 
 def load_json(labware_name: str, with_offset: bool=True) -> dict:
+    """
+    Definition of `labware_name` as plain dicts and lists, which the caller
+    may modify or serialize
+    """
+    return _thaw(load_json_view(labware_name, with_offset))
+
+
+def load_json_view(labware_name: str, with_offset: bool=True):
+    """
+    Like `load_json`, but returns the read-only definition shared by every
+    load of `labware_name`, without copying it. Use it only to read the
+    definition.
+    """
     return _load(
         default_definition_dir(),
         user_defn_dir(),
@@ -212,8 +311,9 @@ def list_all_labware() -> List[str]:
 def _save_user_definition(path: str, defn: dict) -> bool:
     filename = os.path.join(
         path, '{}.json'.format(defn['metadata']['name']))
-    with open(filename, 'w') as def_file:
-        json.dump(defn, def_file, indent=2)
+    config.write_json(filename, defn, indent=2)
+    # the file can change within the resolution of its modification time
+    _json_cache.pop(filename, None)
     # Once possible failures are understood, catch and return a success code
     return True
 
@@ -221,8 +321,8 @@ def _save_user_definition(path: str, defn: dict) -> bool:
 def _save_offset(path: str, name: str, offset: dict):
     filename = os.path.join(
         path, '{}.json'.format(name))
-    with open(filename, 'w') as offset_file:
-        json.dump(offset, offset_file, indent=2)
+    config.write_json(filename, offset, indent=2)
+    _json_cache.pop(filename, None)
     # Once possible failures are understood, catch and return a success code
     return True
 
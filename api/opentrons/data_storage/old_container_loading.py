@@ -9,7 +9,6 @@ import copy
 import json
 import numbers
 import os
-import pkg_resources
 from collections import OrderedDict
 from opentrons.containers.placeable import Container, Well
 from opentrons.util import environment
@@ -18,8 +17,9 @@ from opentrons.util.vector import Vector
 persisted_containers_dict = {}
 containers_file_list = []
 
-containers_dir_path = pkg_resources.resource_filename(
-    'opentrons.config',
+containers_dir_path = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'config',
     'containers'
 )
 
@@ -21,3 +21,7 @@ create_table_Containers = """ CREATE TABLE Containers (
                                     relative_y INTEGER DEFAULT 0,
                                     relative_z INTEGER DEFAULT 0
                                 ); """
+
+create_index_ContainerWells = """CREATE INDEX IF NOT EXISTS
+                                    ContainerWells_container_name
+                                    ON ContainerWells(container_name); """
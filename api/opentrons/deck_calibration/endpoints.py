@@ -7,6 +7,7 @@ from opentrons.deck_calibration import jog, position, dots_set, z_pos
 from opentrons.deck_calibration.linal import add_z, solve
 from typing import Dict, Tuple
 
+import asyncio
 import logging
 import json
 
@@ -367,6 +368,20 @@ async def save_z(data):
     return web.json_response({'message': message}, status=status)
 
 
+def _write_config(config):
+    robot_configs.save_deck_calibration(config)
+    robot_configs.backup_configuration(config)
+
+
+async def _save_config(config):
+    """
+    Write the calibration files from a thread, so the event loop keeps
+    serving requests while they are synced to disk
+    """
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, _write_config, config)
+
+
 async def save_transform(data):
     """
     Calculate the transormation matrix that calibrates the gantry to the deck
@@ -397,8 +412,7 @@ async def save_transform(data):
             gantry_calibration=list(
                 map(lambda i: list(i), calibration_matrix)))
 
-        robot_configs.save_deck_calibration(robot.config)
-        robot_configs.backup_configuration(robot.config)
+        await _save_config(robot.config)
         message = "Config file saved and backed up"
         status = 200
     return web.json_response({'message': message}, status=status)
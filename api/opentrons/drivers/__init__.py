@@ -1,7 +1,6 @@
 import configparser
 import glob
 import os
-import pkg_resources
 import sys
 import logging
 
@@ -14,8 +13,10 @@ __all__ = [
 
 VIRTUAL_SMOOTHIE_PORT = 'Virtual Smoothie'
 
-SMOOTHIE_DEFAULTS_DIR = pkg_resources.resource_filename(
-    'opentrons.config', 'smoothie')
+# pkg_resources is slow to import, and the package is never installed zipped
+SMOOTHIE_DEFAULTS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'config', 'smoothie')
 SMOOTHIE_DEFAULTS_FILE = os.path.join(
     SMOOTHIE_DEFAULTS_DIR, 'smoothie-defaults.ini')
 SMOOTHIE_VIRTUAL_CONFIG_FILE = os.path.join(
@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from os import environ
 import logging
 from time import sleep
@@ -87,6 +88,8 @@ GCODES = {'HOME': 'G28.2',
 GCODE_ROUNDING_PRECISION = 3
 
 SMOOTHIE_COMMAND_TERMINATOR = 'M400\r\n\r\n'
+# Longest command line sent for a batch before it is split
+MAX_BATCH_COMMAND_LENGTH = 256
 SMOOTHIE_ACK = 'ok\r\nok\r\n'
 
 
@@ -296,6 +299,13 @@ class SmoothieDriver_3_0_0:
         self._combined_speed = float(DEFAULT_AXES_SPEED)
         self._saved_axes_speed = float(self._combined_speed)
 
+        # commands queued by `batch()`, sent together as a single command
+        self._batch = None
+        self._batch_depth = 0
+        self._batch_timeout = 0
+        self._batch_current = None
+        self._batch_speed = None
+
         # position after homing
         self._homed_position = HOMED_POSITION.copy()
         self.homed_flags = {}
@@ -554,7 +564,7 @@ class SmoothieDriver_3_0_0:
         speed_per_min = int(self._combined_speed * SEC_PER_MIN)
         command = GCODES['SET_SPEED'] + str(speed_per_min)
         log.debug("set_speed: {}".format(command))
-        self._send_command(command)
+        self._queue_command(command)
 
     def push_speed(self):
         self._saved_axes_speed = float(self._combined_speed)
@@ -678,7 +688,7 @@ class SmoothieDriver_3_0_0:
         this method to set the axis-current state on the actual Smoothie
         motor-driver.
         '''
-        self._send_command(self._generate_current_command())
+        self._queue_command(self._generate_current_command())
 
     def _generate_current_command(self):
         '''
@@ -755,8 +765,75 @@ class SmoothieDriver_3_0_0:
         if active_currents:
             self._save_current(active_currents, axes_active=True)
 
+    @contextmanager
+    def batch(self):
+        '''
+        Queue the movements, speed and current changes made within the block
+        and send them to Smoothieware as a single command, waited on by one
+        M400, instead of one serial round-trip each. Current and speed
+        settings are only sent when they change. Plunger motors are still
+        dwelled after each of their moves, so they never hold at active
+        current for the length of a batch.
+
+        Positions are updated as each movement is queued. Any other command
+        (a position query, homing, etc.) first sends what has been queued.
+        Batches can be nested, commands are sent when the outermost exits.
+        '''
+        self._batch_depth += 1
+        if self._batch is None:
+            self._batch = []
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._end_batch()
+
     # ----------- Private functions --------------- #
 
+    def _queue_command(self, command, timeout=DEFAULT_SMOOTHIE_TIMEOUT):
+        '''
+        Send `command`, or add it to the current batch. Within a batch,
+        current and speed settings already in effect are left out, and a
+        speed replaces one queued right before it (never used by a move).
+        '''
+        if self._batch is None:
+            return self._send_command(command, timeout=timeout)
+        if command.startswith(GCODES['SET_CURRENT']):
+            if command == self._batch_current:
+                return
+            self._batch_current = command
+        elif command.startswith(GCODES['SET_SPEED']):
+            if command == self._batch_speed:
+                return
+            if self._batch and self._batch[-1] == self._batch_speed:
+                self._batch.pop()
+            self._batch_speed = command
+        if len(' '.join(self._batch + [command])) > MAX_BATCH_COMMAND_LENGTH:
+            self._flush_batch()
+        self._batch.append(command)
+        self._batch_timeout += timeout
+
+    def _flush_batch(self):
+        commands, timeout = self._batch, self._batch_timeout
+        self._batch = None
+        try:
+            if commands:
+                log.debug("batch: {} command(s)".format(len(commands)))
+                self._send_command(' '.join(commands), timeout=timeout)
+        finally:
+            self._batch = []
+            self._batch_timeout = 0
+
+    def _end_batch(self):
+        try:
+            self._flush_batch()
+        finally:
+            self._batch = None
+            self._batch_timeout = 0
+            self._batch_current = None
+            self._batch_speed = None
+
     def _wait_for_ack(self):
         '''
         In the case where smoothieware has just been reset, we want to
@@ -797,6 +874,12 @@ class SmoothieDriver_3_0_0:
         :param timeout: the time to wait before returning (indefinite wait if
             this is set to none
         """
+        if self._batch is not None:
+            # a command outside of the batch may change current and speed
+            self._flush_batch()
+            self._batch_current = None
+            self._batch_speed = None
+
         if self.simulating:
             return
 
@@ -1075,26 +1158,36 @@ class SmoothieDriver_3_0_0:
 
             # include the current-setting gcodes within the moving gcode string
             # to reduce latency, since we're setting current so much
-            command = self._generate_current_command()
+            current = self._generate_current_command()
 
+            moves = []
             if backlash_coords != target_coords:
-                command += ' ' + GCODES['MOVE'] + ''.join(backlash_coords)
-            command += ' ' + GCODES['MOVE'] + ''.join(target_coords)
+                moves.append(GCODES['MOVE'] + ''.join(backlash_coords))
+            moves.append(GCODES['MOVE'] + ''.join(target_coords))
+            moves = ' '.join(moves)
 
             try:
                 for axis in target.keys():
                     self.engaged_axes[axis] = True
                 if home_flagged_axes:
                     self.home_flagged_axes(''.join(list(target.keys())))
-                log.debug("move: {}".format(command))
+                log.debug("move: {} {}".format(current, moves))
                 # TODO (andy) a movement's timeout should be calculated by
                 # how long the movement is expected to take. A default timeout
                 # of 30 seconds prevents any movements that take longer
-                self._send_command(command, timeout=DEFAULT_MOVEMENT_TIMEOUT)
+                if self._batch is None:
+                    self._send_command(
+                        current + ' ' + moves,
+                        timeout=DEFAULT_MOVEMENT_TIMEOUT)
+                else:
+                    self._queue_command(current)
+                    self._queue_command(
+                        moves, timeout=DEFAULT_MOVEMENT_TIMEOUT)
             finally:
                 # dwell pipette motors because they get hot
                 plunger_axis_moved = ''.join(set('BC') & set(target.keys()))
                 if plunger_axis_moved:
+                    # queued within a batch, right after the move
                     self.dwell_axes(plunger_axis_moved)
                     self._set_saved_current()
 
@@ -1,6 +1,9 @@
+import itertools
 import numbers
 
 from opentrons.util.vector import Vector
+from opentrons.helpers.transfer_plan import (
+    Aspirate, Dispense, TransferStep, transfer_step)
 
 
 def is_number(obj):
@@ -109,6 +112,63 @@ def _create_volume_gradient(min_v, max_v, total, gradient=None):
     return [_map_volume(i) for i in range(total)]
 
 
+def _channel_column(wells, channels, columns):
+    """
+    Returns the column that the wells of a multi-channel step can be
+    serviced with in one move, or None. That is either a full column given
+    in order, or a single well repeated that spans all channels (such as a
+    trough row)
+    """
+    from opentrons.containers.placeable import Well
+
+    first = wells[0]
+    if len(wells) != channels or not isinstance(first, Well):
+        return None
+    container = first.get_parent()
+    if id(container) not in columns:
+        columns[id(container)] = {
+            id(w): col
+            for col in getattr(container, 'cols', [])
+            for w in col
+        }
+    column = columns[id(container)].get(id(first))
+    if column is None:
+        return None
+    if len(column) == 1 and all(w is first for w in wells):
+        return first
+    if len(column) == channels and \
+            all(a is b for a, b in zip(column, wells)):
+        return column
+    return None
+
+
+def _group_for_multichannel(s, t, v, channels):
+    """
+    Replace runs of single-well transfers that line up with the channels of
+    a multi-channel pipette by one transfer between whole columns. Any
+    transfer that can't be grouped is kept as is
+    """
+    columns = {}
+    new_s, new_t, new_v = [], [], []
+    i = 0
+    while i < len(t):
+        j = i + channels
+        source = _channel_column(s[i:j], channels, columns)
+        target = _channel_column(t[i:j], channels, columns)
+        if source is not None and target is not None \
+                and len(set(v[i:j])) == 1:
+            new_s.append(source)
+            new_t.append(target)
+            new_v.append(v[i])
+            i = j
+        else:
+            new_s.append(s[i])
+            new_t.append(t[i])
+            new_v.append(v[i])
+            i += 1
+    return new_s, new_t, new_v
+
+
 def _expand_for_carryover(max_vol, plan, **kwargs):
     """
     Divide volumes larger than maximum volume into separate transfers
@@ -119,26 +179,22 @@ def _expand_for_carryover(max_vol, plan, **kwargs):
         return plan
     new_transfer_plan = []
     for p in plan:
-        source = p['aspirate']['location']
-        target = p['dispense']['location']
-        volume = float(p['aspirate']['volume'])
+        volume = float(p.aspirate.volume)
+        # steps within the maximum are kept if their volume already is a float
+        if volume <= max_vol and isinstance(p.aspirate.volume, float):
+            new_transfer_plan.append(p)
+            continue
+        source = p.aspirate.location
+        target = p.dispense.location
         while volume > max_vol * 2:
-            new_transfer_plan.append({
-                'aspirate': {'location': source, 'volume': max_vol},
-                'dispense': {'location': target, 'volume': max_vol}
-            })
+            new_transfer_plan.append(transfer_step(source, target, max_vol))
             volume -= max_vol
 
         if volume > max_vol:
             volume /= 2
-            new_transfer_plan.append({
-                'aspirate': {'location': source, 'volume': float(volume)},
-                'dispense': {'location': target, 'volume': float(volume)}
-            })
-        new_transfer_plan.append({
-            'aspirate': {'location': source, 'volume': float(volume)},
-            'dispense': {'location': target, 'volume': float(volume)}
-        })
+            new_transfer_plan.append(
+                transfer_step(source, target, float(volume)))
+        new_transfer_plan.append(transfer_step(source, target, float(volume)))
     return new_transfer_plan
 
 
@@ -175,30 +231,21 @@ def _compress_for_distribute(max_vol, plan, **kwargs):
         added_volume = 0
         if len(temp_dispenses) > 1:
             added_volume = disposal_vol
-        new_transfer_plan.append({
-            'aspirate': {
-                'location': source,
-                'volume': a_vol + added_volume
-            }
-        })
+        new_transfer_plan.append(TransferStep(
+            aspirate=Aspirate(source, a_vol + added_volume)))
         for d in temp_dispenses:
-            new_transfer_plan.append({
-                'dispense': {
-                    'location': d['location'],
-                    'volume': d['volume']
-                }
-            })
+            new_transfer_plan.append(TransferStep(dispense=d))
         a_vol = 0
         temp_dispenses = []
 
     for p in plan:
-        this_vol = p['aspirate']['volume']
-        new_source = p['aspirate']['location']
+        this_vol = p.aspirate.volume
+        new_source = p.aspirate.location
         if (new_source is not source) or (this_vol + a_vol > max_vol):
             _append_dispenses()
         source = new_source
         a_vol += this_vol
-        temp_dispenses.append(p['dispense'])
+        temp_dispenses.append(p.dispense)
     _append_dispenses()
     return new_transfer_plan
 
@@ -218,26 +265,143 @@ def _compress_for_consolidate(max_vol, plan, **kwargs):
         if not temp_aspirates:
             return
         for a in temp_aspirates:
-            new_transfer_plan.append({
-                'aspirate': {
-                    'location': a['location'], 'volume': a['volume']
-                }
-            })
-        new_transfer_plan.append({
-            'dispense': {
-                'location': target, 'volume': d_vol
-            }
-        })
+            new_transfer_plan.append(TransferStep(aspirate=a))
+        new_transfer_plan.append(TransferStep(
+            dispense=Dispense(target, d_vol)))
         d_vol = 0
         temp_aspirates = []
 
     for i, p in enumerate(plan):
-        this_vol = p['aspirate']['volume']
-        new_target = p['dispense']['location']
+        this_vol = p.aspirate.volume
+        new_target = p.dispense.location
         if (new_target is not target) or (this_vol + d_vol > max_vol):
             _append_aspirates()
         target = new_target
         d_vol += this_vol
-        temp_aspirates.append(p['aspirate'])
+        temp_aspirates.append(p.aspirate)
     _append_aspirates()
     return new_transfer_plan
+
+
+def _distance(p1, p2):
+    return ((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2) ** 0.5
+
+
+def _snake_order(points, start=None):
+    """
+    Visit points column by column (columns share the same x), alternating
+    the direction of travel along y between columns. The first column is
+    entered from its end nearest to `start`, or from its highest y if there
+    is no `start`.
+    """
+    columns = {}
+    for i, (x, y) in enumerate(points):
+        columns.setdefault(round(x, 1), []).append(i)
+    order = []
+    descending = True
+    for n, x in enumerate(sorted(columns)):
+        column = sorted(columns[x], key=lambda i: points[i][1])
+        if n == 0 and start is not None:
+            descending = _distance(start, points[column[-1]]) < \
+                _distance(start, points[column[0]])
+        if descending == (n % 2 == 0):
+            column.reverse()
+        order.extend(column)
+    return order
+
+
+def _path_length(order, points, start):
+    path = [points[i] for i in order]
+    if start is not None:
+        path.insert(0, start)
+    return sum(_distance(a, b) for a, b in zip(path, path[1:]))
+
+
+def _two_opt(order, points, start=None, max_passes=10):
+    """
+    Improve a visiting order by reversing segments of it while that
+    shortens the path. Reversing a segment only replaces the edges at its
+    two ends, so each candidate is checked by comparing those alone.
+    """
+    def distance(a, b):
+        return 0 if a is None or b is None else _distance(a, b)
+
+    order = list(order)
+    count = len(order)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(count - 1):
+            before = points[order[i - 1]] if i else start
+            first = points[order[i]]
+            for j in range(i + 2, count + 1):
+                last = points[order[j - 1]]
+                after = points[order[j]] if j < count else None
+                change = distance(before, last) + distance(first, after) \
+                    - distance(before, first) - distance(last, after)
+                if change < -1e-9:
+                    order[i:j] = order[i:j][::-1]
+                    first = points[order[i]]
+                    improved = True
+        if not improved:
+            break
+    return order
+
+
+def _nearest_order(points, start=None):
+    """
+    Nearest-neighbour visiting order refined with 2-opt
+    """
+    remaining = list(range(len(points)))
+    order = []
+    current = start if start is not None else points[0]
+    while remaining:
+        nearest = min(remaining, key=lambda i: _distance(current, points[i]))
+        remaining.remove(nearest)
+        order.append(nearest)
+        current = points[nearest]
+    return _two_opt(order, points, start)
+
+
+_PATH_STRATEGIES = {
+    'snake': _snake_order,
+    'nearest': _nearest_order
+}
+
+
+def _step_location(step):
+    return (step.dispense or step.aspirate).location
+
+
+def _reorder_run(run, position, strategy, start):
+    points = [position(_step_location(step)) for step in run]
+    return [run[i] for i in strategy(points, start)]
+
+
+def _optimize_path(plan, position, strategy='snake'):
+    """
+    Reorder the dispenses that follow an aspirate (distribute), and the
+    aspirates that precede a dispense (consolidate), to shorten the path
+    travelled by the gantry. Steps doing both an aspirate and a dispense are
+    kept in place.
+
+    :param position: function returning the (x, y) position of a location
+    :param strategy: 'snake' (column by column) or 'nearest' (nearest
+                     neighbour, refined with 2-opt)
+    """
+    if strategy is True:
+        strategy = 'snake'
+    if strategy not in _PATH_STRATEGIES:
+        raise ValueError('Unknown path optimization "{}", use one of: {}'
+                         .format(strategy, ', '.join(_PATH_STRATEGIES)))
+    order = _PATH_STRATEGIES[strategy]
+
+    new_transfer_plan = []
+    start = None
+    for kind, run in itertools.groupby(
+            plan, key=lambda p: (p.aspirate is None, p.dispense is None)):
+        run = list(run)
+        if any(kind) and len(run) > 1:
+            run = _reorder_run(run, position, order, start)
+        new_transfer_plan.extend(run)
+        start = position(_step_location(run[-1]))
+    return new_transfer_plan
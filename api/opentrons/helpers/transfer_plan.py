@@ -0,0 +1,44 @@
+"""
+Intermediate representation of the transfer plans built by
+:meth:`opentrons.instruments.Pipette.plan_transfer`.
+
+A plan is an immutable sequence of :class:`TransferStep`, each of which
+aspirates, dispenses, or aspirates then dispenses. All types are tuples, so
+plans are compact and can be compared with ``==``. They are not hashable in
+general: locations can hold a :class:`~opentrons.util.vector.Vector`, which
+compares with a tolerance and so has no hash.
+"""
+from collections import namedtuple
+
+Aspirate = namedtuple('Aspirate', 'location volume')
+Dispense = namedtuple('Dispense', 'location volume')
+
+
+class TransferStep(namedtuple('TransferStep', 'aspirate dispense')):
+    __slots__ = ()
+
+    def __new__(cls, aspirate=None, dispense=None):
+        return super(TransferStep, cls).__new__(cls, aspirate, dispense)
+
+
+def transfer_step(source, target, volume):
+    """
+    Step aspirating `volume` from `source` and dispensing it into `target`
+    """
+    return TransferStep(Aspirate(source, volume), Dispense(target, volume))
+
+
+class TransferPlan(tuple):
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'TransferPlan([\n{}\n])'.format(
+            ',\n'.join('    ' + repr(step) for step in self))
+
+    @property
+    def aspirates(self):
+        return [step.aspirate for step in self if step.aspirate]
+
+    @property
+    def dispenses(self):
+        return [step.dispense for step in self if step.dispense]
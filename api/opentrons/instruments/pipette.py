@@ -1,15 +1,18 @@
-import itertools
 import warnings
 import logging
 import time
 
+import numpy as np
+
 from opentrons import commands
 from opentrons.containers import unpack_location
 from opentrons.containers.placeable import (
     Container, Placeable, WellSeries
 )
 from opentrons.helpers import helpers
-from opentrons.trackers import pose_tracker
+from opentrons.helpers.transfer_plan import TransferPlan, transfer_step
+from opentrons.instruments.pipette_config import VolumeCurve
+from opentrons.trackers import pose_tracker, tip_tracker, volume_tracker
 
 log = logging.getLogger(__name__)
 
@@ -156,7 +159,9 @@ class Pipette:
         self.tip_racks = tip_racks
         self.starting_tip = None
 
-        self.reset_tip_tracking()
+        # tip racks can be shared with other pipettes, so the tips they have
+        # already used are kept (see opentrons.trackers.tip_tracker)
+        self.current_tip(None)
 
         self.robot.add_instrument(self.mount, self)
 
@@ -164,7 +169,9 @@ class Pipette:
         self.previous_placeable = None
         self.current_volume = 0
 
-        self.plunger_positions = plunger_positions
+        # positions are calibrated per pipette, while the positions passed in
+        # are shared: the PLUNGER_POSITIONS default or a read-only config
+        self.plunger_positions = dict(plunger_positions)
 
         if max_volume:
             warnings.warn(
@@ -215,23 +222,17 @@ class Pipette:
 
     def reset_tip_tracking(self):
         """
-        Resets the :any:`Pipette` tip tracking, "refilling" the tip racks
+        Resets the :any:`Pipette` tip tracking, putting back the tips this
+        pipette used. Tips used by other pipettes sharing its racks are left
+        as they are.
         """
         self.current_tip(None)
-        self.tip_rack_iter = iter([])
 
         if self.has_tip_rack():
-            iterables = self.tip_racks
-
-            if self.channels > 1:
-                iterables = [c for rack in self.tip_racks for c in rack.cols]
-            else:
-                iterables = [w for rack in self.tip_racks for w in rack]
-
+            tip_tracker.reset(self.tip_racks, owner=self)
             if self.starting_tip:
-                iterables = iterables[iterables.index(self.starting_tip):]
-
-            self.tip_rack_iter = itertools.chain(iterables)
+                tip_tracker.start_at(
+                    self.tip_racks, self.starting_tip, owner=self)
 
     def current_tip(self, *args):
         # TODO(ahmed): revisit
@@ -247,9 +248,9 @@ class Pipette:
     def get_next_tip(self):
         next_tip = None
         if self.has_tip_rack():
-            try:
-                next_tip = next(self.tip_rack_iter)
-            except StopIteration as e:
+            next_tip = tip_tracker.next_tip(
+                self.tip_racks, self.channels, owner=self)
+            if next_tip is None:
                 raise RuntimeWarning(
                     '{0} has run out of tips'.format(self.name))
         else:
@@ -391,7 +392,7 @@ class Pipette:
                     self.current_volume + volume)
             )
 
-        self._position_for_aspirate(location)
+        self._position_for_aspirate(location, volume=volume)
 
         mm_position = self._ul_to_plunger_position(
             self.current_volume + volume)
@@ -406,6 +407,11 @@ class Pipette:
         )
         self.instrument_actuator.pop_speed()
         self.current_volume += volume  # update after actual aspirate
+        placeable = self._liquid_location(location)
+        if volume_tracker.is_tracked(placeable) and \
+                self._tip_below_top(placeable):
+            # above the well (as for an air gap) the pipette draws in air
+            volume_tracker.aspirate(self, placeable, volume)
 
         return self
 
@@ -497,13 +503,35 @@ class Pipette:
         )
         self.instrument_actuator.pop_speed()
         self.current_volume -= volume  # update after actual dispense
+        placeable = self._liquid_location(location)
+        if placeable is not None:
+            volume_tracker.dispense(self, placeable, volume)
 
         return self
 
-    def _position_for_aspirate(self, location=None, clearance=1.0):
+    def _liquid_location(self, location):
+        """
+        Placeable liquid is moved from or to by an aspirate, dispense or
+        blow out at `location` (defaults to where the pipette is)
+        """
+        if location:
+            placeable, _ = unpack_location(location)
+            return placeable
+        return self.previous_placeable
+
+    def _tip_below_top(self, placeable):
+        if isinstance(placeable, WellSeries):
+            placeable = placeable[0]
+        _, _, tip_z = pose_tracker.absolute(self.robot.poses, self)
+        _, _, top_z = pose_tracker.absolute(self.robot.poses, placeable)
+        return tip_z < top_z
+
+    def _position_for_aspirate(self, location=None, clearance=1.0, volume=0):
         """
         Position this :any:`Pipette` for an aspiration,
-        given it's current state
+        given it's current state. If the volume of liquid in the well is
+        tracked, the tip is lowered to just below the level of the liquid
+        left after aspirating `volume` instead of to `clearance`.
         """
 
         placeable = None
@@ -533,6 +561,8 @@ class Pipette:
         # then go inside the location
         if location:
             if isinstance(location, Placeable):
+                clearance = volume_tracker.aspirate_clearance(
+                    location, volume, clearance, self.channels)
                 location = location.bottom(min(location.z_size(), clearance))
             self.move_to(location, strategy='direct')
 
@@ -620,11 +650,12 @@ class Pipette:
         if not location and self.previous_placeable:
             location = self.previous_placeable
 
-        self.aspirate(location=location, volume=volume, rate=rate)
-        for i in range(repetitions - 1):
+        with self.robot.batch():
+            self.aspirate(location=location, volume=volume, rate=rate)
+            for i in range(repetitions - 1):
+                self.dispense(volume, rate=rate)
+                self.aspirate(volume, rate=rate)
             self.dispense(volume, rate=rate)
-            self.aspirate(volume, rate=rate)
-        self.dispense(volume, rate=rate)
 
         return self
 
@@ -662,13 +693,15 @@ class Pipette:
         if not self.tip_attached:
             log.warning("Cannot 'blow out' without a tip attached.")
 
-        self.move_to(location)
-        self.instrument_actuator.set_active_current(self._plunger_current)
-        self.robot.poses = self.instrument_actuator.move(
-            self.robot.poses,
-            x=self._get_plunger_position('blow_out')
-        )
+        with self.robot.batch():
+            self.move_to(location)
+            self.instrument_actuator.set_active_current(self._plunger_current)
+            self.robot.poses = self.instrument_actuator.move(
+                self.robot.poses,
+                x=self._get_plunger_position('blow_out')
+            )
         self.current_volume = 0
+        volume_tracker.empty(self, self._liquid_location(location))
 
         return self
 
@@ -723,9 +756,8 @@ class Pipette:
 
         # if no location specified, use the previously
         # associated placeable to get Well dimensions
-        if location:
-            self.move_to(location)
-        else:
+        move_to_well = bool(location)
+        if not location:
             location = self.previous_placeable
 
         v_offset = (0, 0, height_offset)
@@ -738,12 +770,17 @@ class Pipette:
         ]
 
         # Apply vertical offset to well edges
-        well_edges = map(lambda x: x + v_offset, well_edges)
+        well_edges = [e + v_offset for e in well_edges]
 
-        self.robot.gantry.push_speed()
-        self.robot.gantry.set_speed(100)
-        [self.move_to((location, e), strategy='direct') for e in well_edges]
-        self.robot.gantry.pop_speed()
+        # all moves are sent to the robot at once
+        with self.robot.batch(), self.robot.working_poses():
+            if move_to_well:
+                self.move_to(location)
+            self.robot.gantry.push_speed()
+            self.robot.gantry.set_speed(100)
+            for edge in well_edges:
+                self.move_to((location, edge), strategy='direct')
+            self.robot.gantry.pop_speed()
 
         return self
 
@@ -890,6 +927,7 @@ class Pipette:
         self.current_tip(None)
         if location:
             placeable, _ = unpack_location(location)
+            tip_tracker.use(placeable, owner=self)
             self.current_tip(placeable)
 
         presses = (1 if not helpers.is_number(presses) else presses)
@@ -931,12 +969,13 @@ class Pipette:
 
             return self
 
-        return _pick_up_tip(
-            self,
-            location=location,
-            presses=presses,
-            plunge_depth=DEFAULT_TIP_PRESS_MM,
-            increment=increment)
+        with self.robot.working_poses():
+            return _pick_up_tip(
+                self,
+                location=location,
+                presses=presses,
+                plunge_depth=DEFAULT_TIP_PRESS_MM,
+                increment=increment)
 
     def drop_tip(self, location=None, home_after=True):
         """
@@ -1017,6 +1056,7 @@ class Pipette:
                 self._home_after_drop_tip()
 
             self.current_volume = 0
+            volume_tracker.empty(self)
             self.current_tip(None)
             self._remove_tip(
                 length=self._tip_length
@@ -1229,6 +1269,14 @@ class Pipette:
             combined into one tip for the purpose of saving time. If `False`,
             all volumes will be transferred seperately.
 
+        optimize_path : boolean or str
+            (Only applicable to :any:`distribute` and :any:`consolidate`) If
+            `True` or `'snake'`, the dispenses sharing one aspirate (or the
+            aspirates sharing one dispense) are reordered column by column to
+            shorten the travel between wells. `'nearest'` uses a
+            nearest-neighbour path instead. If `False` (default), the order
+            of the wells is kept.
+
         gradient : lambda
             Function for calculated the curve used for gradient volumes.
             When `volumes` is a tuple of length 2, it's values are used
@@ -1272,11 +1320,38 @@ class Pipette:
         if tips is None:
             raise ValueError('Unknown "new_tip" option: {}'.format(tip_option))
 
-        plan = self._create_transfer_plan(volume, source, dest, **kwargs)
+        plan = self.plan_transfer(volume, source, dest, **kwargs)
         self._run_transfer_plan(tips, plan, **kwargs)
 
         return self
 
+    def plan_transfer(self, volume, source, dest, **kwargs):
+        """
+        Build the plan that :any:`transfer` would run, without moving the
+        robot. Accepts the same arguments as :any:`transfer`, plus `mode`
+        (`'transfer'`, `'distribute'` or `'consolidate'`).
+
+        Returns
+        -------
+
+        A :class:`~opentrons.helpers.transfer_plan.TransferPlan`, a tuple of
+        steps, each with an `aspirate` and/or a `dispense` holding a
+        `location` and a `volume`.
+
+        Examples
+        --------
+        ..
+        >>> from opentrons import instruments, labware, robot # doctest: +SKIP
+        >>> robot.reset() # doctest: +SKIP
+        >>> plate = labware.load('96-flat', '5') # doctest: +SKIP
+        >>> p300 = instruments.P300_Single(mount='right') # doctest: +SKIP
+        >>> plan = p300.plan_transfer(500, plate[0], plate[1]) # doctest: +SKIP
+        >>> [step.aspirate.volume for step in plan] # doctest: +SKIP
+        [250.0, 250.0]
+        """
+        kwargs['mode'] = kwargs.get('mode', 'transfer')
+        return self._create_transfer_plan(volume, source, dest, **kwargs)
+
     @commands.publish.both(command=commands.delay)
     def delay(self, seconds=0, minutes=0):
         """
@@ -1338,10 +1413,21 @@ class Pipette:
         return self
 
     def set_ul_per_mm(self, ul_per_mm):
+        """
+        Set the ul-to-mm conversion of the plunger: a single ratio, or a
+        table of ``[volume, ul_per_mm]`` segments (see
+        :class:`~opentrons.instruments.pipette_config.VolumeCurve`)
+        """
         self.ul_per_mm = ul_per_mm
+        self._volume_curve = VolumeCurve(ul_per_mm)
         t = self._get_plunger_position('top')
         b = self._get_plunger_position('bottom')
-        self.max_volume = (t - b) * self.ul_per_mm
+        self.max_volume = self._volume_curve.mm_to_ul(t - b)
+        if self._volume_curve.is_linear:
+            self._flow_ul_per_mm = self._volume_curve.mm_to_ul(1)
+        else:
+            # flow rates convert with the average ratio over the full stroke
+            self._flow_ul_per_mm = self.max_volume / (t - b)
 
     def _get_plunger_position(self, position):
         """
@@ -1368,8 +1454,7 @@ class Pipette:
         Calibration of the pipette motor's ul-to-mm conversion is required
         """
 
-        millimeters = ul / self.ul_per_mm
-        return millimeters
+        return self._volume_curve.ul_to_mm(ul)
 
     def _ul_to_plunger_position(self, ul):
         """Calculate axis position for a given liquid volume.
@@ -1382,7 +1467,8 @@ class Pipette:
 
         millimeters = self._ul_to_mm(ul)
         destination_mm = self._get_plunger_position('bottom') + millimeters
-        return round(destination_mm, 6)
+        return np.round(destination_mm, 6) if np.ndim(destination_mm) \
+            else round(destination_mm, 6)
 
     def _volume_percentage(self, volume):
         """Returns the plunger percentage for a given volume.
@@ -1404,7 +1490,7 @@ class Pipette:
 
         return volume / self.max_volume
 
-    def _create_transfer_plan(self, v, s, t, **kwargs):
+    def _unpack_well_series(self, s, t):
         # SPECIAL CASE: if using multi-channel pipette,
         # and the source or target is a WellSeries
         # then avoid iterating through it's Wells.
@@ -1420,18 +1506,22 @@ class Pipette:
                 s = [well for series in s for well in series]
             if isinstance(t, WellSeries) and isinstance(t[0], WellSeries):
                 t = [well for series in t for well in series]
+        return s, t
+
+    def _create_transfer_plan(self, v, s, t, **kwargs):
+        s, t = self._unpack_well_series(s, t)
 
         # create list of volumes, sources, and targets of equal length
         s, t = helpers._create_source_target_lists(s, t, **kwargs)
         total_transfers = len(t)
         v = helpers._create_volume_list(v, total_transfers, **kwargs)
 
-        transfer_plan = []
-        for i in range(total_transfers):
-            transfer_plan.append({
-                'aspirate': {'location': s[i], 'volume': v[i]},
-                'dispense': {'location': t[i], 'volume': v[i]}
-            })
+        if self.channels > 1:
+            s, t, v = helpers._group_for_multichannel(s, t, v, self.channels)
+            total_transfers = len(t)
+
+        transfer_plan = [
+            transfer_step(s[i], t[i], v[i]) for i in range(total_transfers)]
 
         max_vol = self.max_volume
         max_vol -= kwargs.get('air_gap', 0)  # air
@@ -1443,29 +1533,68 @@ class Pipette:
         transfer_plan = helpers._compress_for_repeater(
             max_vol, transfer_plan, **kwargs)
 
+        optimize_path = kwargs.get('optimize_path', False)
+        if optimize_path:
+            transfer_plan = helpers._optimize_path(
+                transfer_plan, self._xy_position, strategy=optimize_path)
+
+        transfer_plan = TransferPlan(transfer_plan)
+        self._check_plan_volumes(transfer_plan)
         return transfer_plan
 
+    def _check_plan_volumes(self, plan):
+        """
+        Validate the volumes of all steps of a transfer plan in one pass:
+        raises if a step exceeds the pipette's `max_volume`, and warns once
+        about steps smaller than the pipette's `min_volume`.
+        """
+        volumes = np.array(
+            [a.volume for a in plan.aspirates] +
+            [d.volume for d in plan.dispenses], dtype=float)
+        if not volumes.size:
+            return
+
+        too_large = volumes[volumes > self.max_volume]
+        if too_large.size:
+            raise RuntimeWarning(
+                'Pipette with max volume of {0} cannot hold volume {1}'
+                .format(self.max_volume, too_large.max()))
+
+        too_small = volumes[(volumes > 0) & (volumes < self.min_volume)]
+        if too_small.size:
+            self.robot.add_warning(
+                '{0} aspirates or dispenses are less than pipette\'s '
+                'min_volume ({1}ul), the smallest is {2}ul'.format(
+                    too_small.size, self.min_volume, too_small.min()))
+
+    def _xy_position(self, location):
+        """
+        Absolute (x, y) deck position of a transfer location
+        """
+        if isinstance(location, WellSeries):
+            location = location[0]
+        well, _ = unpack_location(location)
+        x, y, _ = pose_tracker.absolute(self.robot.poses, well)
+        return (x, y)
+
     def _run_transfer_plan(self, tips, plan, **kwargs):
         air_gap = kwargs.get('air_gap', 0)
         touch_tip = kwargs.get('touch_tip', False)
 
         total_transfers = len(plan)
-        for i, step in enumerate(plan):
-
-            aspirate = step.get('aspirate')
-            dispense = step.get('dispense')
+        for i, (aspirate, dispense) in enumerate(plan):
 
             if aspirate:
                 self._add_tip_during_transfer(tips, **kwargs)
                 self._aspirate_during_transfer(
-                    aspirate['volume'], aspirate['location'], **kwargs)
+                    aspirate.volume, aspirate.location, **kwargs)
 
             if dispense:
                 self._dispense_during_transfer(
-                    dispense['volume'], dispense['location'], **kwargs)
-                if step is plan[-1] or plan[i + 1].get('aspirate'):
+                    dispense.volume, dispense.location, **kwargs)
+                if i + 1 == total_transfers or plan[i + 1].aspirate:
                     self._blowout_during_transfer(
-                        dispense['location'], **kwargs)
+                        dispense.location, **kwargs)
                     if touch_tip or touch_tip is 0:
                         self.touch_tip(touch_tip)
                     tips = self._drop_tip_during_transfer(
@@ -1597,10 +1726,10 @@ class Pipette:
         """
         if aspirate:
             self.set_speed(
-                aspirate=round(self._ul_to_mm(aspirate), 6))
+                aspirate=round(aspirate / self._flow_ul_per_mm, 6))
         if dispense:
             self.set_speed(
-                dispense=round(self._ul_to_mm(dispense), 6))
+                dispense=round(dispense / self._flow_ul_per_mm, 6))
         return self
 
     def set_pick_up_current(self, amperes):
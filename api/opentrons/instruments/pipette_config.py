@@ -1,13 +1,26 @@
 import logging
 import os
 import json
+import time
 from collections import namedtuple
+from types import MappingProxyType
+
+import numpy as np
+
+from opentrons import config
 from opentrons.config import get_config_index
 
 FILE_DIR = os.path.abspath(os.path.dirname(__file__))
 
 log = logging.getLogger(__name__)
 
+# Parsed pipette config file: (path, file state, configs by model), with the
+# configs built from it so far, and when the file was last checked for
+# changes (see `config.REFRESH_INTERVAL`)
+_file_configs = None
+_built_configs = {}
+_file_checked = None
+
 
 def pipette_config_path():
     index = get_config_index()
@@ -21,7 +34,7 @@ pipette_config = namedtuple(
         'pick_up_current',
         'aspirate_flow_rate',
         'dispense_flow_rate',
-        'ul_per_mm',
+        'ul_per_mm',  # number, or table of [volume, ul_per_mm] segments
         'channels',
         'name',
         'model_offset',
@@ -32,6 +45,64 @@ pipette_config = namedtuple(
 )
 
 
+class VolumeCurve(object):
+    """
+    Conversion between liquid volume (ul) and plunger travel (mm).
+
+    `ul_per_mm` is either a single ratio, or a piecewise-linear calibration
+    table of ``[volume, ul_per_mm]`` pairs: from each `volume` up to the
+    next, every millimeter of plunger travel moves `ul_per_mm` microliters.
+    The first segment must start at 0 and the last one extends past the end
+    of the table.
+
+    Segment boundaries are precomputed on both axes, so conversions are a
+    lookup that works on single values as well as on numpy arrays.
+
+    >>> curve = VolumeCurve([[0, 2.0], [10, 4.0]])
+    >>> curve.ul_to_mm(18)
+    7.0
+    >>> curve.mm_to_ul([2.5, 7.0]).tolist()
+    [5.0, 18.0]
+    """
+    def __init__(self, ul_per_mm):
+        if isinstance(ul_per_mm, (int, float)):
+            ul_per_mm = [[0, ul_per_mm]]
+        table = np.array(sorted(ul_per_mm), dtype=float).reshape(-1, 2)
+        volumes, ratios = table[:, 0], table[:, 1]
+        if not len(table) or volumes[0] != 0:
+            raise ValueError(
+                'ul_per_mm table must start at 0ul, got {}'.format(ul_per_mm))
+        if (ratios <= 0).any() or (np.diff(volumes) <= 0).any():
+            raise ValueError(
+                'ul_per_mm table must have positive ratios and distinct '
+                'volumes, got {}'.format(ul_per_mm))
+        self._volumes = volumes
+        self._ratios = ratios
+        self._mm = np.concatenate(
+            ([0.0], np.cumsum(np.diff(volumes) / ratios[:-1])))
+
+    @property
+    def is_linear(self):
+        return len(self._ratios) == 1
+
+    @staticmethod
+    def _lookup(bounds, values):
+        return np.maximum(
+            np.searchsorted(bounds, values, side='right') - 1, 0)
+
+    def ul_to_mm(self, ul):
+        values = np.asarray(ul, dtype=float)
+        i = self._lookup(self._volumes, values)
+        mm = self._mm[i] + (values - self._volumes[i]) / self._ratios[i]
+        return float(mm) if mm.ndim == 0 else mm
+
+    def mm_to_ul(self, mm):
+        values = np.asarray(mm, dtype=float)
+        i = self._lookup(self._mm, values)
+        ul = self._volumes[i] + (values - self._mm[i]) * self._ratios[i]
+        return float(ul) if ul.ndim == 0 else ul
+
+
 def _create_config_from_dict(cfg: dict, model: str) -> pipette_config:
 
     def _dict_key_to_config_attribute(key: str) -> str:
@@ -88,16 +159,61 @@ def _create_config_from_dict(cfg: dict, model: str) -> pipette_config:
     return res
 
 
+def _freeze(cfg: pipette_config) -> pipette_config:
+    """
+    Read-only version of `cfg`, so a single instance can be shared
+    """
+    ul_per_mm = cfg.ul_per_mm
+    if isinstance(ul_per_mm, list):
+        ul_per_mm = tuple(tuple(segment) for segment in ul_per_mm)
+    return cfg._replace(
+        plunger_positions=MappingProxyType(dict(cfg.plunger_positions)),
+        model_offset=tuple(cfg.model_offset),
+        ul_per_mm=ul_per_mm)
+
+
+def _read_config_file(config_file: str):
+    if config_file and os.path.exists(config_file):
+        with open(config_file) as conf:
+            return json.load(conf)
+    return None
+
+
+def _load_all_config_dicts():
+    """
+    Contents of the pipette config file (``None`` if there is none), parsed
+    again only when the file changed
+    """
+    global _file_configs, _file_checked
+    if _file_configs is None or config.is_stale(_file_checked):
+        config_file = pipette_config_path()
+        state = config.file_state(config_file)
+        if _file_configs is None or _file_configs[:2] != (config_file, state):
+            _file_configs = (
+                config_file, state, _read_config_file(config_file))
+            _built_configs.clear()
+        _file_checked = time.monotonic()
+    return _file_configs[2]
+
+
 def _load_config_dict_from_file(pipette_model: str) -> dict:
-    config_file = pipette_config_path()
+    all_configs = _load_all_config_dicts()
     cfg = {}
-    if os.path.exists(config_file):
-        with open(config_file) as conf:
-            all_configs = json.load(conf)
-            cfg = all_configs[pipette_model]
+    if all_configs is not None:
+        cfg = all_configs[pipette_model]
     return cfg
 
 
+def reload():
+    """
+    Forget the pipette config file read from disk
+    """
+    global _file_configs, _file_checked
+    _file_configs = None
+    _file_checked = None
+    _built_configs.clear()
+
+
 # ------------------------- deprecated data ---------------------------
 # This section is left in as a fall-back until the settings file is
 # available on all robots. Currently, getting the settings file onto
@@ -263,21 +379,26 @@ p1000_single = pipette_config(
 )
 
 fallback_configs = {
-    'p10_single_v1': p10_single,
-    'p10_multi_v1': p10_multi,
-    'p50_single_v1': p50_single,
-    'p50_multi_v1': p50_multi,
-    'p300_single_v1': p300_single,
-    'p300_multi_v1': p300_multi,
-    'p1000_single_v1': p1000_single
-}
+    cfg.name: _freeze(cfg)
+    for cfg in [
+        p10_single,
+        p10_multi,
+        p50_single,
+        p50_multi,
+        p300_single,
+        p300_multi,
+        p1000_single]}
 
 
 def select_config(model: str):
     cfg_dict = _load_config_dict_from_file(model)
-    cfg = _create_config_from_dict(cfg_dict, model)
-    if not cfg:
-        cfg = fallback_configs.get(model)
+    cfg = _built_configs.get(model)
+    if cfg is None:
+        cfg = _create_config_from_dict(cfg_dict, model)
+        if not cfg:
+            cfg = fallback_configs.get(model)
+        if cfg:
+            cfg = _built_configs[model] = _freeze(cfg)
     return cfg
 # ----------------------- end deprecated data -------------------------
 
@@ -323,11 +444,12 @@ configs = {
 
 def load(pipette_model: str) -> pipette_config:
     """
-    Lazily loads pipette config data from disk. This means that changes to the
-    configuration data should be picked up on newly instantiated objects
-    without requiring a restart. If :param pipette_model is not in the top-
-    level keys of the "pipette-config.json" file, this function will raise a
-    KeyError
+    Lazily loads pipette config data from disk. The file is parsed once and
+    parsed again when it changes, so changes to the configuration data are
+    picked up on newly instantiated objects without requiring a restart.
+    Configs are read-only and shared between callers. If :param
+    pipette_model is not in the top-level keys of the "pipette-config.json"
+    file, this function will raise a KeyError
     :param pipette_model: a pipette model string corresponding to a top-level
         key in the "pipette-config.json" file
     :return: a `pipette_config` instance
@@ -1,5 +1,6 @@
 import os
 import logging
+from contextlib import contextmanager
 from functools import lru_cache
 
 import opentrons.util.calibration_functions as calib
@@ -13,7 +14,7 @@ from opentrons.data_storage import database, old_container_loading,\
 from opentrons.drivers.smoothie_drivers import driver_3_0
 from opentrons.robot.mover import Mover
 from opentrons.robot.robot_configs import load
-from opentrons.trackers import pose_tracker
+from opentrons.trackers import pose_tracker, tip_tracker, volume_tracker
 from opentrons.config import feature_flags as fflags
 from opentrons.instruments.pipette_config import Y_OFFSET_MULTI
 
@@ -274,6 +275,9 @@ class Robot(object):
         self.setup_deck()
         self.setup_gantry()
         self._instruments = {}
+        # the labware of the previous deck is no longer used
+        tip_tracker.clear()
+        volume_tracker.clear()
 
         self._use_safest_height = False
 
@@ -574,6 +578,38 @@ class Robot(object):
         if combined_speed:
             self._driver.set_speed(combined_speed)
 
+    def batch(self):
+        """
+        Context manager sending all motion issued within it to the motor
+        controller as a single command, see
+        :meth:`SmoothieDriver_3_0_0.batch`
+
+        Examples
+        ---------
+
+        >>> from opentrons import robot # doctest: +SKIP
+        >>> with robot.batch(): # doctest: +SKIP
+        ...     robot.move_head(x=100, y=100) # doctest: +SKIP
+        ...     robot.move_head(x=200, y=100) # doctest: +SKIP
+        """
+        return self._driver.batch()
+
+    @contextmanager
+    def working_poses(self):
+        """
+        Context manager applying pose updates to :attr:`poses` in place for
+        the duration of a compound motion, and replacing it with a single
+        new pose tree once done, instead of copying it on every move
+        """
+        if isinstance(self.poses, pose_tracker.WorkingState):
+            yield
+            return
+        self.poses = pose_tracker.working(self.poses)
+        try:
+            yield
+        finally:
+            self.poses = pose_tracker.commit(self.poses)
+
     def move_to(
             self,
             location,
@@ -641,38 +677,46 @@ class Robot(object):
 
         if strategy == 'arc':
             arc_coords = self._create_arc(instrument, target, placeable)
-            for coord in arc_coords:
-                self.poses = instrument._move(
-                    self.poses,
-                    **coord)
-
         elif strategy == 'direct':
-            position = {'x': target[0], 'y': target[1], 'z': target[2]}
-            self.poses = instrument._move(
-                self.poses,
-                **position)
+            arc_coords = [{'x': target[0], 'y': target[1], 'z': target[2]}]
         else:
             raise RuntimeError(
                 'Unknown move strategy: {}'.format(strategy))
 
+        with self.working_poses():
+            for coord in arc_coords:
+                self.poses = instrument._move(
+                    self.poses,
+                    **coord)
+
     def _create_arc(self, inst, destination, placeable=None):
         """
         Returns a list of coordinates to arrive to the destination coordinate
+
+        Movements that stay within the same container are planned against
+        that container's height only. If the tip (the instrument's pose
+        already accounts for an attached tip's length) is already at least
+        `TIP_CLEARANCE_LABWARE` above the tallest point of the container,
+        nothing can be in the way: the pipette moves diagonally to the
+        destination, or to that clearance above the container followed by a
+        descent, instead of rising first. Segments that would
+        not change the height of the pipette are left out.
         """
-        this_container = None
-        if isinstance(placeable, containers.Well):
-            this_container = placeable.get_parent()
-        elif isinstance(placeable, containers.WellSeries):
-            this_container = placeable.get_parent()
-        elif isinstance(placeable, containers.Container):
-            this_container = placeable
+        this_container = self._arc_container(placeable)
+        same_container = bool(
+            this_container and self._prev_container == this_container)
+        self._prev_container = this_container
 
-        if this_container and self._prev_container == this_container:
+        _, _, pip_z = pose_tracker.absolute(self.poses, inst)
+
+        if same_container:
             # movements that stay within the same container do not need to
             # avoid other containers on the deck, so the travel height of
             # arced movements can be relative to just that one container
-            arc_top = self.max_placeable_height_on_deck(this_container)
-            arc_top += TIP_CLEARANCE_LABWARE
+            arc_top = self.max_placeable_height_on_deck(this_container) + \
+                TIP_CLEARANCE_LABWARE
+            if pip_z >= arc_top:
+                return self._create_shortcut(destination, arc_top)
         elif self._use_safest_height:
             # bring the pipettes up as high as possible while calibrating
             arc_top = inst._max_deck_height()
@@ -680,20 +724,38 @@ class Robot(object):
             # bring pipette up above the tallest container currently on deck
             arc_top = self.max_deck_height() + TIP_CLEARANCE_DECK
 
-        self._prev_container = this_container
-
         # if instrument is currently taller than arc_top, don't move down
-        _, _, pip_z = pose_tracker.absolute(self.poses, inst)
-
         arc_top = max(arc_top, destination[2], pip_z)
         arc_top = min(arc_top, inst._max_deck_height())
 
+        strategy = [{'x': destination[0], 'y': destination[1]}]
+        if arc_top != pip_z:
+            strategy.insert(0, {'z': arc_top})
+        if destination[2] != arc_top:
+            strategy.append({'z': destination[2]})
+
+        return strategy
+
+    def _arc_container(self, placeable):
+        if isinstance(placeable, (containers.Well, containers.WellSeries)):
+            return placeable.get_parent()
+        elif isinstance(placeable, containers.Container):
+            return placeable
+        return None
+
+    def _create_shortcut(self, destination, safe_z):
+        """
+        Path for a pipette that is already at or above `safe_z`, the lowest
+        height clearing the container it is moving within: straight to the
+        destination if that is above `safe_z`, otherwise straight to above
+        the destination at `safe_z`, then down
+        """
+        travel_z = max(destination[2], safe_z)
         strategy = [
-            {'z': arc_top},
-            {'x': destination[0], 'y': destination[1]},
-            {'z': destination[2]}
+            {'x': destination[0], 'y': destination[1], 'z': travel_z}
         ]
-
+        if destination[2] != travel_z:
+            strategy.append({'z': destination[2]})
         return strategy
 
     def disconnect(self):
@@ -909,7 +971,7 @@ class Robot(object):
             }
         left_model = left_data.get('model')
         if left_model:
-            tip_length = pipette_config.configs[left_model].tip_length
+            tip_length = pipette_config.load(left_model).tip_length
             left_data.update({'tip_length': tip_length})
 
         right_data = {
@@ -919,7 +981,7 @@ class Robot(object):
             }
         right_model = right_data.get('model')
         if right_model:
-            tip_length = pipette_config.configs[right_model].tip_length
+            tip_length = pipette_config.load(right_model).tip_length
             right_data.update({'tip_length': tip_length})
         return {
             'left': left_data,
@@ -1,9 +1,12 @@
 from collections import namedtuple
-from opentrons.config import get_config_index, feature_flags as fflags
+from opentrons.config import get_config_index, write_json, children, \
+    file_state, feature_flags as fflags
 
+import copy
 import json
 import os
 import logging
+import time
 
 log = logging.getLogger(__name__)
 
@@ -82,6 +85,16 @@ SERIAL_SPEED = 115200
 DEFAULT_TIP_LENGTH_DICT = {'Pipette': 51.7}
 DEFAULT_LOG_LEVEL = 'INFO'
 
+# Changes saved to a config file are appended to a journal next to it (see
+# `_save_json`), which is folded back into the file once it holds this many
+# entries
+JOURNAL_EXTENSION = '.journal'
+JOURNAL_MAX_ENTRIES = 50
+
+# Contents of the config files with their journal replayed, by filename:
+# (file states, contents, journal entries or None if it must be compacted)
+_configs = {}
+
 robot_config = namedtuple(
     'robot_config',
     [
@@ -179,7 +192,7 @@ def save_deck_calibration(config: robot_config, dc_filename=None, tag=None):
         dc_filename = "{}-{}{}".format(root, tag, ext)
     deck_calibration = {
         'gantry_calibration': config_dict.pop('gantry_calibration')}
-    _save_json(deck_calibration, filename=dc_filename)
+    _save_json(deck_calibration, filename=dc_filename, journal=not tag)
 
 
 def save_robot_settings(config: robot_config, rs_filename=None, tag=None):
@@ -191,7 +204,7 @@ def save_robot_settings(config: robot_config, rs_filename=None, tag=None):
     if tag:
         root, ext = os.path.splitext(rs_filename)
         rs_filename = "{}-{}{}".format(root, tag, ext)
-    _save_json(config_dict, filename=rs_filename)
+    _save_json(config_dict, filename=rs_filename, journal=not tag)
 
     return config_dict
 
@@ -213,26 +226,164 @@ def clear(filename=None):
         files = [dc_filename, rs_filename]
     log.info('Deleting config file: {}'.format(filename))
     for file in files:
-        if os.path.exists(file):
-            os.remove(file)
+        _configs.pop(file, None)
+        for path in (file, journal_file(file)):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def journal_file(filename: str) -> str:
+    return filename + JOURNAL_EXTENSION
+
+
+def history(filename=None) -> list:
+    """
+    Changes saved to `filename` (the robot settings file by default) since
+    its journal was last compacted, oldest first, as a list of
+    (time, [(path, value)], [removed path]) tuples
+    """
+    filename = filename or get_config_index().get('robotSettingsFile')
+    return [
+        (entry['time'],
+         [(tuple(path), value) for path, value in entry.get('set', [])],
+         [tuple(path) for path in entry.get('unset', [])])
+        for entry in _read_journal(journal_file(filename))[0]]
+
+
+def compact(filename=None):
+    """
+    Write the current contents of `filename` (both config files by default)
+    in full and empty its journal
+    """
+    if filename:
+        files = [filename]
+    else:
+        files = [
+            get_config_index().get('deckCalibrationFile'),
+            get_config_index().get('robotSettingsFile')]
+    for file in files:
+        _load_json(file)
+        _compact(file, _configs[file][1])
 
 
-def _load_json(filename) -> dict:
+def _states(filename: str) -> tuple:
+    return (file_state(filename), file_state(journal_file(filename)))
+
+
+def _read_journal(path: str) -> (list, bool):
+    """
+    Entries of the journal at `path`, and whether it was read in full: an
+    entry cut short (by a power loss while it was written) ends the replay
+    """
+    entries = []
     try:
-        with open(filename, 'r') as file:
-            res = json.load(file)
+        with open(path, 'r') as journal:
+            lines = journal.readlines()
     except FileNotFoundError:
-        print('Warning: {0} not found. Loading defaults'.format(filename))
-        res = {}
-    except json.decoder.JSONDecodeError:
-        print('Error: {0} is corrupt. Loading defaults'.format(filename))
-        res = {}
-    return res
+        return entries, True
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            log.warning('Ignoring the end of corrupt journal {}'.format(path))
+            return entries, False
+    return entries, True
+
+
+def _apply(tree: dict, path: list, value):
+    *parents, key = path
+    for parent in parents:
+        if not isinstance(tree.get(parent), dict):
+            tree[parent] = {}
+        tree = tree[parent]
+    tree[key] = value
+
+
+def _remove(tree: dict, path: list):
+    *parents, key = path
+    for parent in parents:
+        tree = tree.get(parent)
+        if not isinstance(tree, dict):
+            return
+    tree.pop(key, None)
 
 
-def _save_json(data, filename):
-    # print("Saving json file at {}".format(filename))
+def _load_json(filename) -> dict:
+    """
+    Contents of `filename` with its journal replayed. They are kept in memory
+    and only read again when the file or its journal changed.
+    """
+    states = _states(filename)
+    cached = _configs.get(filename)
+    if cached is None or cached[0] != states:
+        try:
+            with open(filename, 'r') as file:
+                res = json.load(file)
+        except FileNotFoundError:
+            print('Warning: {0} not found. Loading defaults'.format(filename))
+            res = {}
+        except json.decoder.JSONDecodeError:
+            print('Error: {0} is corrupt. Loading defaults'.format(filename))
+            res = {}
+        entries, complete = _read_journal(journal_file(filename))
+        if entries and not isinstance(res, dict):
+            res = {}
+        for entry in entries:
+            for path in entry.get('unset', []):
+                _remove(res, path)
+            for path, value in entry.get('set', []):
+                _apply(res, path, value)
+        cached = _configs[filename] = (
+            states, res, len(entries) if complete else None)
+    return copy.deepcopy(cached[1])
+
+
+def _compact(filename: str, data, cache=True):
     os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, 'w') as file:
-        json.dump(data, file, sort_keys=True, indent=4)
+    write_json(filename, data, sort_keys=True, indent=4)
+    # Replaying the journal over the contents it led to changes nothing (it
+    # only sets and removes values), so being interrupted here is harmless
+    journal = journal_file(filename)
+    if os.path.exists(journal):
+        os.remove(journal)
+    if cache:
+        _configs[filename] = (_states(filename), data, 0)
+    else:
+        _configs.pop(filename, None)
+
+
+def _save_json(data, filename, journal=True):
+    """
+    Save `data` to `filename`. Only the values that changed or were removed
+    since the last save are written, as an entry appended to the journal of
+    the file; the file is rewritten in full when it does not exist yet and
+    every `JOURNAL_MAX_ENTRIES` saves. Without `journal` (for one-off files
+    such as backups), the file is written in full and not kept in memory.
+    """
+    new = json.loads(json.dumps(data))
+    if not journal or not os.path.exists(filename) \
+            or not isinstance(new, dict):
+        _compact(filename, new, cache=journal)
+        return data
+    old = _load_json(filename)
+    entries = _configs[filename][2]
+    if entries is None or entries >= JOURNAL_MAX_ENTRIES:
+        _compact(filename, new)
+        return data
+    new_values = children(new) if new else []
+    old_values = dict(children(old)) if old and isinstance(old, dict) else {}
+    changes = [
+        (path, value) for path, value in new_values
+        if path not in old_values or old_values[path] != value]
+    removed = sorted(
+        set(old_values).difference(path for path, _ in new_values))
+    if changes or removed:
+        entry = {'time': time.time(), 'set': changes}
+        if removed:
+            entry['unset'] = removed
+        with open(journal_file(filename), 'a') as file:
+            file.write(json.dumps(entry, sort_keys=True) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        _configs[filename] = (_states(filename), new, entries + 1)
     return data
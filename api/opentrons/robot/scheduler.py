@@ -0,0 +1,156 @@
+"""
+Opt-in reordering of pipette commands across mounts.
+
+Commands added to a :class:`Scheduler` are not run right away. When the
+scheduler runs (or its ``with`` block exits) they are replayed in an order
+that keeps running the same pipette for as long as possible, so protocols
+alternating between two pipettes retract and switch less often.
+
+A command only moves ahead of an earlier one if the two are independent:
+they belong to different pipettes, do not touch any of the same wells and do
+not take tips from any of the same tip racks. Wells are taken from the
+locations passed to the command. A command with no location works where its
+pipette last was, so it is given the wells of that pipette's previous
+command. Pipettes sharing a tip rack take the next tip the rack has left
+(see :mod:`opentrons.trackers.tip_tracker`), so commands that can pick up
+tips keep their order across those pipettes.
+"""
+import logging
+from collections import namedtuple
+
+from opentrons.containers.placeable import Container, Placeable, WellSeries
+
+log = logging.getLogger(__name__)
+
+Step = namedtuple('Step', 'instrument method args kwargs wells racks')
+
+# Pipette methods that can take tips from (or change the tips left in) the
+# pipette's tip racks
+TIP_METHODS = frozenset([
+    'pick_up_tip', 'transfer', 'distribute', 'consolidate', 'start_at_tip',
+    'reset_tip_tracking', 'reset'])
+
+
+def _wells(value):
+    """
+    Wells referenced by a command argument: a well, a labware, a
+    ``(placeable, vector)`` location or any list of those
+    """
+    if isinstance(value, WellSeries):
+        return {well for item in value for well in _wells(item)}
+    if isinstance(value, Container):
+        return set(value.get_children_list())
+    if isinstance(value, Placeable):
+        return {value}
+    if isinstance(value, tuple) and value and \
+            isinstance(value[0], Placeable):
+        return _wells(value[0])
+    if isinstance(value, (list, tuple)):
+        return {well for item in value for well in _wells(item)}
+    return set()
+
+
+def switches(steps):
+    """
+    Number of times consecutive `steps` change pipette
+    """
+    return sum(
+        1 for previous, step in zip(steps, steps[1:])
+        if previous.instrument is not step.instrument)
+
+
+class Scheduler(object):
+    """
+    Collects pipette commands and runs them in an order minimizing pipette
+    switches while preserving the order of dependent commands
+
+    Examples
+    --------
+    ..
+    >>> from opentrons.robot.scheduler import Scheduler # doctest: +SKIP
+    >>> with Scheduler() as schedule: # doctest: +SKIP
+    ...     for well in plate.cols[0]:
+    ...         schedule.add(p10.transfer, 5, trough['A1'], well)
+    ...         schedule.add(p300.transfer, 200, trough['A2'], well)
+    """
+    def __init__(self):
+        self.steps = []
+        self._last_wells = {}
+
+    def add(self, command, *args, **kwargs):
+        """
+        Schedule ``command(*args, **kwargs)``, where `command` is a method of
+        a pipette (for example ``p300.transfer``)
+        """
+        instrument = command.__self__
+        wells = set()
+        for value in list(args) + list(kwargs.values()):
+            wells |= _wells(value)
+        if not wells:
+            wells = self._last_wells.get(instrument, set())
+        self._last_wells[instrument] = wells
+        racks = set()
+        if command.__name__ in TIP_METHODS:
+            racks.update(getattr(instrument, 'tip_racks', None) or [])
+            # tips picked up at a given location are taken from their rack
+            racks.update(
+                well.get_parent() for well in wells
+                if isinstance(well.get_parent(), Container) and
+                'tiprack' in well.get_parent().get_type())
+        self.steps.append(Step(
+            instrument=instrument,
+            method=command.__name__,
+            args=args,
+            kwargs=kwargs,
+            wells=frozenset(wells),
+            racks=frozenset(racks)))
+        return self
+
+    def _dependencies(self):
+        """
+        For each step, the indexes of earlier steps it has to run after
+        """
+        dependencies = []
+        for i, step in enumerate(self.steps):
+            dependencies.append({
+                j for j, earlier in enumerate(self.steps[:i])
+                if earlier.instrument is step.instrument or
+                earlier.wells & step.wells or earlier.racks & step.racks
+            })
+        return dependencies
+
+    def order(self):
+        """
+        Steps in the order they will run: whenever possible the next step
+        is the earliest ready step of the pipette that ran last, otherwise
+        the earliest ready step
+        """
+        dependencies = self._dependencies()
+        done = set()
+        ordered = []
+        pending = list(range(len(self.steps)))
+        while pending:
+            ready = [i for i in pending if dependencies[i] <= done]
+            current = ordered[-1].instrument if ordered else None
+            same = [i for i in ready if self.steps[i].instrument is current]
+            index = (same or ready)[0]
+            pending.remove(index)
+            done.add(index)
+            ordered.append(self.steps[index])
+        return ordered
+
+    def run(self):
+        steps = self.order()
+        log.debug('Running {} steps with {} pipette switches ({} as added)'
+                  .format(len(steps), switches(steps), switches(self.steps)))
+        self.steps = []
+        self._last_wells.clear()
+        for step in steps:
+            getattr(step.instrument, step.method)(*step.args, **step.kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.run()
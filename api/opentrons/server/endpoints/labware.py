@@ -0,0 +1,57 @@
+import asyncio
+import functools
+import logging
+from aiohttp import web
+
+from opentrons.data_storage import labware_catalog
+
+log = logging.getLogger(__name__)
+
+_NUMBER_PARAMETERS = {
+    'minWells': ('min_wells', int),
+    'maxWells': ('max_wells', int),
+    'minVolume': ('min_volume', float),
+    'maxVolume': ('max_volume', float)
+}
+
+
+async def search_labware(request):
+    """
+    List the labware definitions from the labware catalog, without loading
+    them. Optional query parameters narrow down the list: 'name' (part of
+    the name), 'minWells', 'maxWells', 'minVolume' and 'maxVolume' (volume
+    of the largest well, in uL).
+
+    Example:
+
+    ```
+    {
+      'labware': [
+        {
+          'name': '96-flat',
+          'source': 'default',
+          'wells': 96,
+          'max_volume': 400,
+          'footprint': [105.4, 69.44],
+          'checksum': '0c4d0e4b...'
+        }
+      ]
+    }
+    ```
+    """
+    criteria = {'name': request.query.get('name')}
+    try:
+        for parameter, (key, kind) in _NUMBER_PARAMETERS.items():
+            if parameter in request.query:
+                criteria[key] = kind(request.query[parameter])
+    except ValueError as e:
+        return web.json_response(
+            {'message': 'Invalid {}: {}'.format(parameter, e)}, status=400)
+
+    # reading the catalog and the changed definition files blocks, so it is
+    # done from a thread to keep the event loop serving requests
+    loop = asyncio.get_event_loop()
+    entries = await loop.run_in_executor(
+        None, functools.partial(labware_catalog.search, **criteria))
+    return web.json_response(
+        {'labware': [entry._asdict() for entry in entries]})
@@ -3,38 +3,61 @@ import aiohttp
 import functools
 import json
 import logging
+import threading
 import traceback
+import weakref
 
 from aiohttp import web
 from aiohttp import WSCloseCode
 from asyncio import Queue
+from collections import OrderedDict
 from opentrons.server import serialize
+from opentrons.util.calls import read_only, is_read_only
 from concurrent.futures import ThreadPoolExecutor
 
 log = logging.getLogger(__name__)
 
-# Number of executor threads
+# Default number of executor threads for calls that aren't read-only
 MAX_WORKERS = 2
 
+# Number of threads running read-only calls, see `read_only`
+READ_ONLY_WORKERS = 1
+
+# Max number of objects kept alive on behalf of a single client
+MAX_CLIENT_REFERENCES = 10000
+
 # Keep these in sync with ES code
 CALL_RESULT_MESSAGE = 0
 CALL_ACK_MESSAGE = 1
 NOTIFICATION_MESSAGE = 2
 CONTROL_MESSAGE = 3
 CALL_NACK_MESSAGE = 4
+# Sent by a client to let the server drop objects it no longer references
+RELEASE_MESSAGE = 5
 
 
 class Server(object):
-    def __init__(self, root=None, loop=None, middlewares=()):
+    def __init__(self, root=None, loop=None, middlewares=(), max_workers=None):
         self.monitor_events_task = None
         self.loop = loop or asyncio.get_event_loop()
-        self.objects = {}
-        self.system = SystemCalls(self.objects)
+        self.objects = ObjectRegistry()
+        self.system = SystemCalls(self.objects, self)
 
         self.root = root
 
-        # Allow for two concurrent calls max
-        self.executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        # Calls that are not read-only run in the executor, which limits
+        # the number of concurrent (hardware) calls
+        self.max_workers = max_workers or MAX_WORKERS
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.read_only_executor = ThreadPoolExecutor(
+            max_workers=READ_ONLY_WORKERS)
+        self._stats_lock = threading.Lock()
+        self._call_stats = {
+            'queued': 0,
+            'running': 0,
+            'read_only': 0,
+            'completed': 0
+        }
 
         self.clients = {}
         self.tasks = []
@@ -144,12 +167,15 @@ class Server(object):
         log.debug('Tasks: {0}'.format(self.tasks))
         log.debug('Clients: {0}'.format(self.clients))
 
+        self.objects.add_client(client_id)
         try:
             log.debug('Sending root info to {0}'.format(client_id))
             await client.send_json({
                 '$': {'type': CONTROL_MESSAGE},
-                'root': self.call_and_serialize(lambda: self.root),
-                'type': self.call_and_serialize(lambda: type(self.root))
+                'root': self.call_and_serialize(
+                    lambda: self.root, client_id=client_id),
+                'type': self.call_and_serialize(
+                    lambda: type(self.root), client_id=client_id)
             })
             log.debug('Root info sent to {0}'.format(client_id))
         except Exception:
@@ -159,7 +185,7 @@ class Server(object):
             self.clients[client] = self.send_worker(client)
             # Async receive client data until websocket is closed
             async for msg in client:
-                task = self.loop.create_task(self.process(msg))
+                task = self.loop.create_task(self.process(msg, client_id))
                 task.add_done_callback(task_done)
                 self.tasks += [task]
         except Exception:
@@ -168,6 +194,7 @@ class Server(object):
             log.info('Closing WebSocket {0}'.format(id(client)))
             await client.close()
             del self.clients[client]
+            self.objects.remove_client(client_id)
 
         return client
 
@@ -218,11 +245,16 @@ class Server(object):
 
         return [resolve(a) for a in args]
 
-    async def process(self, message):
+    async def process(self, message, client_id=None):
         try:
             if message.type == aiohttp.WSMsgType.TEXT:
                 data = json.loads(message.data)
                 meta = data.pop('$')
+
+                if meta.get('type') == RELEASE_MESSAGE:
+                    self.objects.release(client_id, data.get('ids', []))
+                    return
+
                 token = meta['token']
 
                 # If no id, or id is null/none/undefined assume
@@ -250,18 +282,49 @@ class Server(object):
         except Exception:
             log.exception('Error while processing request')
 
-    def call_and_serialize(self, func, max_depth=0):
+    def call_and_serialize(self, func, max_depth=0, client_id=None):
         call_result = func()
         serialized, refs = serialize.get_object_tree(
             call_result, max_depth=max_depth)
-        self.objects.update(refs)
+        # Results and notifications are broadcast to every client, so unless
+        # a specific client is given, objects are referenced by all of them
+        self.objects.update(refs, client_id=client_id)
         return serialized
 
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, delta in deltas.items():
+                self._call_stats[key] += delta
+
+    def call_stats(self):
+        """
+        Number of calls waiting for an executor thread (queued), running in
+        the executor (running), read-only calls run in their own executor
+        (read_only) and calls completed by the executor (completed)
+        """
+        with self._stats_lock:
+            return dict(self._call_stats, max_workers=self.max_workers)
+
+    def _run_queued(self, func):
+        self._count(queued=-1, running=1)
+        try:
+            return self.call_and_serialize(func)
+        finally:
+            self._count(running=-1, completed=1)
+
+    async def _dispatch(self, func):
+        if is_read_only(func):
+            self._count(read_only=1)
+            return await self.loop.run_in_executor(
+                self.read_only_executor, self.call_and_serialize, func)
+        self._count(queued=1)
+        return await self.loop.run_in_executor(
+            self.executor, self._run_queued, func)
+
     async def make_call(self, func, token):
         response = {'$': {'type': CALL_RESULT_MESSAGE, 'token': token}}
         try:
-            call_result = await self.loop.run_in_executor(
-                self.executor, self.call_and_serialize, func)
+            call_result = await self._dispatch(func)
             response['$']['status'] = 'success'
         except Exception as e:
             trace = traceback.format_exc()
@@ -305,10 +368,142 @@ class Server(object):
             asyncio.run_coroutine_threadsafe(queue.put(payload), self.loop)
 
 
+class ObjectRegistry(object):
+    """
+    Objects sent to clients, by id.
+
+    Every object is tracked with a weak reference, and is kept alive on
+    behalf of each client it was sent to until the client releases it,
+    disconnects, or the client's reference count exceeds
+    ``max_client_references`` (least recently sent objects go first).
+    Once no client references an object, it is dropped from the registry as
+    soon as it is garbage collected. Objects assigned with ``registry[id]``
+    are kept for the lifetime of the registry.
+    """
+    def __init__(self, max_client_references=MAX_CLIENT_REFERENCES):
+        self.max_client_references = max_client_references
+        self._lock = threading.RLock()
+        self._permanent = {}
+        self._weak = {}
+        self._clients = {}
+
+    def __setitem__(self, _id, obj):
+        with self._lock:
+            self._permanent[_id] = obj
+
+    def __getitem__(self, _id):
+        with self._lock:
+            if _id in self._permanent:
+                return self._permanent[_id]
+            ref = self._weak.get(_id)
+            obj = ref() if ref else None
+            if obj is not None:
+                return obj
+            for references in self._clients.values():
+                if _id in references:
+                    return references[_id]
+        raise KeyError(_id)
+
+    def __contains__(self, _id):
+        try:
+            self[_id]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return len(self._ids())
+
+    def _ids(self):
+        with self._lock:
+            ids = set(self._permanent)
+            ids.update(_id for _id, ref in self._weak.items() if ref())
+            for references in self._clients.values():
+                ids.update(references)
+        return ids
+
+    def _forget(self, _id, ref):
+        with self._lock:
+            if self._weak.get(_id) is ref:
+                del self._weak[_id]
+
+    def _track(self, _id, obj):
+        ref = self._weak.get(_id)
+        if ref is not None and ref() is obj:
+            return
+        try:
+            self._weak[_id] = weakref.ref(
+                obj, lambda ref, _id=_id: self._forget(_id, ref))
+        except TypeError:
+            # Not weak-referenceable, only client references keep it
+            self._weak.pop(_id, None)
+
+    def _reference(self, references, _id, obj):
+        references[_id] = obj
+        references.move_to_end(_id)
+        while len(references) > self.max_client_references:
+            references.popitem(last=False)
+
+    def update(self, refs, client_id=None):
+        """
+        Register objects sent to ``client_id``, or to all connected clients
+        if ``client_id`` is None.
+        """
+        with self._lock:
+            if client_id is None:
+                clients = list(self._clients.values())
+            else:
+                clients = [self._clients.setdefault(client_id, OrderedDict())]
+            for _id, obj in refs.items():
+                self._track(_id, obj)
+                for references in clients:
+                    self._reference(references, _id, obj)
+
+    def add_client(self, client_id):
+        with self._lock:
+            self._clients.setdefault(client_id, OrderedDict())
+
+    def remove_client(self, client_id):
+        with self._lock:
+            self._clients.pop(client_id, None)
+        log.debug('Client {0} removed, registry: {1}'.format(
+            client_id, self.stats()))
+
+    def release(self, client_id, ids):
+        """
+        Drop the references ``client_id`` holds to objects in ``ids``
+        """
+        with self._lock:
+            references = self._clients.get(client_id, {})
+            for _id in ids:
+                references.pop(_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'objects': len(self._ids()),
+                'tracked': len(self._weak),
+                'permanent': len(self._permanent),
+                'clients': {
+                    str(client_id): len(references)
+                    for client_id, references in self._clients.items()}
+            }
+
+
 class SystemCalls(object):
-    def __init__(self, objects):
+    def __init__(self, objects, server=None):
         self.objects = objects
+        self._server = server
         objects[id(self)] = self
 
+    @read_only
     def get_object_by_id(self, id):
         return self.objects[id]
+
+    @read_only
+    def get_object_registry_stats(self):
+        return self.objects.stats()
+
+    @read_only
+    def get_call_stats(self):
+        return self._server.call_stats() if self._server else {}
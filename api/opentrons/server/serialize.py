@@ -1,9 +1,42 @@
-import functools
+PRIMITIVE, SEQUENCE, DICT, OBJECT, OPAQUE = range(5)
 
+# TODO: what's the better way to detect primitive types?
+_PRIMITIVE_TYPES = (str, int, bool, float, complex, type(None))
 
-def _get_object_tree(max_depth, path, refs, depth, obj):  # noqa C901
+# Per-type serialization schema: (kind, iterable, tracked), where instances of
+# tracked types (those with a __dict__, including dict and list subclasses
+# such as OrderedDict) are checked for circular references. These are
+# properties of the type, so they are computed once instead of per instance
+_schemas = {}
 
-    def object_container(value):
+
+def _schema(obj):
+    t = type(obj)
+    schema = _schemas.get(t)
+    if schema is None:
+        if isinstance(obj, _PRIMITIVE_TYPES):
+            kind = PRIMITIVE
+        elif isinstance(obj, (list, tuple)):
+            kind = SEQUENCE
+        elif isinstance(obj, dict):
+            kind = DICT
+        elif hasattr(obj, '__dict__'):
+            kind = OBJECT
+        else:
+            kind = OPAQUE
+        iterable = hasattr(t, '__iter__') or hasattr(t, '__getitem__')
+        tracked = hasattr(obj, '__dict__')
+        schema = _schemas[t] = (kind, iterable, tracked)
+    return schema
+
+
+def _get_object_tree(max_depth, refs, obj):  # noqa C901
+    # Ids of every object visited so far. Objects with a __dict__ are kept
+    # alive by refs for the duration of the call, so their ids can't be
+    # reused by temporaries created while walking the tree
+    seen = set()
+
+    def object_container(obj, value):
         # Save id of instance of object's type as a reference too
         # We will need it to keep track of types the same we are
         # tracking objects
@@ -11,53 +44,55 @@ def _get_object_tree(max_depth, path, refs, depth, obj):  # noqa C901
         refs[id(t)] = t
         return {'i': id(obj), 't': id(t), 'v': value}
 
-    # TODO: what's the better way to detect primitive types?
-    if isinstance(obj, (str, int, bool, float, complex)) or obj is None:
-        return obj
+    def iterate(kv, depth):
+        return {str(k): object_tree(v, depth) for k, v in kv.items()}
 
-    # If we have ourself in path, it's a circular reference
-    # we are terminating it with a valid id but a value of None
-    if hasattr(obj, '__dict__') and id(obj) in path:
-        return object_container(None)
+    def object_tree(obj, depth):
+        kind, iterable, tracked = _schema(obj)
 
-    # Shorthand for calling ourselves recursively
-    object_tree = functools.partial(
-        _get_object_tree, max_depth, path, refs, depth + 1)
+        if kind == PRIMITIVE:
+            return obj
 
-    path += [id(obj)]
+        # If we have seen ourself already, it's a circular reference
+        # we are terminating it with a valid id but a value of None
+        if tracked and id(obj) in seen:
+            return object_container(obj, None)
 
-    # Cut-off at max_depth
-    # If max_depth == 0 (evaluates to False) — keep going
-    if max_depth and (depth >= max_depth):
-        return {}
+        seen.add(id(obj))
 
-    if isinstance(obj, (list, tuple)):
-        return [object_tree(o) for o in obj]
+        # Cut-off at max_depth
+        # If max_depth == 0 (evaluates to False) — keep going
+        if max_depth and (depth >= max_depth):
+            return {}
 
-    def iterate(kv): return {str(k): object_tree(v) for k, v in kv.items()}
+        depth += 1
+        if kind == SEQUENCE:
+            return [object_tree(o, depth) for o in obj]
+        if kind == DICT:
+            return object_container(obj, iterate(obj, depth))
+        if kind == OPAQUE:
+            return object_container(obj, {})
 
-    if isinstance(obj, dict):
-        return object_container(iterate(obj))
-    elif hasattr(obj, '__dict__'):
         refs[id(obj)] = obj
-        items = []
+        tail = {}
         # If Type is iterable we will iterate generating numeric keys and
         # and merge with the output
-        try:
-            items = [object_tree(o) for o in obj]
-        except TypeError:
-            pass
-        tail = {i: v for i, v in enumerate(items)}
+        if iterable:
+            try:
+                tail = {
+                    i: object_tree(o, depth) for i, o in enumerate(obj)}
+            except TypeError:
+                tail = {}
 
         # Filter out private attributes
         attributes = {
             k: v for k, v in obj.__dict__.items() if not k.startswith('_')}
-        return object_container({**iterate(attributes), **tail})
-    else:
-        return object_container({})
+        return object_container(obj, {**iterate(attributes, depth), **tail})
+
+    return object_tree(obj, 0)
 
 
 def get_object_tree(obj, max_depth=0):
     refs = {}
-    tree = _get_object_tree(max_depth, [], refs, 0, obj)
+    tree = _get_object_tree(max_depth, refs, obj)
     return (tree, refs)
@@ -58,6 +58,13 @@ class Node(namedtuple('Node', 'parent children transform')):
             (transform1 == transform2).all()
 
 
+class WorkingState(dict):
+    """
+    Pose tree that :func:`update` changes in place instead of copying, used
+    for the duration of a compound motion (see :func:`working`)
+    """
+
+
 def init():
     return add({}, ROOT, parent=None)
 
@@ -102,13 +109,26 @@ def remove(state, obj):
 
 
 def update(state, obj, point: Point, transform=np.identity(4)):
-    state = state.copy()
+    if not isinstance(state, WorkingState):
+        state = state.copy()
     state[obj] = state[obj].update(
         transform.dot(inv(translate(point)))
     )
     return state
 
 
+def working(state) -> WorkingState:
+    """
+    Copy of `state` that updates are applied to in place, to be turned back
+    into a regular state with :func:`commit` once the motion is done
+    """
+    return WorkingState(state)
+
+
+def commit(state) -> Dict[object, Node]:
+    return dict(state)
+
+
 def descendants(state, obj, level=0):
     """ Returns a flattened list tuples of DFS traversal of subtree
     from object that contains descendant object and it's depth """
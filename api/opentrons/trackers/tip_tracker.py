@@ -0,0 +1,338 @@
+"""
+Occupancy of tip racks.
+
+Every tip rack used by a pipette gets a :class:`TipRackState`: a bitmap with
+one bit per tip (set while the tip is still in the rack) and a second bitmap
+with one bit per column that still holds all of its tips. The next tip and
+the next full column are the lowest set bits of those, so finding them does
+not depend on how many tips were used before.
+
+States are kept per rack, not per pipette, so pipettes sharing a rack never
+pick up the same tip, and they can be saved to and restored from disk to
+resume a run with partially used racks. Refilling and starting at a given tip
+only affect the pipette asking for it: a pipette gets back the tips it used,
+and skips the tips before its starting tip without using them up for others.
+
+States are dropped by :func:`clear` when the robot is reset.
+"""
+import copy
+import json
+import logging
+import weakref
+
+from opentrons.containers.placeable import WellSeries
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# States by rack, which they keep alive until `clear` is called
+_states = {}
+
+
+def _lowest_bit(mask):
+    return (mask & -mask).bit_length() - 1
+
+
+def _wells(tip):
+    if isinstance(tip, WellSeries):
+        return tip.get_children_list()
+    return [tip]
+
+
+class TipRackState(object):
+    """
+    Tips left in a single tip rack. Tips are numbered in the order the
+    rack iterates its wells, columns in the order of ``rack.cols``.
+    """
+    def __init__(self, rack):
+        self.rack = rack
+        self._wells = list(rack)
+        self._index = {well: i for i, well in enumerate(self._wells)}
+        self._columns = list(rack.cols)
+        self._column_masks = []
+        self._column_of = [0] * len(self._index)
+        for column, wells in enumerate(self._columns):
+            mask = 0
+            for well in wells:
+                i = self._index[well]
+                mask |= 1 << i
+                self._column_of[i] = column
+            self._column_masks.append(mask)
+        # Tips taken by each pipette, and the tips and columns each pipette
+        # skips (see `use_before`), as bitmaps
+        self._taken = weakref.WeakKeyDictionary()
+        self._skipped = weakref.WeakKeyDictionary()
+        self.reset()
+
+    def reset(self, owner=None):
+        """
+        Refill the rack, or only put back the tips taken by `owner`
+        """
+        if owner is None:
+            self.available = (1 << len(self._index)) - 1
+            self._full_columns = (1 << len(self._columns)) - 1
+            self._taken.clear()
+            self._skipped.clear()
+        else:
+            self.available |= self._taken.pop(owner, 0)
+            self._skipped.pop(owner, None)
+            self._update_full_columns()
+
+    def empty(self):
+        """
+        Mark every tip in the rack as used
+        """
+        self.available = 0
+        self._full_columns = 0
+
+    def __len__(self):
+        return bin(self.available).count('1')
+
+    def __contains__(self, well):
+        return well in self._index
+
+    def is_available(self, well):
+        return bool(self.available & (1 << self._index[well]))
+
+    def next_tip(self, owner=None):
+        """
+        First tip still in the rack (and not skipped by `owner`), or ``None``
+        if there is none
+        """
+        available = self.available & ~self._skips(owner)[0]
+        if not available:
+            return None
+        return self._wells[_lowest_bit(available)]
+
+    def next_column(self, owner=None):
+        """
+        First column with all of its tips (and not skipped by `owner`), or
+        ``None`` if there is none
+        """
+        full = self._full_columns & ~self._skips(owner)[1]
+        if not full:
+            return None
+        return self._columns[_lowest_bit(full)]
+
+    def use(self, tip, owner=None):
+        """
+        Mark the well, or every well of a :class:`WellSeries`, as used (by
+        `owner`)
+        """
+        taken = 0
+        for well in _wells(tip):
+            i = self._index.get(well)
+            if i is not None:
+                taken |= 1 << i
+                self._full_columns &= ~(1 << self._column_of[i])
+        self.available &= ~taken
+        if owner is not None:
+            self._taken[owner] = self._taken.get(owner, 0) | taken
+
+    def use_before(self, tip, owner=None):
+        """
+        Mark every tip the pipette would pick up before `tip` as used: the
+        tips preceding it, or the columns preceding its column if `tip` is a
+        :class:`WellSeries`. With an `owner`, these tips are only skipped by
+        `owner` and stay available to other pipettes.
+        """
+        first = self._index[_wells(tip)[0]]
+        if isinstance(tip, WellSeries):
+            column = self._column_of[first]
+            tips = 0
+            for mask in self._column_masks[:column]:
+                tips |= mask
+        else:
+            tips = (1 << first) - 1
+        if owner is None:
+            self.available &= ~tips
+            self._update_full_columns()
+        else:
+            self._skipped[owner] = (tips, self._columns_with(tips))
+
+    def _skips(self, owner):
+        if owner is None:
+            return (0, 0)
+        return self._skipped.get(owner, (0, 0))
+
+    def skip(self, owner):
+        """
+        Skip every tip of the rack for `owner`
+        """
+        self._skipped[owner] = (
+            (1 << len(self._index)) - 1, (1 << len(self._columns)) - 1)
+
+    def _columns_with(self, tips):
+        columns = 0
+        for column, mask in enumerate(self._column_masks):
+            if tips & mask:
+                columns |= 1 << column
+        return columns
+
+    def _update_full_columns(self):
+        self._full_columns = 0
+        for column, mask in enumerate(self._column_masks):
+            if self.available & mask == mask:
+                self._full_columns |= 1 << column
+
+    def copy(self):
+        """
+        Independent copy of the state, for the same rack
+        """
+        state = copy.copy(self)
+        state._taken = weakref.WeakKeyDictionary(self._taken)
+        state._skipped = weakref.WeakKeyDictionary(self._skipped)
+        return state
+
+    def snapshot(self):
+        return {
+            'type': self.rack.get_type(),
+            'tips': len(self._index),
+            'available': self.available
+        }
+
+    def restore(self, snapshot):
+        if snapshot.get('tips') != len(self._index):
+            raise ValueError(
+                'Tip snapshot for {} has {} tips, rack has {}'.format(
+                    self.rack, snapshot.get('tips'), len(self._index)))
+        self.available = int(snapshot['available'])
+        self._update_full_columns()
+
+
+def get_state(rack):
+    """
+    Occupancy of `rack`, created (full) the first time it is requested
+    """
+    state = _states.get(rack)
+    if state is None:
+        state = _states[rack] = TipRackState(rack)
+    return state
+
+
+def tracked_racks():
+    return list(_states.keys())
+
+
+def clear():
+    """
+    Forget the state of every rack
+    """
+    _states.clear()
+
+
+def get_states() -> dict:
+    """
+    Copy of the state of every tracked rack, by rack (see `set_states`)
+    """
+    return {rack: state.copy() for rack, state in _states.items()}
+
+
+def set_states(states: dict):
+    """
+    Replace the state of every rack with a copy of `states`
+    """
+    _states.clear()
+    _states.update(
+        {rack: state.copy() for rack, state in states.items()})
+
+
+def reset(racks, owner=None):
+    """
+    Refill `racks`, or only put back the tips `owner` took from them
+    """
+    for rack in racks:
+        get_state(rack).reset(owner)
+
+
+def next_tip(racks, channels=1, owner=None):
+    """
+    Take the next tip (or full column of tips if `channels` > 1) from the
+    first of `racks` that has one. Returns ``None`` if all racks are empty.
+    """
+    for rack in racks:
+        state = get_state(rack)
+        tip = state.next_column(owner) if channels > 1 \
+            else state.next_tip(owner)
+        if tip is not None:
+            state.use(tip, owner)
+            return tip
+    return None
+
+
+def start_at(racks, tip, owner=None):
+    """
+    Mark all tips of `racks` preceding `tip` as used, or only skip them for
+    `owner`
+    """
+    rack = _wells(tip)[0].get_parent()
+    for each in racks:
+        state = get_state(each)
+        if each is rack:
+            state.use_before(tip, owner)
+            return
+        if owner is None:
+            state.empty()
+        else:
+            state.skip(owner)
+
+
+def use(tip, owner=None):
+    """
+    Mark `tip` as used (by `owner`) if it belongs to a tracked rack
+    """
+    state = _states.get(_wells(tip)[0].get_parent())
+    if state is not None:
+        state.use(tip, owner)
+
+
+def _rack_key(rack):
+    slot = rack.get_parent()
+    if slot is not None and slot.get_name() is not None:
+        return str(slot.get_name())
+    return str(rack.get_name())
+
+
+def snapshot(racks=None):
+    """
+    JSON-serializable occupancy of `racks` (defaults to every tracked rack),
+    keyed by deck slot
+    """
+    if racks is None:
+        racks = tracked_racks()
+    return {
+        'version': SNAPSHOT_VERSION,
+        'racks': {_rack_key(rack): get_state(rack).snapshot()
+                  for rack in racks}
+    }
+
+
+def restore(data, racks=None):
+    """
+    Apply a :func:`snapshot` to `racks` (defaults to every tracked rack).
+    Racks are matched by deck slot and type; racks missing from the
+    snapshot are left untouched.
+    """
+    if racks is None:
+        racks = tracked_racks()
+    saved = data.get('racks', {})
+    for rack in racks:
+        entry = saved.get(_rack_key(rack))
+        if entry is None:
+            continue
+        if entry.get('type') != rack.get_type():
+            log.warning('Not restoring tips of {}: snapshot is for {}'.format(
+                rack, entry.get('type')))
+            continue
+        get_state(rack).restore(entry)
+
+
+def save(path, racks=None):
+    with open(path, 'w') as snapshot_file:
+        json.dump(snapshot(racks), snapshot_file, indent=2)
+
+
+def load(path, racks=None):
+    with open(path) as snapshot_file:
+        restore(json.load(snapshot_file), racks)
@@ -0,0 +1,357 @@
+"""
+Liquid held by labware wells and pipettes.
+
+Each tracked labware keeps a single array of volumes with one row per well
+(in the order the labware iterates its wells) and one column per reagent,
+plus arrays of well capacities, depths and cross-sections used to work out
+liquid heights. Reagent columns are shared by all labware, so deck-wide
+queries are sums of arrays rather than walks over wells.
+
+Labware is tracked from the first time liquid is put in it with :func:`fill`,
+or dispensed into it from a pipette holding tracked liquid. Liquid of
+labware that is not tracked is not followed. If a pipette draws more than a
+tracked well holds, the difference is recorded as an unknown reagent
+(``None``).
+
+Everything is dropped by :func:`clear` when the robot is reset.
+"""
+import copy
+import logging
+import math
+import weakref
+
+import numpy as np
+
+from opentrons.containers.placeable import Container, WellSeries
+
+log = logging.getLogger(__name__)
+
+# Depth (mm) the tip is kept below the liquid surface left after aspirating
+ASPIRATE_DEPTH = 2.0
+
+_reagents = []
+_reagent_index = {}
+# States by labware, which they keep alive until `clear` is called
+_labware = {}
+_pipettes = weakref.WeakKeyDictionary()
+
+
+def _reagent(name):
+    column = _reagent_index.get(name)
+    if column is None:
+        column = _reagent_index[name] = len(_reagents)
+        _reagents.append(name)
+    return column
+
+
+def _pad(array, axis=-1):
+    missing = len(_reagents) - array.shape[axis]
+    if not missing:
+        return array
+    pad = [(0, 0)] * array.ndim
+    pad[axis] = (0, missing)
+    return np.pad(array, pad, 'constant')
+
+
+def _wells(location):
+    if isinstance(location, WellSeries):
+        return location.get_children_list()
+    if isinstance(location, (list, tuple)):
+        return list(location)
+    if isinstance(location, Container):
+        return location.get_children_list()
+    return [location]
+
+
+def _cross_section(well):
+    properties = well.properties
+    if properties.get('diameter'):
+        return math.pi * (properties['diameter'] / 2) ** 2
+    return properties.get('length', 0) * properties.get('width', 0)
+
+
+class LabwareVolumes(object):
+    """
+    Volumes of liquid in the wells of a single labware
+    """
+    def __init__(self, labware):
+        self.labware = labware
+        wells = list(labware)
+        self._index = {well: i for i, well in enumerate(wells)}
+        self.capacity = np.array([
+            w.properties.get('total-liquid-volume') or np.inf for w in wells],
+            dtype=float)
+        self.depth = np.array([w.z_size() for w in wells], dtype=float)
+        self.area = np.array([_cross_section(w) for w in wells], dtype=float)
+        self._volumes = np.zeros((len(wells), len(_reagents)))
+
+    def copy(self):
+        """
+        Independent copy of the volumes, for the same labware
+        """
+        state = copy.copy(self)
+        state._volumes = self._volumes.copy()
+        return state
+
+    def indexes(self, wells):
+        return np.array([self._index[well] for well in wells], dtype=int)
+
+    @property
+    def volumes(self):
+        """
+        Array of volumes, one row per well and one column per reagent
+        """
+        self._volumes = _pad(self._volumes)
+        return self._volumes
+
+    @property
+    def totals(self):
+        return self.volumes.sum(axis=1)
+
+    def heights(self):
+        """
+        Height of the liquid above the bottom of each well, ``nan`` where
+        the shape of the well is unknown
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            heights = np.where(
+                self.area > 0, self.totals / self.area, np.nan)
+        return np.minimum(heights, self.depth)
+
+    def add(self, indexes, composition):
+        volumes = self.volumes
+        np.add.at(volumes, indexes, _pad(composition))
+        overflow = volumes[indexes].sum(axis=1) > self.capacity[indexes]
+        if overflow.any():
+            log.warning('Overfilled {} well(s) of {}'.format(
+                overflow.sum(), self.labware))
+
+    def remove(self, indexes, volume):
+        """
+        Take `volume` from each of the wells at `indexes` (as much as is
+        left), in proportion of the reagents in them. Returns the summed
+        composition of what was taken.
+        """
+        volumes = self.volumes
+        taken = np.zeros(volumes.shape[1])
+        for i in indexes:
+            total = volumes[i].sum()
+            if total <= 0:
+                continue
+            fraction = min(volume / total, 1.0)
+            taken += volumes[i] * fraction
+            volumes[i] *= 1 - fraction
+        return taken
+
+
+def get_state(labware):
+    """
+    Volume tracking state of `labware`, created (empty) if needed
+    """
+    state = _labware.get(labware)
+    if state is None:
+        state = _labware[labware] = LabwareVolumes(labware)
+    return state
+
+
+def tracked_labware():
+    return list(_labware.keys())
+
+
+def clear():
+    """
+    Forget every labware, pipette and reagent
+    """
+    _labware.clear()
+    _pipettes.clear()
+    _reagents.clear()
+    _reagent_index.clear()
+
+
+def get_states() -> tuple:
+    """
+    Copy of the volumes of every tracked labware and pipette, with the
+    reagents they refer to (see `set_states`)
+    """
+    return (
+        list(_reagents),
+        {labware: state.copy() for labware, state in _labware.items()},
+        {pipette: contents.copy() for pipette, contents in _pipettes.items()})
+
+
+def set_states(states: tuple):
+    """
+    Replace every tracked volume with a copy of `states`
+    """
+    reagents, labware, pipettes = states
+    clear()
+    for reagent in reagents:
+        _reagent(reagent)
+    _labware.update(
+        {each: state.copy() for each, state in labware.items()})
+    _pipettes.update(
+        {pipette: contents.copy() for pipette, contents in pipettes.items()})
+
+
+def _locate(wells, track=True):
+    """
+    Group `wells` by labware, as ``[(state, indexes), ...]``. If `track` is
+    false, wells of labware that is not tracked are left out.
+    """
+    groups = {}
+    for well in wells:
+        groups.setdefault(well.get_parent(), []).append(well)
+    return [(get_state(labware), get_state(labware).indexes(group))
+            for labware, group in groups.items()
+            if track or labware in _labware]
+
+
+def fill(location, volume, reagent=None):
+    """
+    Add `volume` of `reagent` to every well of `location` (a well, a
+    :class:`WellSeries`, a list of wells or a whole labware)
+    """
+    column = _reagent(reagent)
+    composition = np.zeros(len(_reagents))
+    composition[column] = volume
+    for state, indexes in _locate(_wells(location)):
+        state.add(indexes, composition)
+
+
+def is_tracked(location):
+    """
+    Whether any of the wells of `location` belongs to tracked labware
+    """
+    if location is None:
+        return False
+    return any(well.get_parent() in _labware for well in _wells(location))
+
+
+def volume(well):
+    """
+    Total volume in `well`, ``None`` if its labware is not tracked
+    """
+    state = _labware.get(well.get_parent())
+    if state is None:
+        return None
+    return float(state.totals[state.indexes([well])[0]])
+
+
+def composition(location):
+    """
+    Volume of each reagent in `location`, which can be a well or a pipette
+    """
+    if location in _pipettes:
+        volumes = _pad(_pipettes[location])
+    else:
+        state = _labware.get(location.get_parent())
+        if state is None:
+            return {}
+        volumes = state.volumes[state.indexes([location])[0]]
+    return {_reagents[i]: float(v) for i, v in enumerate(volumes) if v}
+
+
+def reagent_totals(labware=None):
+    """
+    Total volume of each reagent across `labware` (defaults to every
+    tracked labware on the deck)
+    """
+    if labware is None:
+        labware = tracked_labware()
+    totals = np.zeros(len(_reagents))
+    for each in labware:
+        state = _labware.get(each)
+        if state is not None:
+            totals += state.volumes.sum(axis=0)
+    return {_reagents[i]: float(v) for i, v in enumerate(totals) if v}
+
+
+def aspirate_clearance(location, volume, default, channels=1):
+    """
+    Height above the bottom of the wells of `location` to aspirate `volume`
+    (per channel) from: `ASPIRATE_DEPTH` below the surface the liquid will be
+    left at, or `default` if that is lower or the liquid level is unknown
+    """
+    wells = _wells(location)
+    if len(wells) == 1:
+        volume *= channels
+    clearance = None
+    for well in wells:
+        state = _labware.get(well.get_parent())
+        if state is None:
+            return default
+        i = state.indexes([well])[0]
+        if not state.area[i] > 0:
+            return default
+        left = max(state.totals[i] - volume, 0) / state.area[i]
+        height = min(left - ASPIRATE_DEPTH, state.depth[i])
+        clearance = height if clearance is None else min(clearance, height)
+    return max(default, clearance)
+
+
+def _contents(pipette):
+    contents = _pad(_pipettes.get(pipette, np.zeros(0)))
+    _pipettes[pipette] = contents
+    return contents
+
+
+def aspirate(pipette, location, volume):
+    """
+    Move `volume` (per channel) from the wells of `location` into `pipette`
+    """
+    wells = _wells(location)
+    if len(wells) == 1:
+        # every channel of the pipette draws from the same well
+        volume *= pipette.channels
+    removed = [state.remove(indexes, volume)
+               for state, indexes in _locate(wells, track=False)]
+    # whatever did not come out of tracked wells is of an unknown reagent
+    missing = volume * len(wells) - sum(r.sum() for r in removed)
+    unknown = _reagent(None) if missing > 1e-9 else None
+    contents = _contents(pipette)
+    for taken in removed:
+        contents += _pad(taken)
+    if unknown is not None:
+        contents[unknown] += missing
+
+
+def dispense(pipette, location, volume):
+    """
+    Move `volume` (per channel) out of `pipette` into the wells of
+    `location`
+    """
+    contents = _contents(pipette)
+    total = contents.sum()
+    if total <= 0:
+        return
+    wells = _wells(location)
+    share = volume if len(wells) > 1 else volume * pipette.channels
+    fraction = min(share * len(wells) / total, 1.0)
+    per_well = contents * (fraction / len(wells))
+    _pipettes[pipette] = contents * (1 - fraction)
+    for state, indexes in _locate(wells, track=_is_known(contents)):
+        state.add(indexes, per_well)
+
+
+def empty(pipette, location=None):
+    """
+    Everything left in `pipette` is blown out into `location`, or discarded
+    """
+    contents = _pipettes.pop(pipette, None)
+    if location is None or contents is None or not contents.sum():
+        return
+    wells = _wells(location)
+    per_well = contents / len(wells)
+    for state, indexes in _locate(wells, track=_is_known(contents)):
+        state.add(indexes, per_well)
+
+
+def _is_known(contents):
+    """
+    Whether `contents` hold any liquid of a known reagent
+    """
+    unknown = _reagent_index.get(None)
+    known = contents.sum()
+    if unknown is not None and unknown < len(contents):
+        known -= contents[unknown]
+    return known > 1e-9
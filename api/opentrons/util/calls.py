@@ -0,0 +1,21 @@
+import functools
+
+_READ_ONLY = '_rpc_read_only'
+
+
+def read_only(func):
+    """
+    Mark a method as read-only: it doesn't touch hardware, returns quickly and
+    is safe to run concurrently with any other call. Read-only calls (and the
+    serialization of their results, which can be large) run in a separate
+    executor instead of queueing for an executor thread behind long-running
+    calls such as a protocol run, and without blocking the event loop.
+    """
+    setattr(func, _READ_ONLY, True)
+    return func
+
+
+def is_read_only(func):
+    while isinstance(func, functools.partial):
+        func = func.func
+    return getattr(func, _READ_ONLY, False)
@@ -273,3 +273,90 @@ async def test_session_create_error(main_router):
     with pytest.raises(TimeoutError):
         # No state change is expected
         await main_router.wait_until(lambda _: True)
+
+
+async def test_simulation_cache(session_manager, protocol):
+    from opentrons import robot
+
+    cache = session_manager.simulation_cache
+    first = session_manager.create(name='<blank>', text=protocol.text)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    second = session_manager.create(name='<blank>', text=protocol.text)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second.commands == first.commands
+    assert [c.name for c in second.containers] == \
+        [c.name for c in first.containers]
+    assert [i.name for i in second.instruments] == \
+        [i.name for i in first.instruments]
+    # Restored labware is the labware loaded on the robot's deck
+    deck_labware = robot.get_containers()
+    for container in second.get_containers():
+        assert container._container in deck_labware
+
+    session_manager.create(name='<blank>', text=protocol.text + '\n')
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+async def test_simulation_cache_invalidated_by_flags(
+        session_manager, protocol):
+    from opentrons.config import feature_flags as ff
+
+    cache = session_manager.simulation_cache
+    session_manager.create(name='<blank>', text=protocol.text)
+    ff.set_feature_flag('calibrate-to-bottom', True)
+    session_manager.create(name='<blank>', text=protocol.text)
+    assert (cache.hits, cache.misses) == (0, 2)
+    ff.set_feature_flag('calibrate-to-bottom', False)
+
+
+async def test_simulation_cache_restores_trackers(session_manager):
+    from opentrons import robot
+    from opentrons.trackers import tip_tracker, volume_tracker
+    text = '\n'.join([
+        'from opentrons import containers, instruments',
+        'from opentrons.trackers import volume_tracker',
+        "tiprack = containers.load('tiprack-200ul', '1')",
+        "plate = containers.load('96-flat', '2')",
+        "p300 = instruments.P300_Single(mount='right', tip_racks=[tiprack])",
+        "volume_tracker.fill(plate['A1'], 100, 'water')",
+        'p300.pick_up_tip()',
+        "p300.aspirate(50, plate['A1'])",
+        "p300.dispense(20, plate['B1'])",
+    ])
+
+    def tracker_state():
+        instrument, = robot.get_instruments()
+        plate = robot.deck['2'].get_children_list()[0]
+        return (
+            [len(tip_tracker.get_state(rack))
+             for rack in tip_tracker.tracked_racks()],
+            volume_tracker.reagent_totals(),
+            volume_tracker.composition(instrument[1]),
+            volume_tracker.volume(plate['B1']),
+            instrument[1].tip_attached,
+            instrument[1].current_volume)
+
+    session_manager.create(name='<blank>', text=text)
+    after_miss = tracker_state()
+    assert after_miss == ([95], {'water': 70}, {'water': 30}, 20, True, 30)
+
+    session_manager.create(name='<blank>', text=text)
+    assert session_manager.simulation_cache.hits == 1
+    assert tracker_state() == after_miss
+
+    # the cached result is not changed by using the restored session
+    instrument, = robot.get_instruments()
+    instrument[1].drop_tip()
+    instrument[1].pick_up_tip()
+    session_manager.create(name='<blank>', text=text)
+    assert tracker_state() == after_miss
+
+
+async def test_simulation_cache_bypass(session_manager, protocol):
+    session_manager.create(name='<blank>', text=protocol.text)
+    session = session_manager.create(
+        name='<blank>', text=protocol.text, use_cache=False)
+    assert session_manager.simulation_cache.hits == 0
+    assert len(session_manager.simulation_cache) == 1
+    assert session.commands
@@ -0,0 +1,41 @@
+import os
+
+from opentrons.api.simulation import SimulationPool, simulate
+
+
+def _read(name):
+    path = os.path.join(
+        os.path.dirname(__file__), '..', 'data', name)
+    with open(path) as f:
+        return f.read()
+
+
+def test_simulate(virtual_smoothie_env):
+    result = simulate('testosaur.py', _read('testosaur.py'))
+    assert result['error'] is None
+    assert len(result['commands']) == 6
+    assert [i['name'] for i in result['instruments']] == ['p200']
+
+
+def test_simulate_error(virtual_smoothie_env):
+    result = simulate('error.py', '1/0')
+    assert result['error'].startswith('ZeroDivisionError')
+    assert result['commands'] == []
+
+
+def test_simulation_pool():
+    protocols = [
+        ('testosaur.py', _read('testosaur.py')),
+        ('error.py', 'blah'),
+        ('dinosaur.py', _read('dinosaur.py'))
+    ]
+    with SimulationPool(processes=2) as pool:
+        results = pool.simulate(protocols)
+
+    assert [r['name'] for r in results] == \
+        ['testosaur.py', 'error.py', 'dinosaur.py']
+    assert len(results[0]['commands']) == 6
+    assert results[1]['error'] == "NameError: name 'blah' is not defined"
+    assert results[2]['error'] is None
+    assert [c['name'] for c in results[2]['containers']] == \
+        ['tiprack', 'trough', 'plate', 'tall-fixed-trash']
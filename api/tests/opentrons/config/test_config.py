@@ -1,4 +1,8 @@
-from opentrons.config import merge, children, build
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from opentrons.config import merge, children, build, write_json
 
 
 def test_merge():
@@ -68,3 +72,17 @@ def test_children():
             'i': None
         }
     }
+
+
+def test_write_json_from_threads(tmpdir):
+    path = str(tmpdir.join('offset.json'))
+
+    def write(n):
+        for _ in range(20):
+            write_json(path, {'x': n}, indent=2)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(write, range(4)))
+    with open(path) as f:
+        assert json.load(f)['x'] in range(4)
+    assert os.listdir(str(tmpdir)) == ['offset.json']
@@ -0,0 +1,51 @@
+import json
+import os
+
+from opentrons import config
+from opentrons.config import feature_flags as ff
+
+
+def test_flags_are_memoized(monkeypatch):
+    reads = []
+    read_flags = ff._read_flags
+
+    def read_flags_with_log(settings_file):
+        reads.append(settings_file)
+        return read_flags(settings_file)
+
+    monkeypatch.setattr(ff, '_read_flags', read_flags_with_log)
+    monkeypatch.setattr(config, 'REFRESH_INTERVAL', 60)
+    for _ in range(100):
+        assert not ff.split_labware_definitions()
+    assert len(reads) == 1
+
+    # flags set through the API are visible right away
+    ff.set_feature_flag('dots-deck-type', True)
+    assert ff.dots_deck_type()
+    assert ff.get_all_feature_flags() == {'dots-deck-type': True}
+
+    # other changes once reloaded, or once the refresh interval elapsed
+    ff_file = config.get_config_index().get('featureFlagFile')
+    with open(ff_file, 'w') as fd:
+        json.dump({'dots-deck-type': False, 'x': 1}, fd)
+    assert ff.dots_deck_type()
+    ff.reload()
+    assert not ff.dots_deck_type()
+
+    monkeypatch.setattr(config, 'REFRESH_INTERVAL', 0)
+    os.remove(ff_file)
+    assert ff.get_all_feature_flags() == {}
+
+
+def test_config_index_is_memoized(monkeypatch):
+    monkeypatch.setattr(config, 'REFRESH_INTERVAL', 60)
+    config.reload()
+    index = config.get_config_index()
+    calls = []
+    monkeypatch.setattr(
+        config, 'settings_dir', lambda: calls.append(1) or '/nonexistent')
+    assert config.get_config_index() == index
+    # callers get their own copy
+    config.get_config_index()['labware'] = None
+    assert config.get_config_index() == index
+    assert not calls
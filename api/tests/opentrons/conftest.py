@@ -7,6 +7,7 @@ import os
 import re
 import shutil
 import json
+import tempfile
 from collections import namedtuple
 from functools import partial
 from uuid import uuid4 as uuid
@@ -63,6 +64,10 @@ MAIN_TESTER_DB = str(os.path.join(
     os.path.dirname(
         globals()["__file__"]), 'testing_database.db')
 )
+# Opening the db switches it to write-ahead logging, so tests use a copy to
+# leave the checked-in file untouched
+TESTING_DB = os.path.join(tempfile.mkdtemp(), 'testing_database.db')
+shutil.copy2(MAIN_TESTER_DB, TESTING_DB)
 
 
 def state(topic, state):
@@ -98,9 +103,11 @@ def clear_feature_flags():
     ff_file = config.get_config_index().get('featureFlagFile')
     if os.path.exists(ff_file):
         os.remove(ff_file)
+    ff.reload()
     yield
     if os.path.exists(ff_file):
         os.remove(ff_file)
+    ff.reload()
 
 
 @pytest.fixture(autouse=True)
@@ -145,7 +152,7 @@ def dummy_db(tmpdir):
     shutil.copy2(MAIN_TESTER_DB, temp_db_path)
     database.change_database(temp_db_path)
     yield None
-    database.change_database(MAIN_TESTER_DB)
+    database.change_database(TESTING_DB)
     os.remove(temp_db_path)
 
 
@@ -275,7 +282,7 @@ def connect(session, test_client):
 
 
 def setup_testing_env():
-    database.change_database(MAIN_TESTER_DB)
+    database.change_database(TESTING_DB)
 
 
 @pytest.fixture
@@ -1,4 +1,5 @@
 import pytest
+from unittest import mock
 
 from opentrons.containers import load as containers_load
 from opentrons.containers.placeable import Well, Container
@@ -60,3 +61,110 @@ def test_invalid_container_name():
         error_type = ValueError
     with pytest.raises(error_type):
         database.load_container("fake_container")
+
+
+def test_container_rows_cache(dummy_db, monkeypatch):
+    if ff.split_labware_definitions():
+        return
+    queries = []
+    get_container = database.db_queries.get_container_with_wells
+
+    def get_container_with_log(db, name):
+        queries.append(name)
+        return get_container(db, name)
+
+    monkeypatch.setattr(
+        database.db_queries, 'get_container_with_wells',
+        get_container_with_log)
+    plates = [database.load_container('96-flat') for _ in range(10)]
+    assert queries == ['96-flat']
+    # every load still gets its own container
+    assert len({id(plate) for plate in plates}) == 10
+
+    plate = plates[0]
+    plate._coordinates = Vector(1, 2, 3)
+    database.overwrite_container(plate)
+    assert database.load_container('96-flat')._coordinates == (1, 2, 3)
+    assert queries == ['96-flat'] * 2
+
+
+def test_connection_per_thread(dummy_db):
+    from threading import Thread
+    db_conn = database._connection()
+    assert database._connection() is db_conn
+    assert db_conn.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+
+    others = []
+    thread = Thread(target=lambda: others.append(database._connection()))
+    thread.start()
+    thread.join()
+    assert others[0] is not db_conn
+
+
+def test_transaction(dummy_db):
+    if ff.split_labware_definitions():
+        return
+    plate = database.load_container('96-flat')
+    commits = []
+    db_conn = database._connection()
+    database._local.connection = mock_conn = mock.Mock(wraps=db_conn)
+    mock_conn.commit.side_effect = lambda: commits.append(db_conn.commit())
+
+    with database.transaction():
+        database.save_new_container(plate, 'plate-copy-1')
+        database.save_new_container(plate, 'plate-copy-2')
+    assert len(commits) == 1
+    database._local.connection = db_conn
+    assert {'plate-copy-1', 'plate-copy-2'} <= set(
+        database.list_all_containers())
+
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            database.delete_container('plate-copy-1')
+            raise RuntimeError
+    assert 'plate-copy-1' in database.list_all_containers()
+
+    moved = database.load_container('plate-copy-2')
+    moved._coordinates = moved._coordinates + (1, 2, 3)
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            database.overwrite_container(moved)
+            raise RuntimeError
+    assert database.load_container('plate-copy-2')._coordinates == \
+        plate._coordinates
+
+    # overwriting a container is a transaction of its own
+    in_transaction = []
+    update = database.db_queries.update_container
+
+    def update_in_transaction(db, *args, **kwargs):
+        in_transaction.append(
+            isinstance(db, database._TransactionConnection))
+        return update(db, *args, **kwargs)
+
+    with mock.patch.object(
+            database.db_queries, 'update_container', update_in_transaction):
+        database.overwrite_container(moved)
+    assert in_transaction == [True]
+    assert database.load_container('plate-copy-2')._coordinates == \
+        moved._coordinates
+
+
+def test_bulk_wells(dummy_db):
+    if ff.split_labware_definitions():
+        return
+    plate = database.load_container('96-flat')
+    db_conn = database._connection()
+    database._local.connection = mock_conn = mock.Mock(wraps=db_conn)
+    database.save_new_container(plate, 'plate-copy')
+    database._local.connection = db_conn
+    assert mock_conn.executemany.call_count == 1
+
+    with mock.patch.object(
+            database.db_queries, 'get_container_with_wells',
+            wraps=database.db_queries.get_container_with_wells) as query:
+        copy = database.load_container('plate-copy')
+    assert query.call_count == 1
+    assert len(copy.get_children_list()) == 96
+    assert copy['A1'].properties == plate['A1'].properties
+    assert copy['H12']._coordinates == plate['H12']._coordinates
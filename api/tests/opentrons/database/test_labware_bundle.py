@@ -0,0 +1,69 @@
+import json
+import os
+import shutil
+
+from opentrons.config import get_config_index
+from opentrons.data_storage import labware_bundle
+from opentrons.data_storage import labware_definitions as ldef
+
+defn_dir = os.path.abspath(
+    get_config_index().get('labware', {}).get('baseDefinitionDir', ''))
+
+
+def test_bundle_matches_definitions(tmpdir):
+    path = labware_bundle.build(defn_dir, str(tmpdir.join('labware.bundle')))
+    bundle = labware_bundle.get_bundle(path)
+    assert labware_bundle.get_bundle(path) is bundle
+    assert bundle.names() == sorted(ldef._list_labware(defn_dir))
+    # the well geometry is read in place from the mapped file
+    assert not bundle.geometry.flags.owndata
+    assert not bundle.geometry.flags.writeable
+
+    for name in bundle.names():
+        with open(os.path.join(defn_dir, '{}.json'.format(name))) as f:
+            expected = json.load(f)
+        definition = bundle.definition(name)
+        assert definition['metadata'] == expected['metadata']
+        assert definition['ordering'] == ldef._freeze(expected['ordering'])
+        assert definition['wells'] == expected['wells']
+        assert list(definition['wells']) == list(expected['wells'])
+        assert bundle.is_current(name, defn_dir)
+
+
+def test_load_from_bundle(tmpdir):
+    base_dir = str(tmpdir.join('definitions'))
+    shutil.copytree(defn_dir, base_dir)
+    user_dir = str(tmpdir.mkdir('user'))
+    offset_dir = str(tmpdir.mkdir('offsets'))
+
+    def load(name):
+        return ldef._load(base_dir, user_dir, name, offset_dir, True)
+
+    from_json = load('96-flat')
+    labware_bundle.build(base_dir)
+    bundled = load('96-flat')
+    assert bundled is not from_json
+    assert bundled == from_json
+    assert load('96-flat') is bundled
+
+    # changed definitions are read from their JSON file again
+    definition_file = os.path.join(base_dir, '96-flat.json')
+    with open(definition_file) as f:
+        contents = json.load(f)
+    contents['wells']['A1']['x'] = 1000
+    with open(definition_file, 'w') as f:
+        json.dump(contents, f)
+    assert load('96-flat')['wells']['A1']['x'] == 1000
+
+    # user definitions take precedence over the bundle
+    contents['wells']['A1']['x'] = 2000
+    ldef._save_user_definition(user_dir, contents)
+    assert load('96-flat')['wells']['A1']['x'] == 2000
+
+    # an invalid bundle is ignored
+    bundle_path = labware_bundle.default_bundle_path(base_dir)
+    with open(bundle_path, 'wb') as f:
+        f.write(b'not a bundle')
+    assert labware_bundle.get_bundle(bundle_path) is None
+    assert load('12-well-plate') == ldef._cached_definition(
+        base_dir, '12-well-plate')
@@ -0,0 +1,58 @@
+import json
+import os
+import shutil
+
+from opentrons.config import get_config_index
+from opentrons.data_storage import labware_catalog
+from opentrons.data_storage import labware_definitions as ldef
+
+defn_dir = os.path.abspath(
+    get_config_index().get('labware', {}).get('baseDefinitionDir', ''))
+
+
+def test_catalog(tmpdir, monkeypatch):
+    base_dir = str(tmpdir.join('definitions'))
+    shutil.copytree(defn_dir, base_dir)
+    user_dir = str(tmpdir.mkdir('labware').mkdir('user'))
+    monkeypatch.setattr(ldef, 'default_definition_dir', lambda: base_dir)
+    monkeypatch.setattr(ldef, 'user_defn_dir', lambda: user_dir)
+    labware_catalog.reload()
+
+    summarized = []
+    summarize = labware_catalog._summarize
+
+    def summarize_with_log(path, name, source):
+        summarized.append(name)
+        return summarize(path, name, source)
+
+    monkeypatch.setattr(labware_catalog, '_summarize', summarize_with_log)
+    entries = labware_catalog.update(force=True)
+    assert sorted(entries) == ldef.list_all_labware()
+    plate = entries['96-flat']
+    assert plate.wells == 96
+    assert plate.max_volume == 400
+    assert plate.source == 'default'
+    assert plate.footprint == [105.4, 69.4]
+    assert os.path.exists(labware_catalog.catalog_file())
+
+    # only changed or new files are read again, also in a new process
+    labware_catalog.reload()
+    summarized.clear()
+    with open(os.path.join(base_dir, '96-flat.json')) as f:
+        definition = json.load(f)
+    definition['wells'] = {'A1': definition['wells']['A1']}
+    definition['metadata']['name'] = 'one-well'
+    ldef._save_user_definition(user_dir, definition)
+    definition['metadata']['name'] = '96-flat'
+    ldef._save_user_definition(user_dir, definition)
+    entries = labware_catalog.update(force=True)
+    assert sorted(summarized) == ['96-flat', 'one-well']
+    assert entries['96-flat'].source == 'user'
+    assert entries['96-flat'].wells == 1
+
+    names = [e.name for e in labware_catalog.search(min_wells=384)]
+    assert names == ['384-plate', 'MALDI-plate']
+    names = [e.name for e in labware_catalog.search(
+        name='well-plate', min_volume=1000, min_wells=12)]
+    assert names == ['12-well-plate', '24-well-plate']
+    labware_catalog.reload()
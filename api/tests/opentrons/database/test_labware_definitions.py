@@ -1,6 +1,7 @@
 import os
 import json
 import tempfile
+import pytest
 from opentrons.data_storage import labware_definitions as ldef
 from opentrons.data_storage import database
 from opentrons.config import get_config_index
@@ -169,3 +170,50 @@ def test_new_labware_create(split_labware_def):
             assert res[name].properties[prop] == well.properties[prop]
     assert lw.well("C5").coordinates() == (
         (n_cols - 1) * col_space, (n_rows - 1) * row_space, 0)
+
+
+def test_definition_cache(tmpdir, monkeypatch):
+    parsed = []
+    json_load = json.load
+
+    def load_with_log(json_file):
+        parsed.append(json_file.name)
+        return json_load(json_file)
+
+    monkeypatch.setattr(json, 'load', load_with_log)
+    monkeypatch.setattr(ldef, '_json_cache', {})
+    plates = [ldef._load(
+        defn_dir, user_defn_dir, '96-flat', offset_dir, with_offset=True)
+        for _ in range(10)]
+    assert len(parsed) == 1
+    assert all(plate is plates[0] for plate in plates)
+    with pytest.raises(TypeError):
+        plates[0]['wells']['A1']['x'] = 0
+
+    # offsets are applied on top of the shared definition
+    test_dir = str(tmpdir)
+    ldef._save_offset(test_dir, '96-flat', {'x': 1, 'y': 2, 'z': 3})
+    moved = ldef._load(
+        defn_dir, user_defn_dir, '96-flat', test_dir, with_offset=True)
+    assert moved['wells']['A1']['x'] == plates[0]['wells']['A1']['x'] + 1
+    assert moved['ordering'] is plates[0]['ordering']
+
+    # changed files are parsed again
+    ldef._save_offset(test_dir, '96-flat', {'x': 2, 'y': 2, 'z': 3})
+    moved = ldef._load(
+        defn_dir, user_defn_dir, '96-flat', test_dir, with_offset=True)
+    assert moved['wells']['A1']['x'] == plates[0]['wells']['A1']['x'] + 2
+    assert len(parsed) == 3
+
+
+def test_load_json_returns_copies(monkeypatch):
+    monkeypatch.setattr(ldef, '_json_cache', {})
+    first = ldef.load_json('96-flat')
+    assert type(first) is dict
+    assert type(first['ordering']) is list
+    json.dumps(first)
+
+    # changing a loaded definition does not change the cached one
+    first['wells']['A1']['x'] = -1
+    assert ldef.load_json('96-flat')['wells']['A1']['x'] != -1
+    assert ldef.load_json_view('96-flat') is ldef.load_json_view('96-flat')
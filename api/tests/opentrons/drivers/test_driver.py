@@ -1,3 +1,4 @@
+import re
 from threading import Thread
 import pytest
 
@@ -268,6 +269,63 @@ def test_plunger_commands(smoothie, monkeypatch):
     fuzzy_assert(result=command_log, expected=expected)
 
 
+def test_batch(smoothie, monkeypatch):
+    from opentrons.drivers import serial_communication
+    from opentrons.drivers.smoothie_drivers import driver_3_0
+    command_log = []
+    smoothie._setup()
+    smoothie.home()
+    smoothie.simulating = False
+
+    def write_with_log(command, ack, connection, timeout):
+        command_log.append(command.strip())
+        return driver_3_0.SMOOTHIE_ACK
+
+    monkeypatch.setattr(
+        serial_communication, 'write_and_return', write_with_log)
+
+    with smoothie.batch():
+        smoothie.push_speed()
+        smoothie.set_speed(50)
+        smoothie.move({'X': 10})
+        smoothie.move({'X': 20})
+        with smoothie.batch():
+            smoothie.set_speed(10)
+            smoothie.set_speed(20)
+            smoothie.move({'B': 2})
+            smoothie.set_speed(50)
+            smoothie.move({'B': 1})
+        smoothie.pop_speed()
+        assert smoothie.position['B'] == 1
+    # plunger motors dwell right after each of their moves, and the batch is
+    # split when it gets longer than Smoothieware can buffer
+    expected = [
+        ['G0F3000 M907 A0.1 B0.05 C0.05 X1.25 Y0.3 Z0.1 G4P0.005 G0X10 G0X20 '
+         'G0F1200 M907 A0.1 B0.5 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 G0B2 '
+         'M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 '
+         'G0F3000 M907 A0.1 B0.5 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 G0B1 M400'],
+        ['M907 A0.1 B0.05 C0.05 X0.3 Y0.3 Z0.1 G4P0.005 G0F24000 M400']
+    ]
+    fuzzy_assert(result=command_log, expected=expected)
+    command_log = []
+
+    # commands outside of the batch send what was queued first
+    with smoothie.batch():
+        smoothie.move({'Y': 10})
+        smoothie.set_axis_max_speed({'X': 600})
+        smoothie.move({'Y': 20})
+        smoothie.move({'Y': 30})
+    assert len(command_log) == 3
+    assert command_log[1] == 'M203.1 X600 M400'
+
+    # unbatched commands are unchanged
+    command_log = []
+    smoothie.move({'X': 30})
+    smoothie.set_speed(50)
+    smoothie.set_speed(50)
+    assert command_log[1:] == ['G0F3000 M400', 'G0F3000 M400']
+
+
 def test_set_active_current(smoothie, monkeypatch):
     from opentrons.drivers import serial_communication
     from opentrons.drivers.smoothie_drivers import driver_3_0
@@ -702,6 +760,43 @@ def test_speed_change(model, monkeypatch):
     fuzzy_assert(result=command_log, expected=expected)
 
 
+def test_batched_liquid_handling(model, monkeypatch):
+    pipette = model.instrument._instrument
+    plate = model.container._container
+    robot = model.robot
+
+    from opentrons.drivers import serial_communication
+    from opentrons.drivers.smoothie_drivers import driver_3_0
+    command_log = []
+
+    def write_with_log(command, ack, connection, timeout):
+        command_log.append(command.strip())
+        if 'M114' in command:
+            return 'ok MCS: X:0.00 Y:0.00 Z:0.00 A:0.00 B:0.00 C:0.00'
+        return driver_3_0.SMOOTHIE_ACK
+
+    pipette.tip_attached = True
+    pipette.mix(1, 50, plate[0])
+    robot._driver.simulating = False
+    monkeypatch.setattr(serial_communication, 'write_and_return',
+                        write_with_log)
+
+    pipette.touch_tip()
+    pipette.blow_out()
+    assert len(command_log) == 2
+    command_log = []
+    pipette.mix(3, 50)
+    # long batches are split in lines Smoothieware can buffer
+    assert len(command_log) == 4
+    # the plunger is dwelled after every move, not only at the end
+    plunger_currents = re.findall(
+        r'G0C[\d.]+ (?:G0C[\d.]+ )*M907 \S+ \S+ (C[\d.]+)',
+        ' '.join(command_log))
+    assert plunger_currents == ['C0.05'] * 7
+    max_length = driver_3_0.MAX_BATCH_COMMAND_LENGTH + len(' M400')
+    assert all(len(command) <= max_length for command in command_log)
+
+
 def test_max_speed_change(model, monkeypatch):
 
     robot = model.robot
@@ -32,3 +32,27 @@ class HelpersTest(unittest.TestCase):
             0.6515237505617075)
         self.assertEquals(res[-1], expected)
         self.assertEquals(len(res), 5)
+
+    def test_path_orders(self):
+        points = [(0, 0), (9, 0), (0, 9), (9, 9), (0, 4.5)]
+        self.assertEqual(helpers._snake_order(points), [2, 4, 0, 1, 3])
+        # the first column is entered from the end nearest to the start
+        self.assertEqual(
+            helpers._snake_order(points, start=(0, -1)), [0, 4, 2, 3, 1])
+        order = helpers._nearest_order(points, start=(0, 10))
+        self.assertEqual(order, [2, 4, 0, 1, 3])
+
+        # 2-opt removes crossings from a path
+        square = [(0, 0), (1, 1), (1, 0), (0, 1)]
+        self.assertEqual(
+            helpers._path_length(
+                helpers._two_opt([0, 1, 2, 3], square), square, None), 3)
+        # and never makes a path longer, from a fixed start or not
+        grid = [(x * 9.0, y * 9.0) for x in range(12) for y in range(8)]
+        zigzag = list(range(0, 96, 2)) + list(range(1, 96, 2))
+        for start in (None, (0, 0)):
+            order = helpers._two_opt(zigzag, grid, start)
+            self.assertEqual(sorted(order), list(range(96)))
+            self.assertLess(
+                helpers._path_length(order, grid, start),
+                helpers._path_length(zigzag, grid, start))
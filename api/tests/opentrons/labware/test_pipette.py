@@ -1,7 +1,10 @@
 # pylama:ignore=E501
 
+import pytest
+
 from opentrons import instruments, robot
 from opentrons.containers import load as containers_load
+from opentrons.instruments.pipette import Pipette, PLUNGER_POSITIONS
 from opentrons.trackers import pose_tracker
 from numpy import isclose
 
@@ -226,3 +229,90 @@ def test_json_and_fallback_configs_match():
     for model, config_fallback in fallback_configs.items():
         config_from_json = select_config(model)
         assert config_from_json == config_fallback
+
+
+def test_piecewise_ul_per_mm(virtual_smoothie_env):
+    from opentrons.instruments.pipette_config import VolumeCurve
+    import numpy as np
+    import pytest
+
+    linear = VolumeCurve(18.7)
+    assert linear.ul_to_mm(300) == 300 / 18.7
+    assert linear.mm_to_ul(16.5) == 16.5 * 18.7
+
+    curve = VolumeCurve([[20, 19], [0, 17]])
+    volumes = np.array([0, 10, 20, 30])
+    mm = curve.ul_to_mm(volumes)
+    assert isclose(mm, [0, 10 / 17, 20 / 17, 20 / 17 + 10 / 19]).all()
+    assert isclose(curve.mm_to_ul(mm), volumes).all()
+    for bad in ([[5, 17]], [[0, 17], [0, 19]], [[0, -1]]):
+        with pytest.raises(ValueError):
+            VolumeCurve(bad)
+
+    robot.reset()
+    p300 = instruments.P300_Single(mount='right')
+    p300.set_ul_per_mm([[0, 17], [20, 19]])
+    bottom = p300._get_plunger_position('bottom')
+    top = p300._get_plunger_position('top')
+    assert isclose(p300.max_volume, 20 + (top - bottom - 20 / 17) * 19)
+    assert p300._ul_to_plunger_position(10) == round(bottom + 10 / 17, 6)
+    assert isclose(
+        p300._ul_to_plunger_position(np.array([10, 30])),
+        [bottom + 10 / 17, bottom + 20 / 17 + 10 / 19]).all()
+
+    plate = containers_load(robot, '96-flat', '1')
+    p300.min_volume = 30
+    p300.plan_transfer([10, 20, 40], plate[0], plate[1:4])
+    assert any('4 aspirates or dispenses' in w for w in robot.get_warnings())
+    with pytest.raises(RuntimeWarning):
+        p300.plan_transfer(400, plate[0], plate[1], divide=False)
+
+
+def test_config_cache(tmpdir, monkeypatch):
+    import json
+    from opentrons import config
+    from opentrons.instruments import pipette_config
+
+    config_file = str(tmpdir.join('pipette-config.json'))
+    with open(pipette_config.pipette_config_path()) as f:
+        configs = json.load(f)
+    with open(config_file, 'w') as f:
+        json.dump(configs, f)
+    monkeypatch.setattr(
+        pipette_config, 'pipette_config_path', lambda: config_file)
+    monkeypatch.setattr(config, 'REFRESH_INTERVAL', 60)
+    pipette_config.reload()
+
+    reads = []
+    read_config_file = pipette_config._read_config_file
+    monkeypatch.setattr(
+        pipette_config, '_read_config_file',
+        lambda path: reads.append(path) or read_config_file(path))
+    p300 = pipette_config.load('p300_single_v1')
+    for _ in range(10):
+        assert pipette_config.load('p300_single_v1') is p300
+    assert len(reads) == 1
+    with pytest.raises(TypeError):
+        p300.plunger_positions['top'] = 0
+
+    # pipettes get their own plunger positions
+    pipette = instruments.P300_Single(mount='left')
+    pipette.plunger_positions['top'] = 0
+    assert p300.plunger_positions['top'] != 0
+    # including pipettes built with the default or a read-only config
+    robot.reset()
+    default = Pipette(robot, mount='right')
+    default.plunger_positions['top'] = 0
+    assert PLUNGER_POSITIONS['top'] != 0
+    pipette = Pipette(
+        robot, mount='left', plunger_positions=p300.plunger_positions)
+    pipette.plunger_positions['top'] = 0
+
+    # changes to the file are picked up
+    configs['p300_single_v1']['tipLength'] = 1234
+    with open(config_file, 'w') as f:
+        json.dump(configs, f)
+    monkeypatch.setattr(config, 'REFRESH_INTERVAL', 0)
+    assert pipette_config.load('p300_single_v1').tip_length == 1234
+    assert len(reads) == 2
+    pipette_config.reload()
@@ -5,6 +5,9 @@ from unittest import mock
 from opentrons.robot.robot import Robot
 from opentrons.containers import load as containers_load
 from opentrons.instruments import Pipette
+from opentrons.helpers import helpers
+from opentrons.helpers.transfer_plan import (
+    Aspirate, TransferPlan, TransferStep, transfer_step)
 from opentrons.containers.placeable import unpack_location
 from opentrons.trackers import pose_tracker
 from tests.opentrons.conftest import fuzzy_assert
@@ -276,6 +279,45 @@ class PipetteTest(unittest.TestCase):
         fuzzy_assert(self.robot.commands(), expected=expected)
         self.robot.clear_commands()
 
+    def test_distribute_optimize_path(self):
+        self.p200.reset()
+        wells = [self.plate[name] for name in ['C2', 'A1', 'H1', 'B2', 'D1']]
+        self.p200.distribute(30, self.plate['A12'], wells, optimize_path=True)
+
+        expected = [
+            ['Distributing', '30'],
+            ['Transferring', '30'],
+            ['Pick'],
+            ['Aspirating', '160', 'well A12'],
+            ['Dispensing', '30', 'well A1'],
+            ['Dispensing', '30', 'well D1'],
+            ['Dispensing', '30', 'well H1'],
+            ['Dispensing', '30', 'well C2'],
+            ['Dispensing', '30', 'well B2'],
+            ['Blow'],
+            ['Drop']
+        ]
+        fuzzy_assert(self.robot.commands(), expected=expected)
+        self.robot.clear_commands()
+
+        self.p200.reset()
+        self.p200.consolidate(
+            30, wells, self.plate['A12'], optimize_path='nearest')
+        aspirated = [
+            command.split()[5] for command in self.robot.commands()
+            if command.startswith('Aspirating')]
+        assert sorted(aspirated) == ['A1', 'B2', 'C2', 'D1', 'H1']
+
+        def path_length(names):
+            points = [self.p200._xy_position(self.plate[n]) for n in names]
+            return helpers._path_length(range(len(points)), points, None)
+        assert path_length(aspirated) < \
+            path_length(['C2', 'A1', 'H1', 'B2', 'D1'])
+
+        self.assertRaises(
+            ValueError, self.p200.distribute,
+            30, self.plate['A12'], wells, optimize_path='shortest')
+
     def test_consolidate(self):
 
         self.p200.reset()
@@ -379,6 +421,64 @@ class PipetteTest(unittest.TestCase):
         fuzzy_assert(self.robot.commands(), expected=expected)
         self.robot.clear_commands()
 
+    def test_transfer_multichannel_groups_columns(self):
+        p200_multi = Pipette(
+            self.robot,
+            trash_container=self.trash,
+            tip_racks=[self.tiprack1, self.tiprack2],
+            min_volume=10,
+            mount='right',
+            channels=8
+        )
+        p200_multi.max_volume = 200
+        p200_multi.calibrate_plunger(
+            top=0, bottom=10, blow_out=12, drop_tip=13)
+        self.robot.clear_commands()
+
+        plate2 = containers_load(self.robot, '96-flat', '7')
+        wells = list(self.plate.wells())[:10]
+        targets = list(plate2.wells())[:10]
+        plan = p200_multi._create_transfer_plan(30, wells, targets)
+        assert [step.aspirate.location for step in plan] == \
+            [self.plate.cols[0], wells[8], wells[9]]
+        assert [step.dispense.location for step in plan] == \
+            [plate2.cols[0], targets[8], targets[9]]
+
+        # Volumes must match across the column
+        volumes = [30] * 7 + [40, 30, 30]
+        plan = p200_multi._create_transfer_plan(volumes, wells, targets)
+        assert len(plan) == 10
+
+        p200_multi.transfer(30, wells[:8], targets[:8])
+        expected = [
+            ['Transferring', '30'],
+            ['Pick'],
+            ['Aspirating', '30', 'wells A1...H1'],
+            ['Dispensing', '30', 'wells A1...H1'],
+            ['Drop']
+        ]
+        fuzzy_assert(self.robot.commands(), expected=expected)
+
+    def test_plan_transfer(self):
+        self.robot.clear_commands()
+        source, target = self.plate['A1'], self.plate['B1']
+
+        plan = self.p200.plan_transfer(500, source, target)
+        assert plan == TransferPlan([
+            transfer_step(source, target, 200.0),
+            transfer_step(source, target, 150.0),
+            transfer_step(source, target, 150.0)])
+        assert self.robot.commands() == []
+
+        targets = self.plate.wells('B1', 'C1', 'D1')
+        plan = self.p200.plan_transfer(
+            60, source, targets, mode='distribute', disposal_vol=10)
+        assert [a.volume for a in plan.aspirates] == [190.0]
+        assert [d.location for d in plan.dispenses] == list(targets)
+        assert plan[0] == TransferStep(aspirate=Aspirate(source, 190.0))
+        assert plan == self.p200.plan_transfer(
+            60, source, targets, mode='distribute', disposal_vol=10)
+
     def test_transfer(self):
 
         self.p200.reset()
@@ -0,0 +1,75 @@
+import subprocess
+import sys
+
+import opentrons
+
+# Python 3.7 and newer can report the import time of every module
+IMPORT_TIME = sys.version_info >= (3, 7)
+
+# Seconds importing opentrons may take. It takes about 0.25s on a development
+# machine, so this catches regressions such as building the robot at import
+# without failing on slower machines
+IMPORT_TIME_LIMIT = 2.0
+
+IMPORT_SCRIPT = '''
+import time
+start = time.perf_counter()
+import opentrons
+print(time.perf_counter() - start)
+print(opentrons.robot._robot is None)
+'''
+
+
+def _import_opentrons():
+    args = [sys.executable]
+    if IMPORT_TIME:
+        args += ['-X', 'importtime']
+    result = subprocess.run(
+        args + ['-c', IMPORT_SCRIPT],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True)
+    return result.stdout.split()[-2:], result.stderr
+
+
+def _slowest_imports(importtime_log, count=10):
+    """
+    Modules taking the most time to import (their own code only), from the
+    output of ``python -X importtime``
+    """
+    modules = []
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        modules.append((int(own), name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def test_import_time():
+    (seconds, robot_not_built), log = _import_opentrons()
+    print('import opentrons: {:.3f}s'.format(float(seconds)))
+    if IMPORT_TIME:
+        for own, name in _slowest_imports(log):
+            print('{:>10} us  {}'.format(own, name))
+
+    # the global robot is only built once it is used
+    assert robot_not_built == 'True'
+    assert float(seconds) < IMPORT_TIME_LIMIT
+
+
+def test_lazy_robot(virtual_smoothie_env):
+    from opentrons.robot.robot import Robot
+    lazy = opentrons.robot
+    built = lazy._get_robot()
+    assert isinstance(built, Robot)
+    assert lazy.poses is built.poses
+    lazy.some_attribute = 1
+    assert built.some_attribute == 1
+    del lazy.some_attribute
+
+    # objects holding the global robot follow a reset
+    assert opentrons.reset() is lazy
+    assert lazy._robot is not built
+    assert opentrons.instruments.robot is lazy
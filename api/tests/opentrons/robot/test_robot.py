@@ -111,8 +111,34 @@ def test_create_arc(virtual_smoothie_env):
     ]
     assert res == expected
 
+    # tip is level with the top of the plate, so moving within the plate
+    # still rises to the labware clearance first
+    plate_top = robot.max_placeable_height_on_deck(plate)
+    arc_top = plate_top + TIP_CLEARANCE_LABWARE
     res = robot._create_arc(p300, (0, 0, 0), plate[1])
-    arc_top = robot.max_placeable_height_on_deck(plate) + TIP_CLEARANCE_LABWARE
+    expected = [
+        {'z': arc_top},
+        {'x': 0, 'y': 0},
+        {'z': 0}
+    ]
+    assert res == expected
+
+    # tip already clears the plate, so it goes straight over at the
+    # clearance height (or straight to a destination above it)
+    robot.poses = p300._move(robot.poses, z=arc_top)
+    res = robot._create_arc(p300, (0, 0, 0), plate[2])
+    expected = [
+        {'x': 0, 'y': 0, 'z': arc_top},
+        {'z': 0}
+    ]
+    assert res == expected
+
+    res = robot._create_arc(p300, (5, 5, arc_top + 1), plate[3])
+    assert res == [{'x': 5, 'y': 5, 'z': arc_top + 1}]
+
+    # tip inside a well has to rise above the plate first
+    robot.poses = p300._move(robot.poses, z=plate_top - 5)
+    res = robot._create_arc(p300, (0, 0, 0), plate[4])
     expected = [
         {'z': arc_top},
         {'x': 0, 'y': 0},
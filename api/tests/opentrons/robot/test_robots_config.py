@@ -82,3 +82,93 @@ def test_build_config():
             }
         }
     assert built_config.instrument_offset == expected
+
+
+def test_save_to_journal(tmpdir, monkeypatch):
+    import json
+    from opentrons.robot import robot_configs
+    monkeypatch.setattr(robot_configs, 'JOURNAL_MAX_ENTRIES', 3)
+    filename = str(tmpdir.join('robotSettings.json'))
+    journal = robot_configs.journal_file(filename)
+    config = robot_configs.load()
+
+    def saved():
+        with open(filename) as file:
+            return json.load(file)
+
+    # the first save writes the whole file
+    settings = robot_configs.save_robot_settings(config, rs_filename=filename)
+    assert saved() == json.loads(json.dumps(settings))
+    assert not tmpdir.join('robotSettings.json.journal').check()
+
+    # later saves only append the values that changed
+    config = config._replace(name='Bob')
+    robot_configs.save_robot_settings(config, rs_filename=filename)
+    config.instrument_offset['left']['single'] = [1.0, 2.0, 3.0]
+    robot_configs.save_robot_settings(config, rs_filename=filename)
+    robot_configs.save_robot_settings(config, rs_filename=filename)
+    assert saved()['name'] != 'Bob'
+    assert [changes for _, changes, _ in robot_configs.history(filename)] == [
+        [(('name',), 'Bob')],
+        [(('instrument_offset', 'left', 'single'), [1.0, 2.0, 3.0])]]
+
+    # the journal is replayed when the file is read again
+    robot_configs._configs.clear()
+    loaded = robot_configs._load_json(filename)
+    assert loaded['name'] == 'Bob'
+    assert loaded['instrument_offset']['left']['single'] == [1.0, 2.0, 3.0]
+
+    # an entry cut short is ignored, and the next save compacts the journal
+    with open(journal, 'a') as file:
+        file.write('{"time": 1, "set": [[["name"], "Ca')
+    robot_configs._configs.clear()
+    assert robot_configs._load_json(filename)['name'] == 'Bob'
+    config = config._replace(name='Carl')
+    robot_configs.save_robot_settings(config, rs_filename=filename)
+    assert saved()['name'] == 'Carl'
+    assert robot_configs.history(filename) == []
+
+    # removed values are journaled too, so replaying the journal again over
+    # a compacted file does not bring them back
+    settings = robot_configs._load_json(filename)
+    del settings['log_level']
+    robot_configs._save_json(settings, filename)
+    assert robot_configs.history(filename)[-1][2] == [('log_level',)]
+    # as if compacting was interrupted before the journal was removed
+    with open(journal) as file:
+        entries = file.read()
+    robot_configs.compact(filename)
+    with open(journal, 'w') as file:
+        file.write(entries)
+    robot_configs._configs.clear()
+    assert robot_configs._load_json(filename) == saved()
+    assert 'log_level' not in saved()
+    robot_configs.compact(filename)
+
+    # so does every JOURNAL_MAX_ENTRIES-th save
+    for name in ['Dan', 'Eve', 'Fay']:
+        config = config._replace(name=name)
+        robot_configs.save_robot_settings(config, rs_filename=filename)
+    assert len(robot_configs.history(filename)) == 3
+    config = config._replace(name='Gus')
+    robot_configs.save_robot_settings(config, rs_filename=filename)
+    assert saved()['name'] == 'Gus'
+    assert robot_configs.history(filename) == []
+
+    robot_configs.clear(filename)
+    assert not tmpdir.join('robotSettings.json').check()
+
+
+def test_backup_is_not_journaled(tmpdir, capsys):
+    from opentrons.robot import robot_configs
+    filename = str(tmpdir.join('robotSettings.json'))
+    config = robot_configs.load()
+    capsys.readouterr()
+    robot_configs.save_robot_settings(config, rs_filename=filename, tag='a')
+    robot_configs.save_robot_settings(config, rs_filename=filename, tag='a')
+    backup = str(tmpdir.join('robotSettings-a.json'))
+    assert tmpdir.join('robotSettings-a.json').check()
+    assert not tmpdir.join('robotSettings-a.json.journal').check()
+    assert backup not in robot_configs._configs
+    # new files are written without reading them first
+    assert 'not found' not in capsys.readouterr()[0]
@@ -0,0 +1,95 @@
+import pytest
+
+from opentrons import instruments, robot
+from opentrons.containers import load as containers_load
+from opentrons.robot.scheduler import Scheduler, switches
+
+
+@pytest.fixture
+def deck(virtual_smoothie_env):
+    robot.connect()
+    robot.reset()
+    tiprack10 = containers_load(robot, 'tiprack-10ul', '1')
+    tiprack300 = containers_load(robot, 'tiprack-200ul', '4')
+    trough = containers_load(robot, 'trough-12row', '2')
+    plate = containers_load(robot, '96-flat', '3')
+    p10 = instruments.P10_Single(mount='left', tip_racks=[tiprack10])
+    p300 = instruments.P300_Single(mount='right', tip_racks=[tiprack300])
+    return p10, p300, trough, plate
+
+
+def test_order(deck):
+    p10, p300, trough, plate = deck
+    schedule = Scheduler()
+    schedule.add(p10.pick_up_tip)
+    schedule.add(p300.pick_up_tip)
+    schedule.add(p10.aspirate, 10, trough['A1'])
+    schedule.add(p300.aspirate, 100, trough['A2'])
+    schedule.add(p10.dispense, 10, plate['A1'])
+    schedule.add(p300.dispense, 100, plate['B1'])
+    # depends on the p300 dispensing into B1 first
+    schedule.add(p10.mix, 3, 5, plate['B1'])
+    schedule.add(p300.blow_out, trough['A2'])
+    schedule.add(p10.drop_tip)
+
+    assert switches(schedule.steps) == 8
+    ordered = schedule.order()
+    assert [(step.instrument, step.method) for step in ordered] == [
+        (p10, 'pick_up_tip'),
+        (p10, 'aspirate'),
+        (p10, 'dispense'),
+        (p300, 'pick_up_tip'),
+        (p300, 'aspirate'),
+        (p300, 'dispense'),
+        (p300, 'blow_out'),
+        (p10, 'mix'),
+        (p10, 'drop_tip')
+    ]
+    assert switches(ordered) == 2
+    # drop_tip has no location, it is ordered after what the p10 last did
+    assert ordered[8].wells == {plate['B1']}
+
+
+def test_run(deck):
+    p10, p300, trough, plate = deck
+    with Scheduler() as schedule:
+        for well in plate.rows[0][:4]:
+            schedule.add(p10.transfer, 5, trough['A1'], well)
+            schedule.add(p300.transfer, 50, trough['A2'], well)
+
+    transfers = [
+        command for command in robot.commands()
+        if command.startswith('Transferring')]
+    # each p300 transfer only waits for the p10 transfer into its well
+    assert [t.split()[1] for t in transfers] == ['5'] * 4 + ['50'] * 4
+    assert not schedule.steps
+
+
+def test_shared_tip_rack(deck):
+    p10, p300, trough, plate = deck
+    p300.tip_racks = p10.tip_racks
+    tiprack = p10.tip_racks[0]
+    schedule = Scheduler()
+    schedule.add(p10.pick_up_tip)
+    schedule.add(p10.aspirate, 10, trough['A1'])
+    schedule.add(p300.pick_up_tip)
+    schedule.add(p300.drop_tip)
+    schedule.add(p10.dispense, 10, plate['A1'])
+    schedule.add(p10.drop_tip)
+    schedule.add(p10.pick_up_tip)
+    schedule.add(p300.pick_up_tip, tiprack['H12'])
+    schedule.add(p10.drop_tip)
+
+    # the second p10 tip depends on the p300 taking its tip first, and an
+    # explicitly picked up tip also waits for the rack
+    assert [(step.instrument, step.method) for step in schedule.order()] == [
+        (p10, 'pick_up_tip'),
+        (p10, 'aspirate'),
+        (p10, 'dispense'),
+        (p10, 'drop_tip'),
+        (p300, 'pick_up_tip'),
+        (p300, 'drop_tip'),
+        (p10, 'pick_up_tip'),
+        (p10, 'drop_tip'),
+        (p300, 'pick_up_tip')
+    ]
@@ -115,3 +115,43 @@ def test_ordered_dict():
                 'i': id(b),
                 't': type_id(b),
                 'v': {'b': 1}}}}
+
+
+def test_circular_ordered_dict():
+    a = OrderedDict()
+    a['a'] = 1
+    a['self'] = a
+    tree, refs = serialize.get_object_tree(a)
+    assert tree == {
+        'i': id(a),
+        't': type_id(a),
+        'v': {
+            'a': 1,
+            'self': {'i': id(a), 't': type_id(a), 'v': None}}}
+
+
+def test_shared_and_slotted_objects():
+    class Slotted:
+        __slots__ = ['a']
+
+        def __init__(self):
+            self.a = 1
+
+    class A:
+        def __init__(self):
+            self.value = 1
+
+    shared = A()
+    slotted = Slotted()
+    root = {'first': shared, 'second': shared, 'slotted': slotted}
+    tree, refs = serialize.get_object_tree(root)
+    assert tree['v']['first'] == {
+        'i': id(shared), 't': type_id(shared), 'v': {'value': 1}}
+    # Already serialized objects are sent by reference
+    assert tree['v']['second'] == {
+        'i': id(shared), 't': type_id(shared), 'v': None}
+    # Objects without __dict__ are not walked
+    assert tree['v']['slotted'] == {
+        'i': id(slotted), 't': type_id(slotted), 'v': {}}
+    assert id(shared) in refs
+    assert id(slotted) not in refs
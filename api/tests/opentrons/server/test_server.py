@@ -1,9 +1,10 @@
 import asyncio
+import gc
 import pytest
 import time
 
 from opentrons.server import rpc
-from threading import Event
+from threading import Event, current_thread, main_thread
 
 from uuid import uuid4 as uuid
 
@@ -342,6 +343,117 @@ async def test_concurrent_calls(session, root):
     ]
 
 
+@pytest.mark.parametrize('root', [Foo(0)])
+async def test_release_references(session, root):
+    await session.socket.receive_json()  # Skip init
+
+    await session.call(id=id(root), name='next', args=[])
+    await session.socket.receive_json()  # Skip ack
+    foo_id = (await session.socket.receive_json())['data']['i']
+
+    # Only the client references the result
+    gc.collect()
+    assert foo_id in session.server.objects
+
+    await session.socket.send_json(
+        {'$': {'type': rpc.RELEASE_MESSAGE}, 'ids': [foo_id]})
+    await session.call(id=id(root), name='value', args=[])
+    await session.socket.receive_json()  # Skip ack
+    await session.socket.receive_json()  # Skip result
+
+    gc.collect()
+    assert foo_id not in session.server.objects
+    assert id(root) in session.server.objects
+
+    await session.call(id=id(root), name='combine', args=[{'i': foo_id}])
+    res = await session.socket.receive_json()
+    assert res['$']['type'] == rpc.CALL_NACK_MESSAGE
+
+
+def test_object_registry():
+    registry = rpc.ObjectRegistry(max_client_references=2)
+    registry[1] = 'permanent'
+
+    foos = [Foo(i) for i in range(3)]
+    registry.add_client('a')
+    registry.update({id(foo): foo for foo in foos})
+    registry.update({id(foos[0]): foos[0]}, client_id='b')
+    assert [registry[id(foo)] for foo in foos] == foos
+
+    stats = registry.stats()
+    assert stats['objects'] == 4
+    assert stats['clients'] == {'a': 2, 'b': 1}
+
+    ids = [id(foo) for foo in foos]
+    foos.clear()
+    gc.collect()
+    # Client 'a' only keeps the two most recent objects
+    assert ids[0] in registry
+    assert ids[1] in registry
+    assert ids[2] in registry
+
+    registry.remove_client('b')
+    gc.collect()
+    assert ids[0] not in registry
+
+    registry.release('a', ids[1:])
+    gc.collect()
+    assert [_id in registry for _id in ids] == [False, False, False]
+    assert registry[1] == 'permanent'
+    assert len(registry) == 1
+
+
+class Blocker(object):
+    def __init__(self):
+        self.event = Event()
+
+    def block(self):
+        self.event.wait()
+        return 'Unblocked'
+
+    @rpc.read_only
+    def peek(self):
+        self.peek_thread = current_thread()
+        return 'Peeked'
+
+
+@pytest.mark.parametrize('root', [Blocker()])
+async def test_read_only_calls_skip_queue(session, root):
+    await session.socket.receive_json()  # Skip init
+
+    # Occupy every executor thread
+    for _ in range(session.server.max_workers):
+        await session.call(id=id(root), name='block', args=[])
+        await session.socket.receive_json()  # Skip ack
+
+    await session.call(id=id(root), name='peek', args=[])
+    await session.socket.receive_json()  # Skip ack
+    res = await session.socket.receive_json()
+    assert res['data'] == 'Peeked'
+    # without blocking the event loop
+    assert root.peek_thread is not main_thread()
+
+    stats = session.server.call_stats()
+    assert stats['running'] == session.server.max_workers
+    assert stats['read_only'] == 1
+
+    root.event.set()
+    for _ in range(session.server.max_workers):
+        res = await session.socket.receive_json()
+        assert res['data'] == 'Unblocked'
+
+    await session.call(name='get_call_stats', args=[])
+    await session.socket.receive_json()  # Skip ack
+    res = await session.socket.receive_json()
+    assert res['data']['v'] == {
+        'queued': 0,
+        'running': 0,
+        'read_only': 2,
+        'completed': session.server.max_workers,
+        'max_workers': rpc.MAX_WORKERS
+    }
+
+
 async def call(socket, **kwargs):
     token = str(uuid())
     request = {'$': {'token': token}, **kwargs}
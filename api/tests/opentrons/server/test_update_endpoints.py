@@ -1,7 +1,10 @@
 import os
 import json
+import shutil
 import tempfile
 from aiohttp import web
+from opentrons.data_storage import labware_catalog
+from opentrons.data_storage import labware_definitions as ldef
 from opentrons.server.main import init
 from opentrons.server.endpoints import (control, update)
 
@@ -71,3 +74,26 @@ async def test_feature_flags(
     r2body = await r2.text()
     expected = {flag_name: flag_value}
     assert json.loads(r2body) == expected
+
+
+async def test_labware_search(
+        virtual_smoothie_env, loop, test_client, tmpdir, monkeypatch):
+    base_dir = str(tmpdir.join('definitions'))
+    shutil.copytree(ldef.default_definition_dir(), base_dir)
+    user_dir = str(tmpdir.mkdir('labware').mkdir('user'))
+    monkeypatch.setattr(ldef, 'default_definition_dir', lambda: base_dir)
+    monkeypatch.setattr(ldef, 'user_defn_dir', lambda: user_dir)
+    labware_catalog.reload()
+
+    app = init(loop)
+    cli = await loop.create_task(test_client(app))
+
+    resp = await cli.get('/labware?minWells=384&name=384')
+    assert resp.status == 200
+    body = await resp.json()
+    assert [lw['name'] for lw in body['labware']] == ['384-plate']
+    assert body['labware'][0]['wells'] == 384
+
+    resp = await cli.get('/labware?minVolume=lots')
+    assert resp.status == 400
+    assert os.path.exists(os.path.join(str(tmpdir), 'labware', 'catalog.json'))
@@ -1,7 +1,7 @@
 import pytest
 from opentrons.trackers.pose_tracker import (
     Point, Node, add, descendants, ascend, change_base, max_z,
-    update, remove, translate, init, ROOT, has_children
+    update, remove, translate, init, ROOT, has_children, working, commit
 )
 from numpy import isclose, array, ndarray
 
@@ -135,6 +135,19 @@ def test_update(state):
     assert (change_base(state, src='1-1-1') == (1, 2, 3)).all()
 
 
+def test_working_state(state):
+    original = state
+    state = working(state)
+    assert update(state, '1-1', Point(0, 0, 0)) is state
+    state = update(state, '1', Point(0, 0, 0))
+    assert (change_base(state, src='1-1-1') == (0, 0, 0)).all()
+    assert (change_base(original, src='1-1-1') == (12, 14, 16)).all()
+
+    state = commit(state)
+    assert update(state, '1', Point(1, 1, 1)) is not state
+    assert (change_base(state, src='1-1-1') == (0, 0, 0)).all()
+
+
 def test_remove(state):
     state = remove(state, '1')
     assert {*state} == {'2-1', '2', '2-2', ROOT}
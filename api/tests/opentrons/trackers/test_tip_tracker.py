@@ -0,0 +1,129 @@
+import pytest
+
+from opentrons import instruments, robot
+from opentrons.containers import load as containers_load
+from opentrons.trackers import tip_tracker
+
+
+@pytest.fixture
+def racks(virtual_smoothie_env):
+    robot.connect()
+    robot.reset()
+    return [
+        containers_load(robot, 'tiprack-200ul', '1'),
+        containers_load(robot, 'tiprack-200ul', '2')
+    ]
+
+
+def test_rack_state(racks):
+    rack = racks[0]
+    state = tip_tracker.TipRackState(rack)
+    assert len(state) == 96
+    assert state.next_tip() is rack[0]
+    assert state.next_column() is rack.cols[0]
+
+    state.use(rack['B1'])
+    assert not state.is_available(rack['B1'])
+    assert state.next_tip() is rack[0]
+    assert state.next_column() is rack.cols[1]
+
+    state.use(rack.cols[1])
+    state.use(rack['A1'])
+    assert state.next_tip() is rack['C1']
+    assert state.next_column() is rack.cols[2]
+    assert len(state) == 96 - 10
+
+    state.use_before(rack.cols[4])
+    assert state.next_tip() is rack['A5']
+    assert state.next_column() is rack.cols[4]
+
+    state.reset()
+    assert len(state) == 96
+    state.empty()
+    assert state.next_tip() is None
+    assert state.next_column() is None
+
+
+def test_racks_shared_between_pipettes(racks):
+    single = instruments.P300_Single(mount='left', tip_racks=racks)
+    multi = instruments.P300_Multi(mount='right', tip_racks=racks)
+
+    single.pick_up_tip()
+    assert single.current_tip() is racks[0]['A1']
+    # the first column is no longer full
+    multi.pick_up_tip()
+    assert multi.current_tip() is racks[0].cols[1]
+    single.drop_tip()
+    single.pick_up_tip()
+    assert single.current_tip() is racks[0]['B1']
+
+    # explicitly picked up tips are tracked too
+    multi.drop_tip()
+    multi.pick_up_tip(racks[0].cols[2])
+    multi.drop_tip()
+    multi.pick_up_tip()
+    assert multi.current_tip() is racks[0].cols[3]
+
+    single.start_at_tip(racks[1]['C3'])
+    assert single.current_tip() is None
+    single.pick_up_tip()
+    assert single.current_tip() is racks[1]['C3']
+
+
+def test_snapshot(racks, tmpdir):
+    pipette = instruments.P300_Single(mount='left', tip_racks=racks)
+    for _ in range(100):
+        pipette.pick_up_tip()
+        pipette.drop_tip()
+    path = str(tmpdir.join('tips.json'))
+    tip_tracker.save(path, racks)
+
+    robot.reset()
+    new_racks = [
+        containers_load(robot, 'tiprack-200ul', '1'),
+        containers_load(robot, 'tiprack-200ul', '2')
+    ]
+    pipette = instruments.P300_Single(mount='left', tip_racks=new_racks)
+    tip_tracker.load(path, new_racks)
+    assert len(tip_tracker.get_state(new_racks[0])) == 0
+    assert len(tip_tracker.get_state(new_racks[1])) == 92
+    pipette.pick_up_tip()
+    assert pipette.current_tip() is new_racks[1]['E1']
+
+    snapshot = tip_tracker.snapshot(new_racks)
+    snapshot['racks']['2']['tips'] = 384
+    with pytest.raises(ValueError):
+        tip_tracker.restore(snapshot, new_racks)
+
+
+def test_reset_own_tips(racks):
+    first = instruments.P300_Single(mount='left', tip_racks=racks[:1])
+    second = instruments.P300_Single(mount='right', tip_racks=racks[:1])
+
+    def next_tip(pipette):
+        pipette.pick_up_tip()
+        tip = pipette.current_tip()
+        pipette.drop_tip()
+        return tip
+
+    assert next_tip(first) is racks[0]['A1']
+    assert next_tip(second) is racks[0]['B1']
+
+    # refilling only puts back the tips of the pipette asking for it
+    first.reset_tip_tracking()
+    assert next_tip(first) is racks[0]['A1']
+    assert next_tip(second) is racks[0]['C1']
+
+    # tips skipped by a starting tip stay available to the other pipette
+    first.start_at_tip(racks[0]['A2'])
+    assert next_tip(first) is racks[0]['A2']
+    assert next_tip(second) is racks[0]['A1']
+    assert next_tip(second) is racks[0]['D1']
+
+
+def test_reset_forgets_racks(racks):
+    for _ in range(3):
+        robot.reset()
+        rack = containers_load(robot, 'tiprack-200ul', '1')
+        tip_tracker.get_state(rack)
+    assert tip_tracker.tracked_racks() == [rack]
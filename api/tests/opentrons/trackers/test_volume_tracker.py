@@ -0,0 +1,104 @@
+import math
+
+import pytest
+from numpy import isclose
+
+from opentrons import instruments, robot
+from opentrons.containers import load as containers_load
+from opentrons.trackers import pose_tracker, volume_tracker
+
+
+@pytest.fixture
+def deck(virtual_smoothie_env):
+    robot.connect()
+    robot.reset()
+    tiprack = containers_load(robot, 'tiprack-200ul', '1')
+    trough = containers_load(robot, 'trough-12row', '2')
+    plate = containers_load(robot, '96-flat', '3')
+    return tiprack, trough, plate
+
+
+def test_labware_volumes(deck):
+    _, trough, plate = deck
+    volume_tracker.fill(plate.cols[0], 100, 'water')
+    volume_tracker.fill(plate['A1'], 50, 'dye')
+    volume_tracker.fill(trough, 10000, 'buffer')
+
+    state = volume_tracker.get_state(plate)
+    assert state.volumes.shape[0] == 96
+    assert state.totals[0] == 150
+    assert state.totals[8] == 0
+    area = math.pi * 3.2 ** 2
+    assert isclose(state.heights()[1], 100 / area)
+
+    assert volume_tracker.volume(plate['A1']) == 150
+    assert volume_tracker.volume(plate['A2']) == 0
+    assert volume_tracker.composition(plate['A1']) == {
+        'water': 100, 'dye': 50}
+    totals = volume_tracker.reagent_totals()
+    assert totals['water'] == 800
+    assert totals['buffer'] == 120000
+    assert volume_tracker.reagent_totals([plate]) == {
+        'water': 800, 'dye': 50}
+
+
+def test_pipette_moves_liquid(deck):
+    tiprack, trough, plate = deck
+    volume_tracker.fill(trough['A1'], 10000, 'buffer')
+    volume_tracker.fill(plate['A1'], 200, 'water')
+
+    p300 = instruments.P300_Single(mount='right', tip_racks=[tiprack])
+    p300.pick_up_tip()
+    p300.aspirate(100, plate['A1'])
+    assert volume_tracker.volume(plate['A1']) == 100
+    p300.air_gap(20)
+    assert volume_tracker.volume(plate['A1']) == 100
+    p300.dispense(60, plate['B1'])
+    p300.blow_out(plate['C1'])
+    assert volume_tracker.composition(plate['B1']) == {'water': 60}
+    assert volume_tracker.composition(plate['C1']) == {'water': 40}
+    p300.drop_tip()
+
+    p300.transfer(50, trough['A1'], plate.cols[1], new_tip='once')
+    assert isclose(volume_tracker.volume(trough['A1']), 10000 - 8 * 50)
+    assert volume_tracker.reagent_totals([plate]) == {
+        'water': 200, 'buffer': 400}
+
+    # an untracked labware is left alone unless tracked liquid goes in it
+    other = containers_load(robot, '96-flat', '4')
+    p300.pick_up_tip()
+    p300.aspirate(50, other['A1'])
+    assert not volume_tracker.is_tracked(other)
+
+
+def test_height_aware_aspirate(deck):
+    tiprack, trough, plate = deck
+    p300 = instruments.P300_Single(mount='right', tip_racks=[tiprack])
+    p300.pick_up_tip()
+
+    def aspirate_height(well, volume):
+        p300.aspirate(volume, well)
+        _, _, tip_z = pose_tracker.absolute(robot.poses, p300)
+        p300.dispense(plate['H12'].top())
+        bottom = pose_tracker.absolute(robot.poses, well)[2] - well.z_size()
+        return tip_z - bottom
+
+    # not tracked: default clearance
+    assert isclose(aspirate_height(trough['A1'], 50), 1.0)
+
+    volume_tracker.fill(trough['A2'], 10000, 'buffer')
+    area = 70 * 7
+    expected = (10000 - 100) / area - volume_tracker.ASPIRATE_DEPTH
+    assert isclose(aspirate_height(trough['A2'], 100), expected)
+    # never goes below the default clearance as the well empties
+    volume_tracker.fill(trough['A3'], 200, 'buffer')
+    assert isclose(aspirate_height(trough['A3'], 100), 1.0)
+
+
+def test_reset_forgets_labware(deck):
+    for _ in range(2):
+        robot.reset()
+        plate = containers_load(robot, '96-flat', '3')
+        volume_tracker.fill(plate.wells('A1'), 100, 'water')
+        assert volume_tracker.reagent_totals() == {'water': 100}
+    assert volume_tracker.tracked_labware() == [plate]
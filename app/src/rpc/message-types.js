@@ -8,6 +8,9 @@ export const NOTIFICATION = 2
 export const CONTROL_MESSAGE = 3
 export const NACK = 4
 
+// client to server
+export const RELEASE = 5
+
 // statuses
 export const statuses = {
   SUCCESS: 'success',